@@ -1,13 +1,21 @@
-import time
 import re
-import requests
 import pandas as pd
 from bs4 import BeautifulSoup
 from datetime import datetime
 import urllib3
 
+import checkpoint
+import deadline as run_deadline
+import http_client
+import pipeline
+import telemetry
+import work_queue
+from records import Opportunity, build_frame
+
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+SOURCE = "AndPurpose"
+
 BASE_URL = "https://andpurpose.world/category/grants/"
 HEADERS = {"User-Agent": "Mozilla/5.0"}
 
@@ -37,6 +45,26 @@ def detect_vertical(title):
 # ======================================================
 # FETCH LISTINGS
 # ======================================================
+def parse_cards(soup):
+    cards = []
+
+    for art in soup.find_all("article", class_="masonry-blog-item"):
+        a_tag = art.find("a", class_="entire-meta-link")
+        if not a_tag:
+            continue
+
+        link = a_tag.get("href", "").strip()
+        if not link:
+            continue
+
+        title_tag = art.find("h3", class_="title")
+        title = title_tag.get_text(strip=True) if title_tag else "N/A"
+
+        cards.append({"Title": title, "Link": link})
+
+    return cards
+
+
 def fetch_all_cards():
     all_items = []
     seen_links = set()
@@ -44,37 +72,36 @@ def fetch_all_cards():
     MAX_PAGES = 10
 
     while page <= MAX_PAGES:
-        url = BASE_URL if page == 1 else f"{BASE_URL}page/{page}/"
-        print(f"🔍 AndPurpose Page {page}")
-
-        try:
-            res = requests.get(url, headers=HEADERS, timeout=10, verify=False)
-            soup = BeautifulSoup(res.text, "html.parser")
-        except:
+        if run_deadline.out_of_time():
+            print(f"⏳ AndPurpose: out of time, stopping at page {page - 1}")
             break
 
-        articles = soup.find_all("article", class_="masonry-blog-item")
+        url = BASE_URL if page == 1 else f"{BASE_URL}page/{page}/"
 
-        if not articles:
-            break
+        cards = checkpoint.get_page(SOURCE, page)
+        if cards is checkpoint.MISSING:
+            print(f"🔍 AndPurpose Page {page}")
 
-        for art in articles:
-            a_tag = art.find("a", class_="entire-meta-link")
-            if not a_tag:
-                continue
+            try:
+                res = http_client.get(url, headers=HEADERS, timeout=10, verify=False)
+                with telemetry.span("parse"):
+                    soup = BeautifulSoup(res.text, "html.parser")
+            except:
+                break
 
-            link = a_tag.get("href", "").strip()
-            if not link or link in seen_links:
-                continue
+            cards = parse_cards(soup)
+            checkpoint.save_page(SOURCE, page, cards)
 
-            title_tag = art.find("h3", class_="title")
-            title = title_tag.get_text(strip=True) if title_tag else "N/A"
+        if not cards:
+            break
 
-            all_items.append({"Title": title, "Link": link})
-            seen_links.add(link)
+        for card in cards:
+            if card["Link"] in seen_links:
+                continue
+            all_items.append(card)
+            seen_links.add(card["Link"])
 
         page += 1
-        time.sleep(1)
 
     print(f"✅ AndPurpose Total: {len(all_items)}")
     return all_items
@@ -83,15 +110,23 @@ def fetch_all_cards():
 # ======================================================
 # DETAIL SCRAPER
 # ======================================================
-def extract_details(item):
-    link = item["Link"]
-    title = item["Title"]
-
+def fetch_html(link):
     try:
-        res = requests.get(link, headers=HEADERS, timeout=10, verify=False)
-        soup = BeautifulSoup(res.text, "html.parser")
+        res = http_client.get(link, headers=HEADERS, timeout=10, verify=False)
     except:
         return None
+    return res.text
+
+
+def extract_details(item):
+    html = fetch_html(item["Link"])
+    if html is None:
+        return None
+    return parse_details(html, item["Title"], item["Link"])
+
+
+def parse_details(html, title, link):
+    soup = BeautifulSoup(html, "html.parser")
 
     full_text = soup.get_text(" ", strip=True)
 
@@ -129,7 +164,7 @@ def extract_details(item):
     vertical = detect_vertical(title)
 
     return {
-        "Source": "AndPurpose",
+        "Source": SOURCE,
         "Type": "Grant",
         "Title": title,
         "Description": description,
@@ -144,34 +179,58 @@ def extract_details(item):
 # ======================================================
 # MAIN FUNCTION (IMPORTANT)
 # ======================================================
-def scrape_andpurpose():
-    listings = fetch_all_cards()
-
-    all_data = []
-
-    for i, item in enumerate(listings):
-        print(f"🔗 AndPurpose {i+1}/{len(listings)}")
-
-        data = extract_details(item)
-        if data:
-            all_data.append(data)
-
-        time.sleep(1)
+def is_open(data):
+    """Only listings with a readable deadline that hasn't passed."""
+    deadline = pd.to_datetime(data["Deadline"], errors="coerce")
+    return pd.notna(deadline) and deadline >= pd.Timestamp.today().normalize()
 
-    if not all_data:
-        print("⚠️ AndPurpose returned no data.")
-        return pd.DataFrame()
 
-    df = pd.DataFrame(all_data)
-
-    # Filter valid deadlines
-    df["Deadline_Date"] = pd.to_datetime(df["Deadline"], errors="coerce")
-    today = pd.Timestamp.today().normalize()
+def iter_andpurpose():
+    listings = fetch_all_cards()
 
-    df = df[df["Deadline_Date"].notna()]
-    df = df[df["Deadline_Date"] >= today]
+    pending = []
+    kept = 0
+
+    for item in listings:
+        data = checkpoint.get_detail(SOURCE, item["Link"])
+        if data is checkpoint.MISSING:
+            pending.append(item)
+        elif data and is_open(data):
+            kept += 1
+            yield Opportunity.from_row(data)
+
+    if work_queue.active_queue() and pending:
+        # Shard detail pages across every worker sharing the queue
+        print(f"🔗 AndPurpose: queueing {len(pending)} detail pages")
+        results = work_queue.map_pages("detail", [
+            {
+                "url": item["Link"],
+                "headers": HEADERS,
+                "parser": "andpurpose:parse_details",
+                "args": [item["Title"], item["Link"]]
+            }
+            for item in pending
+        ])
+    else:
+        # One download at a time, at least politeness.HOST_FLOOR apart; parsing
+        # overlaps with the next download. Rows come out as they're parsed
+        print(f"🔗 AndPurpose: fetching {len(pending)} detail pages")
+        results = pipeline.iter_fetch_and_parse(
+            [(item["Link"], (item["Title"], item["Link"])) for item in pending],
+            fetch_html, parse_details, io_workers=1
+        )
+
+    for item, data in zip(pending, results):
+        # SKIPPED (out of time) is dropped: without the detail page there's no deadline to keep it by
+        if data and data is not work_queue.FAILED and data is not pipeline.SKIPPED:
+            checkpoint.save_detail(SOURCE, item["Link"], data)
+            if is_open(data):
+                kept += 1
+                yield Opportunity.from_row(data)
+
+    # The combiner orders every source by deadline, so no sort here
+    print(f"  -> AndPurpose scraped {kept} items.")
 
-    df = df.sort_values("Deadline_Date")
 
-    print(f"  -> AndPurpose scraped {len(df)} items.")
-    return df
\ No newline at end of file
+def scrape_andpurpose():
+    return build_frame(iter_andpurpose())
\ No newline at end of file
@@ -1,60 +1,318 @@
-from flask import Flask, render_template_string, send_file, jsonify
+from flask import Flask, render_template_string, send_file, jsonify, make_response, request
 from flask_cors import CORS
 import requests
-import pandas as pd
 import io
+import json
+import os
+import hashlib
+import re
 import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
 
 app = Flask(__name__)
 CORS(app)
 
 EXCEL_URL = "https://raw.githubusercontent.com/RajuSakshena/all-scraping/main/all_grants.xlsx"
 
+# Written by the exporter next to the sheet: plain JSON, so serving it needs no pandas
+JSON_URL = "https://raw.githubusercontent.com/RajuSakshena/all-scraping/main/all_grants.json"
+LOCAL_JSON = os.path.join(os.path.dirname(os.path.abspath(__file__)), "all_grants.json")
+
+ROW_LIMIT = 300
+DAYS_LEFT_FORMULA = re.compile(r"=DATE\((\d+),(\d+),(\d+)\)-TODAY\(\)")
+
+# Keyword profiles: named ones live here, shaped like keywords.json's "verticals"
+PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles.json")
+KEYWORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "keywords.json")
+MAX_PROFILE_KEYWORDS = 500
+MATCHER_CACHE = 128        # compiled profiles kept
+VIEW_CACHE = 256           # (profile, data version) -> matching row ids
+
+# Publish schedule: the workflow runs at minute 30 of every hour (cron "30 * * * *")
+# and its commit lands within PUBLISH_LAG, so new data can't appear before then
+PUBLISH_MINUTE = 30
+PUBLISH_LAG = 15 * 60
+
 # Cache
-cached_df = None
-last_fetch_time = 0
-CACHE_DURATION = 600  # 10 min
+cached_data = None      # columns, rows and absolute expiry day per row
+cache_until = 0         # next publish slot
+json_etag = None        # GitHub's, so an unchanged file is a 304
+served_today = None     # ((data version, day), [(row id, record)]): Days_Left recounted once per day
+profile_views = OrderedDict()
+LOCAL_DURATION = 60     # the deployed copy only bridges the cold start
+
+
+# ======================================================
+# ⏰ SCHEDULE
+# ======================================================
+def next_publish(now):
+    """When the next scheduled run's data can be on GitHub (epoch seconds)."""
+    t = datetime.fromtimestamp(now, timezone.utc)
+    slot = t.replace(minute=PUBLISH_MINUTE, second=0, microsecond=0) + timedelta(seconds=PUBLISH_LAG)
+    while slot <= t:
+        slot += timedelta(hours=1)
+    return slot.timestamp()
+
+
+def next_midnight(now):
+    """Days_Left changes at UTC midnight even when the data doesn't."""
+    t = datetime.fromtimestamp(now, timezone.utc)
+    return datetime.combine(t.date() + timedelta(days=1), datetime.min.time(), timezone.utc).timestamp()
+
+
+def cache_headers(response, etag=None):
+    now = time.time()
+    max_age = int(min(next_publish(now), next_midnight(now)) - now)
+    response.headers["Cache-Control"] = f"public, max-age={max(0, max_age)}"
+    if etag:
+        response.headers["ETag"] = etag
+    return response
 
 
 # ======================================================
 # 🔥 FAST FETCH WITH TIMEOUT + RETRY
 # ======================================================
+def fetch(url, what="Excel"):
+    for i in range(3):  # retry 3 times
+        try:
+            response = requests.get(url, timeout=10)
+
+            if response.status_code == 200:
+                return response.content
+
+        except Exception:
+            time.sleep(2)
+
+    raise Exception(f"❌ Failed to fetch {what} after retries")
+
+
 def fetch_excel():
+    return fetch(EXCEL_URL)
+
+
+def fetch_json():
+    """The published JSON, or None when it is unchanged since the last fetch."""
+    global json_etag
+
+    headers = {"If-None-Match": json_etag} if json_etag else {}
     for i in range(3):  # retry 3 times
         try:
-            response = requests.get(EXCEL_URL, timeout=10)
+            response = requests.get(JSON_URL, headers=headers, timeout=10)
 
+            if response.status_code == 304:
+                return None
             if response.status_code == 200:
+                json_etag = response.headers.get("ETag")
                 return response.content
 
         except Exception:
             time.sleep(2)
 
-    raise Exception("❌ Failed to fetch Excel after retries")
+    raise Exception("❌ Failed to fetch JSON after retries")
 
 
-def get_excel_data():
-    global cached_df, last_fetch_time
+def load_json(content):
+    data = json.loads(content)
+    # What the per-day and per-profile caches are keyed on: same content, same version
+    data["version"] = data.get("fingerprint") or hashlib.sha256(content).hexdigest()
+    data["expires"] = [
+        date.fromisoformat(day).toordinal() if day else None
+        for day in data.get("expires") or [None] * len(data["rows"])
+    ]
+    return data
+
+
+def load_excel(content):
+    # Only until a JSON artifact is published; the one place pandas gets imported
+    import pandas as pd
+
+    from openpyxl import load_workbook
+
+    df = pd.read_excel(io.BytesIO(content), engine="openpyxl")
+    df = df.astype(object).where(df.notna(), None)
+
+    # Days_Left cells are "=DATE(y,m,d)-TODAY()" formulas with no cached value: the expiry day is in the formula
+    expires = [None] * len(df)
+    if "Days_Left" in df.columns:
+        column = list(df.columns).index("Days_Left")
+        sheet = load_workbook(io.BytesIO(content), read_only=True).active
+        for i, row in enumerate(sheet.iter_rows(min_row=2, max_row=len(df) + 1, values_only=True)):
+            match = DAYS_LEFT_FORMULA.match(str(row[column] or ""))
+            if match:
+                expires[i] = date(*map(int, match.groups())).toordinal()
+
+    return {"fingerprint": None, "version": hashlib.sha256(content).hexdigest(),
+            "columns": list(df.columns), "rows": df.values.tolist(), "expires": expires}
+
+
+def get_data():
+    global cached_data, cache_until
 
     current_time = time.time()
 
-    # ✅ Use cache if valid
-    if cached_df is not None and (current_time - last_fetch_time) < CACHE_DURATION:
-        return cached_df
+    # ✅ Nothing new can be published before the next slot
+    if cached_data is not None and current_time < cache_until:
+        return cached_data
+
+    # ⚡ Cold start: answer from the copy deployed with the app, refresh shortly after
+    if cached_data is None and os.path.exists(LOCAL_JSON):
+        with open(LOCAL_JSON, "rb") as f:
+            cached_data = load_json(f.read())
+        cache_until = current_time + LOCAL_DURATION
+        return cached_data
 
     print("🔄 Fetching fresh data...")
 
-    content = fetch_excel()
+    try:
+        content = fetch_json()
+        if content is not None:
+            cached_data = load_json(content)
+    except Exception:
+        cached_data = load_excel(fetch_excel())
 
-    df = pd.read_excel(io.BytesIO(content), engine="openpyxl")
-    df = df.fillna("")
+    cache_until = next_publish(current_time)
+
+    return cached_data
+
+
+def rows_today(data):
+    """(row id, record) for every row still open today: Days_Left from the absolute expiry day."""
+    global served_today
 
-    # ✅ LIMIT rows for faster UI
-    cached_df = df.head(300)
+    day = datetime.now(timezone.utc).date()
+    if served_today is not None and served_today[0] == (data["version"], day):
+        return served_today[1]
 
-    last_fetch_time = current_time
+    today = day.toordinal()
+    columns = data["columns"]
+    rows = []
+    for i, (row, expires) in enumerate(zip(data["rows"], data["expires"])):
+        days_left = None if expires is None else expires - today
+        if days_left is not None and days_left < 0:
+            continue  # expired since it was published
+        record = {c: ("" if v is None else v) for c, v in zip(columns, row)}
+        if days_left is not None:
+            record["Days_Left"] = days_left
+        rows.append((i, record))
 
-    return cached_df
+    served_today = ((data["version"], day), rows)
+    return rows
+
+
+def get_excel_data():
+    """Rows as of today, expired ones dropped, first ROW_LIMIT."""
+    return [record for _, record in rows_today(get_data())[:ROW_LIMIT]]
+
+
+# ======================================================
+# 🎯 KEYWORD PROFILES
+# ======================================================
+def normalize_profile(profile):
+    """{label: [keywords]} with lowercased, de-duplicated, sorted keywords; raises ValueError."""
+    if isinstance(profile, list):
+        profile = {"Match": profile}
+    if not isinstance(profile, dict) or not profile:
+        raise ValueError("a profile is {label: [keywords]} or a list of keywords")
+    clean = {}
+    for label, keywords in profile.items():
+        if isinstance(keywords, str):
+            keywords = keywords.split(",")
+        if not isinstance(keywords, list):
+            raise ValueError(f"keywords for {label!r} must be a list")
+        words = sorted({str(k).strip().lower() for k in keywords if str(k).strip()})
+        if words:
+            clean[str(label)] = words
+    if not clean:
+        raise ValueError("the profile has no keywords")
+    if sum(len(words) for words in clean.values()) > MAX_PROFILE_KEYWORDS:
+        raise ValueError(f"at most {MAX_PROFILE_KEYWORDS} keywords per profile")
+    return clean
+
+
+def profile_key(profile):
+    """Stable hash of a normalized profile: same keywords, same cache entries."""
+    canonical = json.dumps(profile, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16], canonical
+
+
+def named_profile(name):
+    """A profile from profiles.json, or "default" for the scraper's own verticals."""
+    if os.path.exists(PROFILES_PATH):
+        with open(PROFILES_PATH, "r", encoding="utf-8") as f:
+            profiles = json.load(f)
+        if name in profiles:
+            return profiles[name]
+    if name == "default":
+        with open(KEYWORDS_PATH, "r", encoding="utf-8") as f:
+            return json.load(f).get("verticals", {})
+    return None
+
+
+@lru_cache(maxsize=MATCHER_CACHE)
+def compile_profile(canonical):
+    """One alternation regex over every keyword of the profile, plus keyword -> labels."""
+    profile = json.loads(canonical)
+    labels = {}
+    for label, keywords in profile.items():
+        for keyword in keywords:
+            labels.setdefault(keyword, []).append(label)
+    # Longest first so "climate adaptation" wins over "climate"; whole words only
+    alternation = "|".join(re.escape(k) for k in sorted(labels, key=len, reverse=True))
+    return re.compile(rf"(?<![a-z0-9])(?:{alternation})(?![a-z0-9])"), labels
+
+
+def corpus(data):
+    """Lowercased Title + Description per row, built once per data version."""
+    if data.get("_corpus") is None:
+        columns = data["columns"]
+        fields = [columns.index(c) for c in ("Title", "Description") if c in columns]
+        data["_corpus"] = [" ".join(str(row[i] or "") for i in fields).lower() for row in data["rows"]]
+    return data["_corpus"]
+
+
+def profile_matches(data, key, canonical):
+    """{row id: matched labels} for one profile over one data version (LRU-cached)."""
+    version = (key, data["version"])
+    if version in profile_views:
+        profile_views.move_to_end(version)
+        return profile_views[version]
+
+    pattern, labels = compile_profile(canonical)
+    order = list(json.loads(canonical))
+    matches = {}
+    for i, text in enumerate(corpus(data)):
+        found = {label for keyword in set(pattern.findall(text)) for label in labels[keyword]}
+        if found:
+            matches[i] = ", ".join(label for label in order if label in found)
+
+    profile_views[version] = matches
+    if len(profile_views) > VIEW_CACHE:
+        profile_views.popitem(last=False)
+    return matches
+
+
+def profile_rows(profile):
+    """Today's rows matching the profile, Matched_Vertical set to the profile's labels."""
+    profile = normalize_profile(profile)
+    key, canonical = profile_key(profile)
+    data = get_data()
+    matches = profile_matches(data, key, canonical)
+    rows = []
+    for i, record in rows_today(data):
+        if i in matches:
+            rows.append({**record, "Matched_Vertical": matches[i]})
+            if len(rows) == ROW_LIMIT:
+                break
+    return key, rows
+
+
+def data_etag():
+    data = get_data()
+    if not data.get("fingerprint"):
+        return None
+    return f'"{data["fingerprint"]}-{datetime.now(timezone.utc).date().isoformat()}"'
 
 
 # ======================================================
@@ -68,8 +326,45 @@ def home():
 @app.route("/jobs-json")
 def jobs_json():
     try:
-        df = get_excel_data()
-        return jsonify(df.to_dict(orient="records"))
+        etag = data_etag()
+        if etag and request.headers.get("If-None-Match") == etag:
+            return cache_headers(make_response("", 304), etag)
+        return cache_headers(jsonify(get_excel_data()), etag)
+    except Exception as e:
+        return {"error": str(e)}, 500
+
+
+@app.route("/jobs-json/profile", methods=["GET", "POST"])
+@app.route("/jobs-json/profile/<name>")
+def jobs_json_profile(name=None):
+    """Rows matching a named profile, ?keywords=a,b or a POSTed {label: [keywords]}."""
+    try:
+        if name is not None:
+            profile = named_profile(name)
+            if profile is None:
+                return {"error": f"unknown profile {name!r}"}, 404
+        elif request.method == "POST":
+            body = request.get_json(silent=True)
+            if isinstance(body, dict):
+                # keywords.json's {"verticals": {...}}, {"keywords": [...]} or the bare mapping
+                profile = body.get("verticals") or body.get("keywords") or body
+            elif isinstance(body, list):
+                profile = body
+            else:
+                return {"error": "expected a JSON object or list of keywords"}, 400
+        else:
+            profile = request.args.get("keywords", "").split(",")
+
+        key, rows = profile_rows(profile)
+        etag = data_etag()
+        etag = f'{etag[:-1]}-{key}"' if etag else None
+        if etag and request.headers.get("If-None-Match") == etag:
+            return cache_headers(make_response("", 304), etag)
+        response = cache_headers(jsonify(rows), etag)
+        response.headers["X-Profile-Hash"] = key
+        return response
+    except ValueError as e:
+        return {"error": str(e)}, 400
     except Exception as e:
         return {"error": str(e)}, 500
 
@@ -79,12 +374,12 @@ def download_excel():
     try:
         content = fetch_excel()
 
-        return send_file(
+        return cache_headers(send_file(
             io.BytesIO(content),
             download_name="all_grants.xlsx",
             as_attachment=True,
             mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
+        ))
 
     except Exception as e:
         return f"Download Error: {str(e)}", 500
@@ -93,10 +388,8 @@ def download_excel():
 @app.route("/jobs")
 def jobs_dashboard():
     try:
-        df = get_excel_data()
-
         # ✅ fast render (no heavy HTML)
-        rows = df.to_dict(orient="records")
+        rows = get_excel_data()
 
         html_rows = ""
         for r in rows:
@@ -170,7 +463,7 @@ def jobs_dashboard():
         </html>
         """
 
-        return render_template_string(html)
+        return cache_headers(make_response(render_template_string(html)))
 
     except Exception as e:
         return f"Dashboard Error: {str(e)}", 500
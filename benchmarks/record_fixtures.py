@@ -0,0 +1,99 @@
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup
+
+import andpurpose
+import dev
+import hcl
+import http_client
+import main_scraper
+import metro
+import nasscom
+import niua_tenders
+import wri
+
+# ======================================================
+# RE-RECORD BENCHMARK FIXTURES FROM THE LIVE SITES
+# ======================================================
+# Needs network; run_benchmarks.py itself never does. Review the diff before
+# committing: a changed page layout is exactly what the fixtures should catch.
+FIXTURE_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+
+
+def _get(url, headers):
+    res = http_client.get(url, headers=headers, timeout=30, verify=False)
+    res.raise_for_status()
+    return res.text
+
+
+def _first(links):
+    return links[0] if links else None
+
+
+def record_ngobox():
+    listing = main_scraper.fetch_html(main_scraper.URLS["Grants"])
+    pages = {"ngobox_listing.html": listing}
+    link = _first([link for _, link in main_scraper.parse_listing_page(listing or "")])
+    if link:
+        pages["ngobox_detail.html"] = main_scraper.fetch_html(link)
+    return pages
+
+
+def record_devnetjobs():
+    grid = _get(dev.LISTING_URL, dev.HEADERS)
+    pages = {"devnetjobs_grid.html": grid}
+    link = _first([dev.build_link_from_logo(row) for row in dev.extract_rows(grid) if dev.build_link_from_logo(row)])
+    if link:
+        pages["devnetjobs_detail.html"] = _get(link, dev.HEADERS)
+    return pages
+
+
+def record_andpurpose():
+    listing = _get(andpurpose.BASE_URL, andpurpose.HEADERS)
+    pages = {"andpurpose_listing.html": listing}
+    link = _first([card["Link"] for card in andpurpose.parse_cards(BeautifulSoup(listing, "html.parser"))])
+    if link:
+        pages["andpurpose_detail.html"] = _get(link, andpurpose.HEADERS)
+    return pages
+
+
+RECORDERS = {
+    "ngobox": record_ngobox,
+    "devnetjobs": record_devnetjobs,
+    "wri": lambda: {"wri.html": _get(wri.URL, wri.HEADERS)},
+    "nasscom": lambda: {"nasscom.html": _get(nasscom.URL, nasscom.HEADERS)},
+    "hcl": lambda: {"hcl.html": _get(hcl.URL, hcl.HEADERS)},
+    "metro": lambda: {"metro.html": _get(metro.URL, metro.HEADERS)},
+    "niua": lambda: {"niua.html": _get(niua_tenders.TENDERS_URL, niua_tenders.HEADERS)},
+    "andpurpose": record_andpurpose,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-record benchmark fixtures (needs network)")
+    parser.add_argument("sources", nargs="*", help=f"any of {', '.join(RECORDERS)} (default: all)")
+    args = parser.parse_args()
+
+    unknown = set(args.sources) - set(RECORDERS)
+    if unknown:
+        parser.error(f"unknown source(s): {', '.join(sorted(unknown))}")
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for name in args.sources or RECORDERS:
+        try:
+            pages = RECORDERS[name]()
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            continue
+        for filename, html in pages.items():
+            if not html:
+                print(f"⚠️ {name}: nothing fetched for {filename}, keeping the old fixture")
+                continue
+            with open(os.path.join(FIXTURE_DIR, filename), "w", encoding="utf-8") as f:
+                f.write(html)
+            print(f"✅ {filename} ({len(html) // 1024} KB)")
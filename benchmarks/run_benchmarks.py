@@ -0,0 +1,442 @@
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+import andpurpose
+import combined_scraper
+import dev
+import hcl
+import http_archive
+import main_scraper
+import metro
+import nasscom
+import niua_tenders
+import relevance
+import telemetry
+import wri
+from registry import FINAL_COLUMNS
+
+# ======================================================
+# OFFLINE BENCHMARKS (recorded fixtures, no network)
+# ======================================================
+# python benchmarks/run_benchmarks.py                     -> results/<commit>.json
+# python benchmarks/run_benchmarks.py --compare OLD.json  -> exit 1 on regression
+# python benchmarks/run_benchmarks.py --replay http_archive.sqlite -> + full offline run
+# python benchmarks/run_benchmarks.py --only startup          -> exit 1 over IMPORT_BUDGET
+FIXTURE_DIR = os.path.join(ROOT, "benchmarks", "fixtures")
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+MIN_TIME = 0.5           # seconds of repeats per measurement round
+ROUNDS = 5
+EXPORT_SIZES = [1_000, 10_000, 100_000]
+MATCH_TEXTS = 5_000
+MEMORY_MAX_ROWS = 10_000  # tracemalloc makes bigger exports take minutes
+
+# Import time in a fresh interpreter, seconds; over budget fails the run like a regression
+IMPORT_BUDGET = {"app": 0.25, "combined_scraper": 0.8}
+# ...and what each entry point must not pull in at import
+IMPORT_FORBIDDEN = {
+    "app": ["pandas", "numpy", "openpyxl"],
+    "combined_scraper": ["openpyxl", "bs4", "main_scraper", "dev", "nasscom", "wri", "hcl",
+                         "metro", "niua_tenders", "andpurpose"],
+}
+STARTUP_RUNS = 7
+
+# Allowed slowdown before --compare fails, by metric kind
+THRESHOLDS = {"rate": 0.15, "seconds": 0.15, "memory": 0.20}
+
+VERTICALS = dev.load_verticals(os.path.join(ROOT, "keywords.json"))
+WRI_KEYWORDS = wri.load_keywords_from_json(os.path.join(ROOT, "keywords.json"))
+
+
+def _no_network(*args, **kwargs):
+    raise RuntimeError("benchmarks must not touch the network")
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+# ======================================================
+# SCRAPER CASES: fixture -> parse(html) -> rows
+# ======================================================
+def _devnet_grid(html):
+    rows = []
+    for row in dev.extract_rows(html):
+        fields = dev.read_grid_row(row)
+        base = " | ".join(p for p in [fields["org"], fields["location"]] if p)
+        if dev.match_verticals(f"{fields['title']} {base}", VERTICALS):
+            rows.append(fields)
+    return rows
+
+
+SCRAPERS = {
+    "ngobox_listing": ("ngobox_listing.html", main_scraper.parse_listing_page),
+    "ngobox_detail": ("ngobox_detail.html", lambda html: [main_scraper.build_listing(
+        html, "Grant", "Climate Resilience Programme", "https://ngobox.org/grant-details/1", VERTICALS
+    )]),
+    "devnetjobs_grid": ("devnetjobs_grid.html", _devnet_grid),
+    "devnetjobs_detail": ("devnetjobs_detail.html", lambda html: [dev.build_assignment(
+        html, "Monitoring and Evaluation Study", "CARE India | Pune", "15-Dec-2027",
+        ["Governance"], "https://www.devnetjobsindia.org/JobDescription.aspx?Job_Id=1"
+    )]),
+    "wri": ("wri.html", lambda html: wri.parse_wri_page(html, WRI_KEYWORDS)),
+    "nasscom": ("nasscom.html", lambda html: nasscom.parse_nasscom_page(html).to_dict("records")),
+    "hcl": ("hcl.html", hcl.parse_hcl_page),
+    "metro": ("metro.html", lambda html: metro.parse_metro_page(html)[0]),
+    "niua": ("niua.html", lambda html: niua_tenders.parse_niua_page(html)[0]),
+    "andpurpose_listing": ("andpurpose_listing.html",
+                           lambda html: andpurpose.parse_cards(BeautifulSoup(html, "html.parser"))),
+    "andpurpose_detail": ("andpurpose_detail.html", lambda html: [andpurpose.parse_details(
+        html, "Women in Climate Leadership Grant", "https://andpurpose.world/grant/"
+    )]),
+}
+
+
+def _time_per_call(func, *args):
+    """Median seconds per call over ROUNDS rounds of at least MIN_TIME each."""
+    per_call = []
+    for _ in range(ROUNDS):
+        n = 0
+        start = time.perf_counter()
+        while True:
+            func(*args)
+            n += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= MIN_TIME / ROUNDS:
+                break
+        per_call.append(elapsed / n)
+        # spans/counters pile up otherwise
+        telemetry.reset()
+    return statistics.median(per_call)
+
+
+def _peak_mb(func, *args):
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 1e6, 3)
+
+
+def bench_scrapers(only=None):
+    results = {}
+    for name, (fixture_name, parse) in SCRAPERS.items():
+        if only and name not in only:
+            continue
+        html = fixture(fixture_name)
+        rows = len([r for r in parse(html) if r])
+        seconds = _time_per_call(parse, html)
+        results[f"scraper.{name}.pages_per_s"] = {"value": round(1 / seconds, 2), "kind": "rate"}
+        results[f"scraper.{name}.rows_per_s"] = {"value": round(rows / seconds, 2), "kind": "rate"}
+        results[f"scraper.{name}.peak_mb"] = {"value": _peak_mb(parse, html), "kind": "memory"}
+        print(f"  {name:20} {1 / seconds:9.1f} pages/s {rows / seconds:10.1f} rows/s ({rows} rows)")
+    return results
+
+
+# ======================================================
+# VERTICAL MATCHING
+# ======================================================
+def _match_texts():
+    titles = []
+    for fixture_name in ("ngobox_listing.html", "andpurpose_listing.html"):
+        soup = BeautifulSoup(fixture(fixture_name), "html.parser")
+        titles += [a.get_text(" ", strip=True) for a in soup.find_all(["a", "h3"]) if a.get_text(strip=True)]
+    body = BeautifulSoup(fixture("devnetjobs_detail.html"), "html.parser").get_text(" ", strip=True)[:600]
+    return [f"{titles[i % len(titles)]} {body[:(i * 37) % 600]}" for i in range(MATCH_TEXTS)]
+
+
+MATCHERS = {
+    "dev.match_verticals": lambda texts: [dev.match_verticals(t, VERTICALS) for t in texts],
+    "wri.find_matched_vertical": lambda texts: [wri.find_matched_vertical(t, "", WRI_KEYWORDS) for t in texts],
+    "nasscom.match_vertical": lambda texts: [nasscom.match_vertical(t) for t in texts],
+    # The whole batch in one sparse TF-IDF product
+    "relevance.scores": lambda texts: relevance.scores(pd.DataFrame({"Title": texts}), VERTICALS),
+}
+
+
+def bench_matching():
+    texts = _match_texts()
+    results = {}
+    for name, run in MATCHERS.items():
+        seconds = _time_per_call(run, texts)
+        rate = len(texts) / seconds
+        results[f"match.{name}.texts_per_s"] = {"value": round(rate, 1), "kind": "rate"}
+        print(f"  {name:28} {rate:12.0f} texts/s")
+    return results
+
+
+# ======================================================
+# POST-PROCESSING + XLSX EXPORT
+# ======================================================
+SOURCES = ["NGOBOX", "DevNetJobsIndia", "WRI", "HCL Foundation", "AndPurpose", "Nasscom"]
+
+
+def synthetic_frame(n):
+    """`n` raw scraper rows shaped like the real sources' output."""
+    texts = _match_texts()
+    rows = []
+    for i in range(n):
+        title = texts[i % len(texts)][:90]
+        link = f"https://example.org/opportunity/{i}"
+        rows.append({
+            "Source": SOURCES[i % len(SOURCES)],
+            "Type": "Grant" if i % 2 else "RFP",
+            "Title": title,
+            "Description": texts[(i * 7) % len(texts)] * (1 + i % 3),
+            "How_to_Apply": "• How to apply\nSend the proposal to the email ID before the deadline.",
+            "Matched_Vertical": "Governance, Climate" if i % 3 else "Learning",
+            "Deadline": f"{(i % 27) + 1:02d}-{(i % 12) + 1:02d}-2027",
+            "Days_Left": (i % 400) - 20,
+            # A few legacy formula links, as found in snapshots from older runs
+            "Clickable_Link": f'=HYPERLINK("{link}","{title}")' if i % 10 == 0 else link,
+        })
+    return pd.DataFrame(rows, columns=FINAL_COLUMNS)
+
+
+def bench_export(sizes):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.xlsx")
+        for n in sizes:
+            raw = synthetic_frame(n)
+
+            # The combiner's own summary prints would drown the results
+            with redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                df = combined_scraper.combine([raw])
+                post = time.perf_counter() - start
+
+                start = time.perf_counter()
+                combined_scraper.write_excel(df, path)
+                export = time.perf_counter() - start
+
+                peak = None
+                if n <= MEMORY_MAX_ROWS:
+                    # Same data again would be skipped as unchanged; measure a real write
+                    os.remove(path)
+                    peak = _peak_mb(combined_scraper.write_excel, df, path)
+            telemetry.reset()
+
+            results[f"post_process.{n}.seconds"] = {"value": round(post, 4), "kind": "seconds"}
+            results[f"export.{n}.seconds"] = {"value": round(export, 4), "kind": "seconds"}
+            line = f"  {n:>7} rows: post-process {post:7.3f}s, export {export:7.3f}s"
+            if peak is not None:
+                results[f"export.{n}.peak_mb"] = {"value": peak, "kind": "memory"}
+                line += f", peak {peak:8.1f} MB"
+            print(line)
+    return results
+
+
+# ======================================================
+# END TO END (replayed HTTP archive)
+# ======================================================
+def bench_e2e(archive, latency=None, failures=None):
+    """A full run_combined_scraper() served from an archive made with --record."""
+    archive = os.path.abspath(archive)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Fresh dir: no snapshots, checkpoints or PDF cache to short-circuit fetches
+        shutil.copy(os.path.join(ROOT, "keywords.json"), tmp)
+        os.chdir(tmp)
+        try:
+            http_archive.configure("replay", archive, latency=latency, failures=failures, seed=0)
+            with redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                combined_scraper.run_combined_scraper()
+                seconds = time.perf_counter() - start
+            with open(telemetry.REPORT_PATH, encoding="utf-8") as f:
+                report = json.load(f)
+        finally:
+            os.chdir(cwd)
+
+    fetches = sum(s.get("fetches", 0) for s in report["sources"].values())
+    rows = sum(s.get("rows_kept", 0) for s in report["sources"].values())
+    print(f"  {fetches} requests, {rows} rows in {seconds:.1f}s ({fetches / seconds:.1f} req/s)")
+    return {
+        "e2e.seconds": {"value": round(seconds, 3), "kind": "seconds"},
+        "e2e.requests_per_s": {"value": round(fetches / seconds, 2), "kind": "rate"},
+        "e2e.rows_per_s": {"value": round(rows / seconds, 2), "kind": "rate"},
+    }
+
+
+# ======================================================
+# STARTUP (cold import, fresh interpreter each time)
+# ======================================================
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+print(json.dumps([time.perf_counter() - start, sorted(sys.modules)]))
+"""
+
+
+def bench_startup():
+    """Median import time per entry point; returns (metrics, budget violations)."""
+    results, violations = {}, []
+    for module, budget in IMPORT_BUDGET.items():
+        times = []
+        for _ in range(STARTUP_RUNS):
+            probe = subprocess.run(
+                [sys.executable, "-c", _IMPORT_PROBE.format(module=module)],
+                cwd=ROOT, capture_output=True, text=True
+            )
+            if probe.returncode != 0:
+                print(f"  {module}: not importable here, skipped ({probe.stderr.strip().splitlines()[-1]})")
+                break
+            seconds, modules = json.loads(probe.stdout.strip().splitlines()[-1])
+            times.append(seconds)
+        if not times:
+            continue
+
+        seconds = statistics.median(times)
+        loaded = [m for m in IMPORT_FORBIDDEN[module] if m in modules]
+        results[f"startup.{module}.import_seconds"] = {"value": round(seconds, 4), "kind": "seconds"}
+        marker = "  "
+        if seconds > budget or loaded:
+            marker = "❌"
+            violations.append(module)
+        line = f"{marker}{module:>18}: {seconds * 1000:7.1f} ms (budget {budget * 1000:.0f} ms)"
+        if loaded:
+            line += f", imports {', '.join(loaded)}"
+        print(line)
+    return results, violations
+
+
+# ======================================================
+# RESULTS + COMPARISON
+# ======================================================
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(current, baseline, thresholds=THRESHOLDS):
+    """Print every shared metric; return the names that got worse than their threshold."""
+    regressions = []
+    for name, entry in sorted(current.items()):
+        old = baseline.get(name)
+        if not old or not old["value"]:
+            continue
+        new_value, old_value = entry["value"], old["value"]
+        # rates should go up, seconds and memory should go down
+        if entry["kind"] == "rate":
+            change = (old_value - new_value) / old_value
+        else:
+            change = (new_value - old_value) / old_value
+        marker = "  "
+        if change > thresholds[entry["kind"]]:
+            marker = "❌"
+            regressions.append(name)
+        print(f"{marker} {name:48} {old_value:>12} -> {new_value:>12} ({-change:+.1%})")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline scraper benchmarks")
+    parser.add_argument("--only", nargs="+", choices=["scrapers", "matching", "export", "startup", "e2e"],
+                        help="run only these groups (e2e needs --replay and runs whenever it is given)")
+    parser.add_argument("--scrapers", nargs="+", choices=sorted(SCRAPERS), help="limit scraper cases")
+    parser.add_argument("--sizes", nargs="+", type=int, default=EXPORT_SIZES,
+                        help="row counts for post-processing/export (default: 1000 10000 100000)")
+    parser.add_argument("--replay", metavar="ARCHIVE",
+                        help="also time a full combined run served from an archive recorded with "
+                             "`combined_scraper.py --record ARCHIVE`")
+    parser.add_argument("--replay-latency", help="seconds per replayed request, or 'recorded'")
+    parser.add_argument("--replay-failures", type=float, help="share of replayed requests that fail")
+    parser.add_argument("--output", help="results JSON path (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float,
+                        help="one allowed regression ratio for every metric (default: per kind)")
+    args = parser.parse_args()
+    if args.only and "e2e" in args.only and not args.replay:
+        parser.error("--only e2e needs --replay ARCHIVE")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    # Read it up front: a rerun on the same commit overwrites its own results file
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    # Everything here runs from fixtures; fail loudly if something tries to fetch
+    socket.create_connection = _no_network
+    socket.socket.connect = _no_network
+
+    groups = args.only or ["scrapers", "matching", "export", "startup"]
+    if args.replay and "e2e" not in groups:
+        groups = groups + ["e2e"]
+    metrics = {}
+    if "scrapers" in groups:
+        print("🧪 Parse + extract")
+        metrics.update(bench_scrapers(args.scrapers))
+    if "matching" in groups:
+        print("🧪 Vertical matching")
+        metrics.update(bench_matching())
+    if "export" in groups:
+        print("🧪 Post-processing + XLSX export")
+        metrics.update(bench_export(args.sizes))
+    over_budget = []
+    if "startup" in groups:
+        print("🧪 Cold-start import time")
+        startup, over_budget = bench_startup()
+        metrics.update(startup)
+    if "e2e" in groups:
+        print(f"🧪 End to end, replaying {args.replay}")
+        metrics.update(bench_e2e(args.replay, args.replay_latency, args.replay_failures))
+
+    commit = _commit()
+    report = {
+        "commit": commit,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} cpus)",
+        "metrics": metrics,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"📊 Results saved as {output}")
+
+    if over_budget:
+        print(f"❌ Over the import-time budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+    if baseline is not None:
+        print(f"📈 Compared with {baseline.get('commit')} ({baseline.get('machine')})")
+        thresholds = THRESHOLDS if args.threshold is None else dict.fromkeys(THRESHOLDS, args.threshold)
+        regressions = compare(metrics, baseline["metrics"], thresholds)
+        if regressions:
+            print(f"❌ {len(regressions)} metric(s) regressed past the threshold")
+            sys.exit(1)
+        print("✅ No regressions past the threshold")
@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+# ======================================================
+# RUN JOURNAL (completed sources, listing pages, detail records)
+# ======================================================
+JOURNAL_PATH = os.path.join("checkpoints", "journal.jsonl")
+
+MISSING = object()
+
+# Nothing is recorded unless a run opened the journal with start_run()
+_lock = threading.Lock()
+_fh = None
+_sources = set()
+_pages = {}
+_details = {}
+
+
+def _key(*parts):
+    return "|".join(str(p) for p in parts)
+
+
+def start_run(resume=False):
+    """Open the journal. With resume=True, earlier progress is loaded instead of discarded."""
+    global _fh
+    _sources.clear()
+    _pages.clear()
+    _details.clear()
+
+    os.makedirs(os.path.dirname(JOURNAL_PATH), exist_ok=True)
+
+    if resume and os.path.exists(JOURNAL_PATH):
+        with open(JOURNAL_PATH, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # half-written last line from a killed run
+                kind = entry.get("kind")
+                if kind == "source":
+                    _sources.add(entry["source"])
+                elif kind == "page":
+                    _pages[_key(entry["source"], entry["page"])] = entry["data"]
+                elif kind == "detail":
+                    _details[_key(entry["source"], entry["key"])] = entry["data"]
+        print(f"♻️ Resuming: {len(_sources)} sources, {len(_pages)} pages, "
+              f"{len(_details)} detail records already done")
+        mode = "a"
+    else:
+        mode = "w"
+
+    _fh = open(JOURNAL_PATH, mode, encoding="utf-8")
+
+
+def finish_run():
+    """The run completed, nothing left to resume."""
+    global _fh
+    with _lock:
+        if _fh is not None:
+            _fh.close()
+            _fh = None
+        if os.path.exists(JOURNAL_PATH):
+            os.remove(JOURNAL_PATH)
+    _sources.clear()
+    _pages.clear()
+    _details.clear()
+
+
+def _append(entry):
+    with _lock:
+        if _fh is None:
+            return  # a timed-out scraper thread outliving its run
+        entry["at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        _fh.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+        _fh.flush()
+        os.fsync(_fh.fileno())
+
+
+# --- sources ---
+def source_done(source):
+    return source in _sources
+
+
+def mark_source_done(source):
+    if _fh is None:
+        return
+    _sources.add(source)
+    _append({"kind": "source", "source": source})
+
+
+# --- listing pages ---
+def get_page(source, page):
+    return _pages.get(_key(source, page), MISSING)
+
+
+def save_page(source, page, data):
+    if _fh is None:
+        return
+    _pages[_key(source, page)] = data
+    _append({"kind": "page", "source": source, "page": page, "data": data})
+
+
+# --- detail records (data may be None for a record that was skipped) ---
+def get_detail(source, key):
+    return _details.get(_key(source, key), MISSING)
+
+
+def save_detail(source, key, data):
+    if _fh is None:
+        return
+    _details[_key(source, key)] = data
+    _append({"kind": "detail", "source": source, "key": key, "data": data})
@@ -0,0 +1,138 @@
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+import telemetry
+
+# ======================================================
+# PER-HOST CIRCUIT BREAKERS
+# ======================================================
+# closed -> (FAILURE_THRESHOLD failures in a row within FAILURE_WINDOW) -> open -> (cooldown)
+# -> half-open: one probe request; success closes the breaker, failure re-opens it for longer.
+# Scrapers retry a page 3 times, so one flaky page alone never trips its host.
+FAILURE_THRESHOLD = 5
+FAILURE_WINDOW = 60.0       # seconds; failures older than this no longer count towards a trip
+COOLDOWN = 120.0            # seconds an open breaker short-circuits requests
+MAX_COOLDOWN = 1800.0       # cooldown doubles on every failed probe, up to this
+
+# Kept with the run journal (cached between CI runs), so a host that was dead last
+# run starts this one half-open: a single probe instead of every retry timing out
+STATE_PATH = os.path.join("checkpoints", "breakers.json")
+
+_lock = threading.Lock()
+_breakers = {}
+_loaded = False
+
+
+class CircuitOpenError(requests.RequestException):
+    """The host's breaker is open; the request was not sent."""
+
+
+def _load():
+    global _loaded
+    _loaded = True
+    try:
+        with open(STATE_PATH, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return
+    for host, entry in saved.items():
+        _breakers[host] = {**_new(), "state": "open", "opened_at": entry["opened_at"],
+                           "cooldown": entry["cooldown"], "failures": entry["failures"]}
+
+
+def _new():
+    return {"state": "closed", "failures": 0, "failed_at": [], "opened_at": 0.0, "cooldown": COOLDOWN,
+            "probing": False, "trips": 0, "short_circuited": 0}
+
+
+def _breaker(host):
+    if not _loaded:
+        _load()
+    breaker = _breakers.get(host)
+    if breaker is None:
+        breaker = _breakers[host] = _new()
+    return breaker
+
+
+def before(url):
+    """Raise CircuitOpenError instead of sending to a host whose breaker is open."""
+    host = urlparse(url).netloc
+    with _lock:
+        breaker = _breaker(host)
+        if breaker["state"] == "closed":
+            return
+        if breaker["state"] == "open" and time.time() - breaker["opened_at"] >= breaker["cooldown"]:
+            breaker["state"] = "half-open"
+        # Half-open lets exactly one probe through at a time
+        if breaker["state"] == "half-open" and not breaker["probing"]:
+            breaker["probing"] = True
+            return
+        breaker["short_circuited"] += 1
+        retry_in = max(0.0, breaker["opened_at"] + breaker["cooldown"] - time.time())
+
+    telemetry.count("short_circuited")
+    raise CircuitOpenError(f"circuit open for {host}, retrying in {retry_in:.0f}s")
+
+
+def release(url):
+    """Give back a probe that before() granted but that was never sent."""
+    with _lock:
+        _breaker(urlparse(url).netloc)["probing"] = False
+
+
+def record(url, status=None, error=None):
+    """A transport error or a 5xx counts against the host; anything else resets it."""
+    host = urlparse(url).netloc
+    failed = error is not None or (status is not None and status >= 500)
+    with _lock:
+        breaker = _breaker(host)
+        probe = breaker["probing"]
+        breaker["probing"] = False
+
+        if not failed:
+            if breaker["state"] != "closed":
+                print(f"🔌 {host} is answering again, circuit closed")
+            breaker.update(state="closed", failures=0, failed_at=[], cooldown=COOLDOWN)
+            return
+
+        now = time.time()
+        breaker["failures"] += 1
+        breaker["failed_at"] = [t for t in breaker["failed_at"] if now - t < FAILURE_WINDOW] + [now]
+        if probe:
+            breaker["cooldown"] = min(MAX_COOLDOWN, breaker["cooldown"] * 2)
+        elif breaker["state"] != "closed" or len(breaker["failed_at"]) < FAILURE_THRESHOLD:
+            return
+        breaker.update(state="open", opened_at=now)
+        breaker["trips"] += 1
+        cooldown = breaker["cooldown"]
+
+    print(f"🔌 Circuit open for {host} after {breaker['failures']} failures, "
+          f"short-circuiting it for {cooldown:.0f}s")
+    telemetry.note("breakers", host=host, failures=breaker["failures"], cooldown_s=cooldown,
+                   opened_at=time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime()))
+
+
+def is_open(url):
+    with _lock:
+        return _breaker(urlparse(url).netloc)["state"] != "closed"
+
+
+def report():
+    """Breaker state per host into the run report; open breakers persist for the next run."""
+    with _lock:
+        still_open = {}
+        for host, breaker in _breakers.items():
+            if breaker["trips"] or breaker["short_circuited"] or breaker["state"] != "closed":
+                telemetry.host_info(host, circuit=breaker["state"], circuit_trips=breaker["trips"],
+                                    short_circuited=breaker["short_circuited"])
+            if breaker["state"] != "closed":
+                still_open[host] = {k: breaker[k] for k in ("opened_at", "cooldown", "failures")}
+
+    os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+    with open(STATE_PATH, "w", encoding="utf-8") as f:
+        json.dump(still_open, f, indent=2)
@@ -1,198 +1,332 @@
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment
+import argparse
+import io
+import os
+import threading
+import time
 from datetime import datetime
 
-# Import all scrapers
-from main_scraper import scrape_ngobox
-from dev import scrape_devnetjobs
-from nasscom import scrape_nasscom
-from wri import fetch_wri_opportunities
-from hcl import scrape_hcl
-from metro import fetch_metro_tenders  # CRITICAL: Metro import added
-
-# ✅ NIUA IMPORT ADDED (NO EXISTING IMPORT REMOVED)
-from niua_tenders import scrape_niua_tenders
-
-# ✅ NEW ANDPURPOSE IMPORT (ADDED ONLY)
-from andpurpose import scrape_andpurpose
-
-
-def run_combined_scraper():
-    # Run NGOBOX
-    print("🔍 Running NGOBOX scraper...")
-    ngobox_df = scrape_ngobox()
-
-    # Run DevNetJobs
-    print("🔍 Running DevNetJobs India scraper...")
-    devnet_df = scrape_devnetjobs()
-    
-    # Run Nasscom
-    print("🔍 Running Nasscom scraper...")
-    nasscom_df = scrape_nasscom()
-
-    # Run WRI
-    print("🔍 Running WRI scraper...")
-    try:
-        wri_data = fetch_wri_opportunities()
-        if wri_data:
-            wri_df = pd.DataFrame(wri_data)
-            wri_df["Source"] = "WRI"
-            wri_df["Type"] = "N/A"
-            wri_df["Deadline"] = pd.NaT
-            wri_df["Days_Left"] = pd.NA
-            wri_df = wri_df.rename(columns={"Clickable_Link": "Clickable_Link"}) if "Clickable_Link" in wri_df.columns else wri_df
-            print(f"  -> WRI scraped {len(wri_df)} items.")
-        else:
-            wri_df = pd.DataFrame()
-            print("⚠️ WRI returned no data.")
-    except Exception as e:
-        print(f"❌ WRI scraper failed: {e}")
-        wri_df = pd.DataFrame()
-
-    # Run HCL
-    print("🔍 Running HCL Foundation scraper...")
-    try:
-        hcl_df = scrape_hcl()
-        if hcl_df.empty:
-            print("⚠️ HCL returned no data.")
-        else:
-            print(f"  -> HCL scraped {len(hcl_df)} items.")
-    except Exception as e:
-        print(f"❌ HCL scraper failed: {e}")
-        hcl_df = pd.DataFrame()
-    
-    # Run Metro Rail Tenders
-    print("🔍 Running Nagpur Metro Rail scraper...")
-    try:
-        metro_df = fetch_metro_tenders()
-        if metro_df.empty:
-            print("⚠️ Nagpur Metro Rail returned no data.")
-        else:
-            print(f"  -> Nagpur Metro Rail scraped {len(metro_df)} items.")
-    except Exception as e:
-        print(f"❌ Nagpur Metro Rail scraper failed: {e}")
-        metro_df = pd.DataFrame()
-
-    # ✅ RUN NIUA SCRAPER (ADDED, NOTHING REMOVED)
-    print("🔍 Running NIUA Tenders scraper...")
-    try:
-        niua_raw_df = scrape_niua_tenders()
-        if niua_raw_df.empty:
-            print("⚠️ NIUA returned no data.")
-            niua_df = pd.DataFrame()
-        else:
-            print(f"  -> NIUA scraped {len(niua_raw_df)} items.")
-            niua_df = pd.DataFrame({
-                "Source": "NIUA",
-                "Type": "Tender",
-                "Title": niua_raw_df["Tender_Title"],
-                "Description": pd.NA,
-                "How_to_Apply": pd.NA,
-                "Matched_Vertical": pd.NA,
-                "Deadline": niua_raw_df["Submission_Deadline"],
-                "Days_Left": pd.NA,
-                "Clickable_Link": niua_raw_df["Tender_Link"]
-            })
-    except Exception as e:
-        print(f"❌ NIUA scraper failed: {e}")
-        niua_df = pd.DataFrame()
-
-    # ✅ RUN ANDPURPOSE SCRAPER (NEW ADDITION ONLY)
-    print("🔍 Running AndPurpose scraper...")
-    try:
-        andpurpose_df = scrape_andpurpose()
-        if andpurpose_df.empty:
-            print("⚠️ AndPurpose returned no data.")
-        else:
-            print(f"  -> AndPurpose scraped {len(andpurpose_df)} items.")
-    except Exception as e:
-        print(f"❌ AndPurpose scraper failed: {e}")
-        andpurpose_df = pd.DataFrame()
-
-    # --- Final Schema Alignment and Merging ---
-    final_columns = [
-        "Source", "Type", "Title", "Description",
-        "How_to_Apply", "Matched_Vertical", "Deadline",
-        "Days_Left", "Clickable_Link"
-    ]
-
-    # Align schemas
-    ngobox_df = ngobox_df.reindex(columns=final_columns)
-    devnet_df = devnet_df.reindex(columns=final_columns)
-    nasscom_df = nasscom_df.reindex(columns=final_columns)
-    wri_df = wri_df.reindex(columns=final_columns)
-    hcl_df = hcl_df.reindex(columns=final_columns)
-    metro_df = metro_df.reindex(columns=final_columns)
-    niua_df = niua_df.reindex(columns=final_columns)
-
-    # ✅ ANDPURPOSE ALIGNMENT (ONLY ADDITION)
-    andpurpose_df = andpurpose_df.reindex(columns=final_columns)
-
-    # Force Nasscom Days_Left blank
-    if "Days_Left" in nasscom_df.columns:
-        nasscom_df["Days_Left"] = pd.NA
-
-    # Merge everything
-    combined_df = pd.concat(
-        [ngobox_df, devnet_df, nasscom_df, wri_df, hcl_df, metro_df, niua_df, andpurpose_df],
-        ignore_index=True
-    )
+import checkpoint
+import circuit
+import deadline
+import dedup
+import fulltext
+import history
+import http_archive
+import pdf_extract
+import politeness
+import profiling
+import relevance
+import telemetry
+import work_queue
+import workbook
+from records import parse_deadlines
+from registry import FINAL_COLUMNS, SOURCES, compact, fetch_source, select_sources, truncate_descriptions
+from snapshots import save_snapshot, load_snapshot
+
+# Sources whose deadlines only exist inside the linked PDF notice
+PDF_SOURCES = ["NIUA", "Nagpur Metro Rail"]
+PDF_WAIT = 90  # seconds to wait for outstanding PDF extraction
+
+EXCEL_PATH = "all_grants.xlsx"
+
+# A scraper still running after this long is abandoned for its snapshot
+SOURCE_TIMEOUT = 900
+
+HYPERLINK_URL = r'(?i)^=HYPERLINK\("([^"]+)"'
+
+
+def fill_from_pdfs(df):
+    mask = df["Source"].isin(PDF_SOURCES) & df["Deadline"].isna()
+    if not mask.any():
+        return df
+
+    urls = df.loc[mask, "Clickable_Link"].tolist()
+    print(f"📄 Reading deadlines from {len(urls)} tender PDFs...")
+    # Never let slow PDFs eat the time the export needs
+    wait = max(0, min(PDF_WAIT, deadline.remaining() - deadline.EXPORT_TIME))
+    results = pdf_extract.collect(urls, timeout=wait)
+    pdf_extract.shutdown()
+
+    from dev import compute_days_left
+
+    filled = 0
+    for idx in df.index[mask]:
+        res = results.get(df.at[idx, "Clickable_Link"])
+        if not res:
+            continue
+        if res.get("Deadline"):
+            df.at[idx, "Deadline"] = res["Deadline"]
+            df.at[idx, "Days_Left"] = compute_days_left(res["Deadline"])
+            filled += 1
+        if res.get("Summary") and (pd.isna(df.at[idx, "Description"]) or not str(df.at[idx, "Description"]).strip()):
+            df.at[idx, "Description"] = res["Summary"]
+
+    print(f"  -> PDF deadlines found for {filled}/{len(urls)} tenders.")
+    return df
+
+
+def run_source(name, fetch, timeout=SOURCE_TIMEOUT):
+    """Run one scraper with a time limit, falling back to its last good snapshot."""
+    result = {}
+    fetch = profiling.wrap(name, fetch)
+
+    def target():
+        with telemetry.source_scope(name), telemetry.span("total"), deadline.source_scope(timeout):
+            try:
+                result["df"] = fetch()
+            except Exception as e:
+                result["error"] = e
+
+    worker = threading.Thread(target=target, name=f"scrape-{name}", daemon=True)
+    worker.start()
+    worker.join(timeout)
+
+    df = result.get("df")
+    if worker.is_alive():
+        reason = f"timed out after {timeout}s"
+        print(f"⏱️ {name} scraper {reason}")
+    elif "error" in result:
+        reason = f"failed: {result['error']}"
+        print(f"❌ {name} scraper {reason}")
+    elif df is None or df.empty:
+        reason = "returned no data"
+        print(f"⚠️ {name} returned no data.")
+    elif "Incomplete" in df and df["Incomplete"].any():
+        # Cut short by the run deadline: usable, but not a last good snapshot
+        df = patch_from_snapshot(name, df)
+        print(f"  -> {name} scraped {len(df)} items ({int(df['Incomplete'].sum())} incomplete).")
+        return df
+    else:
+        print(f"  -> {name} scraped {len(df)} items.")
+        save_snapshot(name, df)
+        return df
+
+    snap, saved_at = load_snapshot(name)
+    telemetry.note("fallbacks", source=name, reason=reason, snapshot_from=saved_at)
+    if snap is not None:
+        print(f"📂 Using last good {name} snapshot from {saved_at} (Rows: {len(snap)})")
+        return snap
+
+    return pd.DataFrame()
+
+
+def patch_from_snapshot(name, df):
+    """Swap incomplete rows for the snapshot's complete copy of the same listing, where it has one."""
+    incomplete = df["Incomplete"]
+    snap, saved_at = load_snapshot(name)
+    if snap is not None and "Clickable_Link" in snap:
+        links = df.loc[incomplete, "Clickable_Link"].astype(str)
+        known = snap[snap["Clickable_Link"].astype(str).isin(links)].drop_duplicates("Clickable_Link")
+        if not known.empty:
+            replaced = incomplete & df["Clickable_Link"].astype(str).isin(known["Clickable_Link"].astype(str))
+            known = known.reindex(columns=df.columns).assign(Incomplete=False)
+            df = compact(pd.concat([df[~replaced], known], ignore_index=True))
+            print(f"📂 {name}: {int(replaced.sum())} incomplete rows taken from the snapshot of {saved_at}")
+
+    left = int(df["Incomplete"].sum())
+    telemetry.count("rows_incomplete", left, source=name)
+    telemetry.note("deadline", source=name, incomplete=left)
+    return df
+
+
+def run_queued(specs, db, workers):
+    """Scrape sources through the shared work queue; {name: fetch callable}."""
+    os.environ[work_queue.QUEUE_ENV] = db
+    if deadline.active():
+        # Spawned and joining workers wind down by the same deadline
+        os.environ[deadline.RUN_UNTIL_ENV] = repr(deadline.until())
+    conn = work_queue.connect(db)
+    batch = f"run-{datetime.now():%Y%m%d%H%M%S}-{os.getpid()}"
+
+    ids = {
+        spec["name"]: work_queue.enqueue(
+            conn, batch, "source", {"key": spec["key"]},
+            visibility=spec["budget"], max_attempts=2
+        )
+        for spec in specs
+    }
+    print(f"📬 Queued {len(ids)} sources on {db} (batch {batch})")
+
+    # Local helpers; more workers on this machine can join with `python work_queue.py worker`
+    procs = work_queue.spawn_workers(db, max(0, workers - 1))
+    # Never past the scrape budget: what isn't done by then comes from snapshots
+    wait = max(0, deadline.scrape_time_left()) if deadline.active() else None
+    results = work_queue.wait_batch(conn, batch, owner=f"combiner:{os.getpid()}", timeout=wait)
+    conn.close()
+
+    for proc in procs:
+        proc.terminate()
+
+    def fetcher(task_id):
+        def fetch():
+            status, df, error = results[task_id]
+            if status in ("pending", "leased"):
+                raise TimeoutError("still queued or running at the run deadline")
+            if status != "done":
+                raise RuntimeError(error or status)
+            return df
+        return fetch
+
+    return {name: fetcher(task_id) for name, task_id in ids.items()}
+
+
+def load_source(spec, selected, queued=None, pending=()):
+    if spec in selected and not checkpoint.source_done(spec["name"]):
+        timeout = deadline.source_timeout(spec, pending or [spec])
+        if timeout <= 0:
+            print(f"⏳ No time left for {spec['label']}, using its snapshot")
+            snap, saved_at = load_snapshot(spec["name"])
+            telemetry.note("fallbacks", source=spec["name"], reason="run deadline", snapshot_from=saved_at)
+            return snap if snap is not None else pd.DataFrame()
+
+        print(f"🔍 Running {spec['label']} scraper...")
+        fetch = (queued or {}).get(spec["name"]) or (lambda: fetch_source(spec))
+        df = run_source(spec["name"], fetch, timeout=timeout)
+        checkpoint.mark_source_done(spec["name"])
+        return df
+
+    if spec in selected:
+        print(f"♻️ {spec['label']} already finished in the interrupted run")
+        snap, _ = load_snapshot(spec["name"])
+        return snap if snap is not None else pd.DataFrame()
+
+    # Not due this run: reuse what the last run collected
+    snap, saved_at = load_snapshot(spec["name"])
+    if snap is None:
+        print(f"⏭️ Skipping {spec['label']} (no snapshot yet)")
+        return pd.DataFrame()
+    print(f"⏭️ Skipping {spec['label']}, using snapshot from {saved_at} (Rows: {len(snap)})")
+    return snap
+
+
+def run_combined_scraper(sources=None, only_stale=False, resume=False, queue=None, workers=1,
+                         time_limit=None):
+    """Scrape and export; with `time_limit` (seconds) the sheet is written within it, come what may."""
+    deadline.start(time_limit)
+    selected = select_sources(sources, only_stale=only_stale)
+    if not selected:
+        print("✅ Every source is fresh, nothing to scrape.")
+        return
+
+    checkpoint.start_run(resume=resume)
+    telemetry.reset()
+
+    queued = None
+    if queue:
+        todo = [spec for spec in selected if not checkpoint.source_done(spec["name"])]
+        queued = run_queued(todo, queue, workers)
+
+    # Sources still to scrape share whatever time the run has left
+    pending = [spec for spec in selected if not checkpoint.source_done(spec["name"])]
+    frames = []
+    for spec in SOURCES.values():
+        frames.append(load_source(spec, selected, queued, pending))
+        if spec in pending:
+            pending.remove(spec)
+
+    with profiling.stage("post_process"):
+        combined_df = combine(frames)
 
     if combined_df.empty:
         print("❌ No data found from any source.")
+        checkpoint.finish_run()
         return
 
-    # 🔥 SENIOR-LEVEL UX & DATA QUALITY FIXES
+    with profiling.stage("export"):
+        write_excel(combined_df)
+        history.record(combined_df)
+    politeness.report()
+    circuit.report()
+    telemetry.write_report()
+    checkpoint.finish_run()
 
-    def clean_clickable_link(link):
-        if pd.isna(link) or str(link).strip() == "":
-            return ""
-        link_str = str(link).strip()
-        if link_str.upper().startswith("=HYPERLINK"):
-            try:
-                start_idx = link_str.find('"') + 1
-                if start_idx > 0:
-                    end_idx = link_str.find('"', start_idx)
-                    if end_idx > start_idx:
-                        return link_str[start_idx:end_idx]
-            except Exception:
-                pass
-        return link_str
-
-    combined_df["Clickable_Link"] = combined_df["Clickable_Link"].apply(clean_clickable_link)
-
-    def truncate_description(desc):
-        if pd.isna(desc) or str(desc).strip() == "":
-            return ""
-        desc_str = str(desc).strip()
-        if len(desc_str) > 300:
-            return desc_str[:300].rstrip() + " ... Read More"
-        return desc_str
-
-    combined_df["Description"] = combined_df["Description"].apply(truncate_description)
-
-    # Filter out expired deadlines
-    if "Days_Left" in combined_df.columns:
-        combined_df["Days_Left"] = pd.to_numeric(combined_df["Days_Left"], errors="coerce")
-        combined_df = combined_df[combined_df["Days_Left"].fillna(999) >= 0]
-
-    # Sort
-    combined_df = combined_df.sort_values(["Days_Left"], ascending=True, na_position="last")
-
-    # Round Days_Left
-    if "Days_Left" in combined_df.columns:
-        combined_df["Days_Left"] = combined_df["Days_Left"].apply(
-            lambda x: int(round(x)) if pd.notna(x) else x
-        )
 
-    # Save Excel
-    excel_path = "all_grants.xlsx"
-    combined_df.to_excel(excel_path, index=False, engine="openpyxl")
+def normalize_links(links):
+    """Plain URLs. Snapshots from before sources emitted URLs still hold =HYPERLINK formulas."""
+    links = links.where(links.notna(), "").astype(str).str.strip()
+    formulas = links.str.startswith("=")
+    if formulas.any():
+        links[formulas] = links[formulas].str.extract(HYPERLINK_URL, expand=False).fillna(links[formulas])
+    return links
+
 
-    # Format Excel
-    wb = load_workbook(excel_path)
-    ws = wb.active
+def combine(frames):
+    # Align every source to the final schema and merge
+    combined_df = pd.concat(
+        [df.reindex(columns=FINAL_COLUMNS) for df in frames], ignore_index=True
+    )
+
+    if combined_df.empty:
+        return combined_df
+
+    # Snapshots from before the flag existed have no Incomplete values
+    combined_df["Incomplete"] = combined_df["Incomplete"].eq(True)
+
+    started = time.perf_counter()
+    rows_in = combined_df["Source"].value_counts()
+
+    # Whole-column string ops and masks only; nothing here runs per row
+    combined_df["Clickable_Link"] = normalize_links(combined_df["Clickable_Link"])
+    # Fresh frames were cut at ingestion; this catches snapshots saved before that
+    combined_df["Description"] = truncate_descriptions(combined_df["Description"])
+
+    # Fill tender deadlines read from the linked PDFs (started in the background by the scrapers)
+    combined_df = fill_from_pdfs(combined_df)
+
+    # Snapshot rows carry the Days_Left of the day they were scraped; recount it
+    days_left = recount_days_left(combined_df)
+
+    # Filter out expired deadlines (unknown deadlines stay)
+    combined_df["Days_Left"] = days_left
+    combined_df = combined_df[days_left.isna() | (days_left >= 0)]
+    rows_out = combined_df["Source"].value_counts()
+
+    # Same opportunity on several sites -> one row keeping every link
+    combined_df["All_Links"] = combined_df["Clickable_Link"]
+    combined_df["Also_Listed_By"] = ""
+    combined_df = dedup.merge_duplicates(combined_df)
+    combined_df = compact(combined_df)
+
+    # How well each listing matches its best vertical, scored over the whole corpus at once
+    combined_df["Relevance"] = relevance.relevance(combined_df)
+
+    # Soonest deadline first, the most relevant first among equal deadlines, then by
+    # link/title so the same data always lands in the same order
+    combined_df = combined_df.sort_values(
+        ["Days_Left", "Relevance", "Clickable_Link", "Title"], ascending=[True, False, True, True],
+        na_position="last", kind="stable"
+    )
+    combined_df["Days_Left"] = combined_df["Days_Left"].round().astype("Int64")
+
+    for source, n in rows_in.items():
+        kept = int(rows_out.get(source, 0))
+        telemetry.count("rows_kept", kept, source=source)
+        telemetry.count("rows_expired", int(n) - kept, source=source)
+    telemetry.add_time("post_process", time.perf_counter() - started, "combined")
+
+    return combined_df
+
+
+def build_workbook(combined_df, fingerprint):
+    """The formatted .xlsx as bytes, identical for identical data."""
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        combined_df.to_excel(writer, index=False)
+        wb = writer.book
+        ws = wb.active
+        format_sheet(ws)
+        # Live Days_Left: the file stays correct on later days without being rewritten
+        column = combined_df.columns.get_loc("Days_Left") + 1
+        for row, formula in enumerate(workbook.days_left_formulas(combined_df), start=2):
+            if formula is not None:
+                ws.cell(row=row, column=column).value = formula
+        wb.properties.identifier = workbook.FINGERPRINT_PREFIX + fingerprint
+    return workbook.normalize_zip(buffer.getvalue())
+
+
+def format_sheet(ws):
+    from openpyxl.styles import Alignment
 
     col_widths = {
         "A": 15,
@@ -204,6 +338,10 @@ def run_combined_scraper():
         "G": 18,
         "H": 12,
         "I": 60,
+        "J": 60,
+        "K": 25,
+        "L": 12,
+        "M": 10,
     }
 
     for col, width in col_widths.items():
@@ -211,19 +349,160 @@ def run_combined_scraper():
 
     for row in ws.iter_rows(min_row=2):
         for cell in row:
-            if cell.column_letter in ["D", "E"]:
+            if cell.column_letter in ["D", "E", "J"]:
                 cell.alignment = Alignment(wrap_text=True, vertical="top")
             else:
                 cell.alignment = Alignment(wrap_text=False, vertical="top")
 
-    wb.save(excel_path)
+
+def recount_days_left(df, today=None):
+    """Days_Left from each parseable Deadline as of today (UTC); other rows keep theirs."""
+    today = today or pd.Timestamp.now(tz="UTC").normalize().tz_localize(None)
+    deadlines = parse_deadlines(df["Deadline"])
+    stored = pd.to_numeric(df["Days_Left"], errors="coerce")
+    return (deadlines.dt.normalize() - today).dt.days.where(deadlines.notna(), stored)
+
+
+def write_excel(combined_df, excel_path=EXCEL_PATH):
+    """Write the sheet only when the dataset changed, and record what changed."""
+    started = time.perf_counter()
+
+    fingerprint = workbook.fingerprint(combined_df)
+    out_dir = os.path.dirname(excel_path)
+    json_path = os.path.join(out_dir, workbook.JSON_PATH)
+    written = workbook.stored_fingerprint(excel_path) != fingerprint or not os.path.exists(json_path)
+    if written:
+        summary = workbook.diff(workbook.read_previous(excel_path), combined_df)
+        workbook.write_atomic(excel_path, build_workbook(combined_df, fingerprint))
+        workbook.write_atomic(json_path, workbook.to_json(combined_df, fingerprint))
+    else:
+        summary = {"added": 0, "removed": 0, "changed": 0, "baseline": True}
+    summary.update(fingerprint=fingerprint, written=written)
+    workbook.write_diff(summary, os.path.join(out_dir, workbook.DIFF_PATH))
+    telemetry.note("dataset", **{k: summary[k] for k in ("fingerprint", "written", "added", "removed", "changed")})
+    telemetry.add_time("export", time.perf_counter() - started, "combined")
 
     # Print summary
     print("\n📊 Summary of scraped data:")
     print(combined_df["Source"].value_counts())
     print(f"Total rows in final dataset: {len(combined_df)}")
-    print(f"✅ Combined Excel saved as {excel_path} (Rows: {len(combined_df)})")
+    print(f"🧮 Since the last sheet: +{summary['added']} new, -{summary['removed']} gone, "
+          f"~{summary['changed']} changed")
+    if written:
+        print(f"✅ Combined Excel saved as {excel_path} (Rows: {len(combined_df)})")
+    else:
+        print(f"✅ Dataset unchanged, {excel_path} left as it was (Rows: {len(combined_df)})")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape every source into all_grants.xlsx")
+    parser.add_argument(
+        "--sources",
+        help="comma-separated source keys or names to scrape (e.g. ngobox,devnetjobs); "
+             "the rest are taken from their last snapshot"
+    )
+    parser.add_argument(
+        "--only-stale", action="store_true",
+        help="only scrape sources whose refresh interval has passed"
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="continue an interrupted run, skipping sources, pages and details it already finished"
+    )
+    parser.add_argument(
+        "--daemon", action="store_true",
+        help="keep running and refresh each source on its own interval"
+    )
+    parser.add_argument(
+        "--queue", metavar="DB",
+        help="shard the run over the SQLite work queue DB (on a local disk); more workers "
+             "on the same machine can join with `python work_queue.py worker --db DB`"
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="profile the whole run (cProfile per source/stage + sampled flamegraph stacks in profiles/)"
+    )
+    parser.add_argument(
+        "--profile-source", metavar="NAME",
+        help="profile just this scraper; unless --sources is given only it is scraped"
+    )
+    parser.add_argument(
+        "--trace-memory", action="store_true",
+        help="record tracemalloc peak memory per source and stage in the run report"
+    )
+    traffic = parser.add_mutually_exclusive_group()
+    traffic.add_argument(
+        "--record", metavar="ARCHIVE",
+        help="save every HTTP exchange (postbacks and PDFs included) to this archive"
+    )
+    traffic.add_argument(
+        "--replay", metavar="ARCHIVE",
+        help="serve every request from a recorded archive instead of the network"
+    )
+    parser.add_argument(
+        "--replay-latency", default=None,
+        help="with --replay: seconds to wait per request, or 'recorded' for the original timings"
+    )
+    parser.add_argument(
+        "--replay-failures", type=float, default=None,
+        help="with --replay: share of requests that fail (connection error, timeout or 503)"
+    )
+    parser.add_argument(
+        "--replay-seed", type=int, default=None,
+        help="with --replay: seed for the injected failures"
+    )
+    parser.add_argument(
+        "--deadline", type=float, metavar="MINUTES",
+        help="finish the whole run, export included, within this many minutes; sources share the "
+             "time and whatever is cut short is flagged Incomplete or taken from its snapshot"
+    )
+    parser.add_argument(
+        "--full-text", metavar="DB",
+        help="keep full descriptions in this SQLite side store (the sheet only gets a summary)"
+    )
+    parser.add_argument(
+        "--history", metavar="DB",
+        help=f"record every published listing and its versions here (default: {history.DEFAULT_DB})"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=3,
+        help="sources scraped in parallel in --daemon mode, local worker processes with --queue"
+    )
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    run_combined_scraper()
+    args = parse_args()
+    sources = args.sources.split(",") if args.sources else None
+
+    profile_source = None
+    if args.profile_source:
+        profile_source = select_sources([args.profile_source])[0]["name"]
+        sources = sources or [profile_source]
+    profiling.configure(profile=args.profile, source=profile_source, trace_memory=args.trace_memory)
+
+    if args.full_text:
+        fulltext.configure(args.full_text)
+    if args.history:
+        history.configure(args.history)
+
+    if args.record:
+        http_archive.configure("record", args.record)
+    elif args.replay:
+        http_archive.configure(
+            "replay", args.replay, latency=args.replay_latency,
+            failures=args.replay_failures, seed=args.replay_seed
+        )
+
+    if args.daemon:
+        from scheduler import run_daemon
+        run_daemon(sources=sources, workers=args.workers)
+    else:
+        try:
+            run_combined_scraper(
+                sources=sources, only_stale=args.only_stale, resume=args.resume,
+                queue=args.queue, workers=args.workers,
+                time_limit=args.deadline * 60 if args.deadline else None
+            )
+        finally:
+            profiling.finish()
@@ -0,0 +1,86 @@
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+
+# ======================================================
+# RUN DEADLINE (--deadline), SPLIT ACROSS SOURCES
+# ======================================================
+RESERVE = 180          # seconds always kept for PDFs, post-processing and the export
+EXPORT_TIME = 60       # ...of which this much is never spent waiting on PDFs
+MIN_SHARE = 30         # a source that starts gets at least this long
+WIND_DOWN = 0.2        # last share of a source's slot: no new detail fetches, finish what's in flight
+MAX_WIND_DOWN = 90
+
+# Queue workers are separate processes: they pick the run's deadline up from here
+RUN_UNTIL_ENV = "SCRAPER_RUN_UNTIL"
+
+_run_until = None
+_stop_scheduling_at = contextvars.ContextVar("deadline_stop_scheduling_at", default=None)
+
+
+def start(total_seconds):
+    """Give this run `total_seconds` end to end; None means no deadline."""
+    global _run_until
+    _run_until = time.time() + total_seconds if total_seconds else None
+    if _run_until:
+        print(f"⏳ Run deadline in {total_seconds / 60:.0f} min "
+              f"(sources share {max(0, total_seconds - RESERVE) / 60:.0f} min)")
+
+
+def start_at(run_until):
+    """Share a deadline set by another process (epoch seconds)."""
+    global _run_until
+    _run_until = run_until
+
+
+def until():
+    return _run_until
+
+
+def active():
+    return _run_until is not None
+
+
+def remaining():
+    """Seconds until the whole run must be done (inf without a deadline)."""
+    return float("inf") if _run_until is None else _run_until - time.time()
+
+
+def scrape_time_left():
+    """Seconds left for scraping, the export reserve already taken off."""
+    return remaining() - RESERVE
+
+
+def source_timeout(spec, pending):
+    """This source's slot: the scrape time left, split by budget over it and the sources after it."""
+    if not active():
+        return spec["budget"]
+    left = scrape_time_left()
+    if left <= 0:
+        return 0
+    weight = spec["budget"] / sum(s["budget"] for s in pending)
+    return min(spec["budget"], max(MIN_SHARE, left * weight), left)
+
+
+@contextmanager
+def source_scope(timeout):
+    """Within this block, out_of_time() turns True once the slot's wind-down begins."""
+    if not active():
+        yield
+        return
+    wind_down = min(MAX_WIND_DOWN, timeout * WIND_DOWN)
+    token = _stop_scheduling_at.set(time.time() + timeout - wind_down)
+    try:
+        yield
+    finally:
+        _stop_scheduling_at.reset(token)
+
+
+def out_of_time():
+    """True when no new detail fetch should be started."""
+    if not active():
+        return False
+    stop_at = _stop_scheduling_at.get()
+    now = time.time()
+    return (stop_at is not None and now >= stop_at) or now >= _run_until - RESERVE
@@ -0,0 +1,257 @@
+import re
+import zlib
+from collections import defaultdict
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+import telemetry
+from records import parse_deadlines
+
+# ======================================================
+# CROSS-SOURCE NEAR-DUPLICATES (MinHash + LSH banding)
+# ======================================================
+NUM_PERM = 64
+BANDS = 16             # 16 bands x 4 rows: pairs above ~0.5 Jaccard become candidates
+ROWS = NUM_PERM // BANDS
+BLOCK = 256            # rows hashed per numpy batch (keeps the shingle x perm matrix in cache)
+MAX_BUCKET = 50        # a bucket this full is boilerplate, not one opportunity
+
+TITLE_SAME = 0.85      # titles this similar are the same listing...
+TITLE_CLOSE = 0.5      # ...or this similar when the descriptions also agree
+DESC_SAME = 0.6
+DESC_WORDS = 80
+
+# Multiply-shift hashing: (a*x + b) mod 2^64, top 32 bits. No slow integer modulo.
+_rng = np.random.RandomState(20240601)
+_A = _rng.randint(0, np.iinfo(np.uint64).max, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.randint(0, np.iinfo(np.uint64).max, NUM_PERM, dtype=np.uint64)
+_MIX = _rng.randint(0, np.iinfo(np.uint64).max, ROWS, dtype=np.uint64) | np.uint64(1)
+EMPTY = np.iinfo(np.uint32).max
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Procurement boilerplate each site words differently; says nothing about which call it is
+_TITLE_NOISE = re.compile(
+    r"\b(request for proposals?|call for proposals?|expression of interest|invitation for|"
+    r"terms of reference|rfp|rfq|eoi|tor|for|of|in|the|and|a|an|to|at|on)\b"
+)
+
+# Words that tell two otherwise identical calls apart: numbers and years, phase
+# numerals, evaluation rounds and places. Both titles must carry exactly the same ones
+PLACES = (
+    "andhra pradesh", "arunachal pradesh", "assam", "bihar", "chhattisgarh", "goa", "gujarat",
+    "haryana", "himachal pradesh", "jharkhand", "karnataka", "kerala", "madhya pradesh",
+    "maharashtra", "manipur", "meghalaya", "mizoram", "nagaland", "odisha", "orissa", "punjab",
+    "rajasthan", "sikkim", "tamil nadu", "telangana", "tripura", "uttar pradesh", "uttarakhand",
+    "west bengal", "andaman", "chandigarh", "delhi", "jammu", "kashmir", "ladakh", "lakshadweep",
+    "puducherry", "mumbai", "kolkata", "chennai", "bengaluru", "bangalore", "hyderabad", "pune",
+    "ahmedabad", "surat", "jaipur", "lucknow", "kanpur", "nagpur", "indore", "bhopal", "patna",
+    "bhubaneswar", "guwahati", "ranchi", "raipur", "dehradun", "shimla", "srinagar", "visakhapatnam",
+    "kochi", "thiruvananthapuram", "coimbatore", "madurai", "varanasi", "agra", "nashik", "thane",
+    "india", "nepal", "bangladesh", "sri lanka", "bhutan", "myanmar", "pakistan", "afghanistan",
+    "kenya", "uganda", "ethiopia", "nigeria", "indonesia", "philippines", "vietnam", "cambodia",
+)
+_IDENTITY = re.compile(
+    r"\b(\d+|i{1,3}|iv|vi{0,3}|ix|x|baseline|midline|endline|midterm|mid term|interim|final|"
+    + "|".join(PLACES) + r")\b"
+)
+
+
+def _words(text):
+    if text is None or (not isinstance(text, str) and pd.isna(text)):
+        return []
+    return _WORD.findall(str(text).lower())
+
+
+def title_shingles(title):
+    # Character 5-grams survive plurals, typos and reordered punctuation
+    s = " ".join(_words(_TITLE_NOISE.sub(" ", " ".join(_words(title)))))
+    return {zlib.crc32(s[i:i + 5].encode()) for i in range(max(len(s) - 4, 0))}
+
+
+def title_identity(title):
+    """Numbers, phase numerals, evaluation rounds and places named in a title."""
+    return frozenset(_IDENTITY.findall(" ".join(_words(title))))
+
+
+def description_shingles(description):
+    words = _words(description)[:DESC_WORDS]
+    return {zlib.crc32(" ".join(words[i:i + 3]).encode()) for i in range(max(len(words) - 2, 0))}
+
+
+def signatures(texts, shingle):
+    """(rows, NUM_PERM) MinHash matrix; all-EMPTY rows had nothing to hash."""
+    # Hash each distinct text once (empty descriptions, re-posted listings)
+    codes, uniques = pd.factorize(pd.Series(texts, dtype=object), use_na_sentinel=False)
+    sigs = _minhash([shingle(text) for text in uniques])
+    return sigs[codes]
+
+
+def _minhash(shingle_sets):
+    sigs = np.full((len(shingle_sets), NUM_PERM), EMPTY, dtype=np.uint32)
+    for start in range(0, len(shingle_sets), BLOCK):
+        block = shingle_sets[start:start + BLOCK]
+        rows = [i for i, s in enumerate(block) if s]
+        if not rows:
+            continue
+        lengths = np.array([len(block[i]) for i in rows])
+        hashes = np.fromiter(chain.from_iterable(block[i] for i in rows), dtype=np.uint64, count=lengths.sum())
+        # Every shingle under every permutation at once, then min per row
+        permuted = ((hashes[:, None] * _A + _B) >> np.uint64(32)).astype(np.uint32)
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        sigs[start + np.array(rows)] = np.minimum.reduceat(permuted, offsets, axis=0)
+    return sigs
+
+
+def candidate_pairs(sigs):
+    """(n, 2) array of row pairs sharing at least one LSH band."""
+    usable = np.flatnonzero(sigs[:, 0] != EMPTY)
+    groups = set()
+    for band in range(BANDS):
+        # One 64-bit bucket id per row for this band (wrapping arithmetic is fine for hashing)
+        keys = (sigs[usable, band * ROWS:(band + 1) * ROWS].astype(np.uint64) * _MIX).sum(axis=1)
+        order = np.argsort(keys, kind="stable")
+        starts = np.flatnonzero(np.r_[True, keys[order][1:] != keys[order][:-1]])
+        sizes = np.diff(np.r_[starts, len(order)])
+        for start, size in zip(starts[(sizes > 1) & (sizes <= MAX_BUCKET)],
+                               sizes[(sizes > 1) & (sizes <= MAX_BUCKET)]):
+            # The same bucket shows up in most bands; keep each member set once.
+            # Stable argsort leaves members in row order already.
+            groups.add(usable[order[start:start + size]].tobytes())
+
+    pairs = [np.empty((0, 2), dtype=np.int64)]
+    for group in groups:
+        members = np.frombuffer(group, dtype=usable.dtype)
+        i, j = np.triu_indices(len(members), 1)
+        pairs.append(np.column_stack((members[i], members[j])))
+    return _unique_pairs(np.concatenate(pairs))
+
+
+def _unique_pairs(pairs):
+    # 1-D unique on a*n + b is far cheaper than unique(axis=0)
+    if not len(pairs):
+        return pairs
+    n = int(pairs.max()) + 1
+    codes = np.unique(pairs[:, 0] * n + pairs[:, 1])
+    return np.column_stack((codes // n, codes % n))
+
+
+def _similarity(sigs, a, b):
+    """Estimated Jaccard per pair, NaN where either side had nothing to hash."""
+    sims = np.empty(len(a))
+    for start in range(0, len(a), BLOCK * 10):
+        sl = slice(start, start + BLOCK * 10)
+        sims[sl] = (sigs[a[sl]] == sigs[b[sl]]).mean(axis=1)
+    sims[(sigs[a, 0] == EMPTY) | (sigs[b, 0] == EMPTY)] = np.nan
+    return sims
+
+
+def find_clusters(df):
+    """Lists of row positions that are one opportunity listed by different sources."""
+    titles = signatures(df["Title"], title_shingles)
+    descriptions = signatures(df["Description"], description_shingles)
+    sources = df["Source"].astype(str).tolist()
+    source_codes = pd.factorize(df["Source"].astype(str))[0]
+    deadlines = parse_deadlines(df["Deadline"])
+    deadlines = deadlines.to_numpy(dtype="datetime64[ns]")
+    identities = pd.factorize(pd.Series([title_identity(t) for t in df["Title"]], dtype=object))[0]
+
+    pairs = np.concatenate((candidate_pairs(titles), candidate_pairs(descriptions)))
+    if not len(pairs):
+        return []
+    pairs = _unique_pairs(pairs)
+    a, b = pairs[:, 0], pairs[:, 1]
+
+    # Different sources, the same known deadline (an unknown one proves nothing) and the
+    # same year / phase / round / place: never the same call in another round or state
+    keep = source_codes[a] != source_codes[b]
+    keep &= ~np.isnat(deadlines[a]) & ~np.isnat(deadlines[b]) & (deadlines[a] == deadlines[b])
+    keep &= identities[a] == identities[b]
+    a, b = a[keep], b[keep]
+
+    title_sim = np.nan_to_num(_similarity(titles, a, b))
+    desc_sim = np.nan_to_num(_similarity(descriptions, a, b))
+    same = (title_sim >= TITLE_SAME) | ((title_sim >= TITLE_CLOSE) & (desc_sim >= DESC_SAME))
+
+    parent = list(range(len(df)))
+    members = {}
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for x, y in zip(a[same].tolist(), b[same].tolist()):
+        rx, ry = root(x), root(y)
+        if rx == ry:
+            continue
+        sx = members.get(rx, {sources[rx]})
+        sy = members.pop(ry, {sources[ry]})
+        # Never fold two listings of the same source together through a third
+        if sx & sy:
+            members[rx] = sx
+            members[ry] = sy
+            continue
+        parent[ry] = rx
+        members[rx] = sx | sy
+
+    clusters = defaultdict(list)
+    for i in range(len(df)):
+        clusters[root(i)].append(i)
+    return [rows for rows in clusters.values() if len(rows) > 1]
+
+
+def _filled(value):
+    return not (value is None or (not isinstance(value, str) and pd.isna(value)) or str(value).strip() in ("", "N/A"))
+
+
+def merge_duplicates(df):
+    """One row per cluster: the most complete listing, with every link; the other sites go to Also_Listed_By."""
+    if len(df) < 2:
+        return df
+
+    clusters = find_clusters(df)
+    if not clusters:
+        return df
+
+    # Merged Matched_Vertical / Also_Listed_By values are new labels; plain objects take them
+    df = df.astype({c: object for c in ("Matched_Vertical", "Also_Listed_By")
+                    if c in df and isinstance(df[c].dtype, pd.CategoricalDtype)})
+    columns = list(df.columns)
+    drop = []
+    for rows in clusters:
+        records = [df.iloc[i] for i in rows]
+        best = max(range(len(rows)), key=lambda k: (
+            sum(_filled(records[k][c]) for c in columns),
+            len(str(records[k]["Description"])) if _filled(records[k]["Description"]) else 0,
+        ))
+        keep = df.index[rows[best]]
+
+        # Fill gaps in the kept listing from the others
+        for column in columns:
+            if not _filled(df.at[keep, column]):
+                for record in records:
+                    if _filled(record[column]):
+                        df.at[keep, column] = record[column]
+                        break
+
+        # Source stays the kept listing's own site
+        others = dict.fromkeys(str(r["Source"]) for r in records)
+        others.pop(str(df.at[keep, "Source"]), None)
+        df.at[keep, "Also_Listed_By"] = ", ".join(others)
+        verticals = chain.from_iterable(str(r["Matched_Vertical"]).split(", ") for r in records if _filled(r["Matched_Vertical"]))
+        df.at[keep, "Matched_Vertical"] = ", ".join(dict.fromkeys(verticals)) or df.at[keep, "Matched_Vertical"]
+        links = chain.from_iterable(str(r["All_Links"]).split("\n") for r in records if _filled(r["All_Links"]))
+        df.at[keep, "All_Links"] = "\n".join(dict.fromkeys(link for link in links if link))
+
+        for k, i in enumerate(rows):
+            if k != best:
+                drop.append(df.index[i])
+                telemetry.count("rows_merged", source=str(records[k]["Source"]))
+
+    telemetry.count("duplicate_clusters", len(clusters), source="combined")
+    print(f"🧬 Merged {len(drop)} cross-source duplicates into {len(clusters)} listings")
+    return df.drop(index=drop)
@@ -1,11 +1,20 @@
 import json
 import re
-import time
+import threading
 import requests
 import pandas as pd
 from bs4 import BeautifulSoup
 from datetime import datetime
 
+import checkpoint
+import deadline as run_deadline
+import http_client
+import pipeline
+import telemetry
+from records import Opportunity, build_frame
+
+SOURCE = "DevNetJobsIndia"
+
 LISTING_URL = "https://www.devnetjobsindia.org/rfp_assignments.aspx"
 DETAIL_URL = "https://www.devnetjobsindia.org/JobDescription.aspx?Job_Id={jobid}"
 
@@ -97,18 +106,26 @@ def simulate_postback(session: requests.Session, hidden: dict, event_target: str
 # --------------------------
 # Extractors
 # --------------------------
-def fetch_detail_page(session: requests.Session, link: str) -> str:
+def fetch_detail_html(session: requests.Session, link: str) -> str:
     if not link:
         return ""
     try:
         resp = session.get(link, headers=HEADERS, timeout=30, verify=False)
         resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-        return soup.get_text("\n", strip=True)
+        return resp.text
     except Exception as e:
         print(f"⚠️ Failed to fetch detail page {link}: {e}")
         return ""
 
+def detail_text(html: str) -> str:
+    if not html:
+        return ""
+    soup = BeautifulSoup(html, "html.parser")
+    return soup.get_text("\n", strip=True)
+
+def fetch_detail_page(session: requests.Session, link: str) -> str:
+    return detail_text(fetch_detail_html(session, link))
+
 def extract_how_to_apply(full_desc: str) -> str:
     if not full_desc:
         return "N/A"
@@ -156,6 +173,7 @@ def extract_how_to_apply(full_desc: str) -> str:
 
     return "\n\n".join(matched_sections).strip() or "N/A"
 
+@telemetry.timed("parse")
 def extract_rows(html: str):
     soup = BeautifulSoup(html, "html.parser")
     return soup.select("tr.gridRow, tr.gridAltRow")
@@ -175,69 +193,120 @@ def extract_event_target_from_href(href: str) -> str:
     m = re.search(r"__doPostBack\('([^']+)'", href)
     return m.group(1) if m else ""
 
-def extract_assignments(session: requests.Session, html: str, hidden: dict, verticals: dict):
-    results = []
-    for row in extract_rows(html):
-        a_title = row.select_one("a[id*='lnkJobTitle']")
-        title = normalize_text(a_title.get_text(strip=True) if a_title else "")
+def read_grid_row(row) -> dict:
+    a_title = row.select_one("a[id*='lnkJobTitle']")
+    title = normalize_text(a_title.get_text(strip=True) if a_title else "")
+
+    org = normalize_text(row.select_one("span[id*='lblJobCo']").get_text(strip=True) if row.select_one("span[id*='lblJobCo']") else "")
+    loc_text = normalize_text(row.select_one("span[id*='lblLocation']").get_text(strip=True) if row.select_one("span[id*='lblLocation']") else "")
+    location = normalize_text(re.sub(r"^Location:\s*", "", loc_text, flags=re.I))
 
-        org = normalize_text(row.select_one("span[id*='lblJobCo']").get_text(strip=True) if row.select_one("span[id*='lblJobCo']") else "")
-        loc_text = normalize_text(row.select_one("span[id*='lblLocation']").get_text(strip=True) if row.select_one("span[id*='lblLocation']") else "")
-        location = normalize_text(re.sub(r"^Location:\s*", "", loc_text, flags=re.I))
+    deadline_text = normalize_text(row.select_one("span[id*='lblApplyDate']").get_text(strip=True) if row.select_one("span[id*='lblApplyDate']") else "")
+    deadline = normalize_text(re.sub(r"^Apply by:\s*", "", deadline_text, flags=re.I))
 
-        deadline_text = normalize_text(row.select_one("span[id*='lblApplyDate']").get_text(strip=True) if row.select_one("span[id*='lblApplyDate']") else "")
-        deadline = normalize_text(re.sub(r"^Apply by:\s*", "", deadline_text, flags=re.I))
+    return {
+        "title": title,
+        "org": org,
+        "location": location,
+        "deadline": deadline,
+        "link": build_link_from_logo(row),
+        "event_target": extract_event_target_from_href(a_title.get("href", "")) if a_title else "",
+    }
+
+def extract_assignments(session: requests.Session, html: str, hidden: dict, verticals: dict):
+    pending = []
+    for row in extract_rows(html):
+        fields = read_grid_row(row)
+        title, org, location, deadline = fields["title"], fields["org"], fields["location"], fields["deadline"]
 
         base_description = " | ".join([p for p in [org, location] if p])
-        matched_verticals = match_verticals(f"{title} {base_description}", verticals)
+        with telemetry.span("match"):
+            matched_verticals = match_verticals(f"{title} {base_description}", verticals)
         if not matched_verticals:
+            telemetry.count("rows_unmatched")
+            continue
+
+        record_key = f"{title}|{org}|{deadline}"
+        done = checkpoint.get_detail(SOURCE, record_key)
+        if done is not checkpoint.MISSING:
+            if done:
+                yield done
             continue
 
-        link = build_link_from_logo(row)
-        if not link and a_title:
-            event_target = extract_event_target_from_href(a_title.get("href", ""))
-            if event_target:
-                link = simulate_postback(session, hidden, event_target)
-                time.sleep(0.6)
+        link = fields["link"]
+        if not link and fields["event_target"] and not run_deadline.out_of_time():
+            link = simulate_postback(session, hidden, fields["event_target"])
 
         if not link:
+            checkpoint.save_detail(SOURCE, record_key, None)
             continue
 
-        full_desc = fetch_detail_page(session, link)
-        description = f"{base_description}\n\n{full_desc}" if full_desc else base_description
-        how_to_apply = extract_how_to_apply(full_desc)
-
-        results.append({
-            "Title": title,
-            "Description": description,
-            "How_to_Apply": how_to_apply,
-            "Deadline": format_deadline(deadline),
-            "Days_Left": compute_days_left(deadline),
-            "Matched_Vertical": ", ".join(sorted(set(matched_verticals))),
-            "Clickable_Link": '=HYPERLINK("{}","{}")'.format(link.replace('"', '""'), title.replace('"', '""'))
-        })
-    return results
+        # Postbacks above need the session in order; detail pages are fetched below
+        pending.append((record_key, link, (title, base_description, deadline, matched_verticals, link)))
+
+    # requests.Session isn't thread-safe: the postbacks keep `session`, each download
+    # thread gets its own, carrying the cookies the listing and postbacks left behind
+    local, opened = threading.local(), []
+
+    def fetch(link):
+        detail_session = getattr(local, "session", None)
+        if detail_session is None:
+            detail_session = local.session = http_client.Session()
+            detail_session.cookies.update(session.cookies)
+            opened.append(detail_session)
+        return fetch_detail_html(detail_session, link)
+
+    # Downloads overlap with parsing on the other cores; rows come out as they're parsed
+    rows = pipeline.iter_fetch_and_parse(
+        [(link, parse_args) for _, link, parse_args in pending],
+        fetch, build_assignment, io_workers=2
+    )
+    try:
+        for (record_key, _, parse_args), row in zip(pending, rows):
+            if row is pipeline.FAILED:
+                continue
+            if row is pipeline.SKIPPED:
+                # Out of time: the grid row alone, flagged (and not checkpointed)
+                row = build_assignment("", *parse_args)
+                row["Incomplete"] = True
+                yield row
+                continue
+            checkpoint.save_detail(SOURCE, record_key, row)
+            if row:
+                yield row
+    finally:
+        for detail_session in opened:
+            detail_session.close()
+
+def build_assignment(html, title, base_description, deadline, matched_verticals, link):
+    full_desc = detail_text(html)
+    description = f"{base_description}\n\n{full_desc}" if full_desc else base_description
+    how_to_apply = extract_how_to_apply(full_desc)
+
+    return {
+        "Title": title,
+        "Description": description,
+        "How_to_Apply": how_to_apply,
+        "Deadline": format_deadline(deadline),
+        "Days_Left": compute_days_left(deadline),
+        "Matched_Vertical": ", ".join(sorted(set(matched_verticals))),
+        "Clickable_Link": link
+    }
 
 # --------------------------
 # Main
 # --------------------------
-def scrape_devnetjobs():
+def iter_devnetjobs():
     verticals = load_verticals("keywords.json")
-    session = requests.Session()
+    session = http_client.Session()
     resp = session.get(LISTING_URL, headers=HEADERS, timeout=30, verify=False)
     resp.raise_for_status()
     hidden = get_hidden_fields(resp.text)
-    rows = extract_assignments(session, resp.text, hidden, verticals)
+    for row in extract_assignments(session, resp.text, hidden, verticals):
+        yield Opportunity.from_row(row, Source=SOURCE, Type="")
 
-    if not rows:
-        return pd.DataFrame()
-
-    df = pd.DataFrame(rows)
-    df["Source"] = "DevNetJobsIndia"
-    df["Type"] = ""
-    df = df[["Source", "Type", "Title", "Description", "How_to_Apply",
-             "Matched_Vertical", "Deadline", "Days_Left", "Clickable_Link"]]
-    return df
+def scrape_devnetjobs():
+    return build_frame(iter_devnetjobs())
 
 if __name__ == "__main__":
     print(scrape_devnetjobs().head())
@@ -0,0 +1,75 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+# ======================================================
+# FULL-TEXT SIDE STORE (opt-in with --full-text)
+# ======================================================
+# Descriptions are cut to a summary as each source is ingested; the page text
+# behind them only survives here, keyed by link, when a run asks for it.
+FULLTEXT_ENV = "SCRAPER_FULLTEXT_DB"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS texts (
+    link      TEXT PRIMARY KEY,
+    source    TEXT NOT NULL,
+    body      BLOB NOT NULL,      -- zlib
+    size      INTEGER NOT NULL,
+    saved_at  REAL NOT NULL
+);
+"""
+
+_lock = threading.Lock()
+
+
+def configure(path):
+    """Keep full descriptions in `path` for every source ingested from now on."""
+    os.environ[FULLTEXT_ENV] = path
+    print(f"🗄️ Keeping full descriptions in {path}")
+
+
+def store_path():
+    return os.environ.get(FULLTEXT_ENV) or None
+
+
+def connect(path=None):
+    conn = sqlite3.connect(path or store_path(), timeout=60, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def spill(source, links, texts):
+    """Store each (link, text) pair; returns how many were written."""
+    now = time.time()
+    rows = [
+        (link, source, zlib.compress(text.encode("utf-8"), 6), len(text), now)
+        for link, text in zip(links, texts)
+        if isinstance(link, str) and link and isinstance(text, str) and text
+    ]
+    if not rows:
+        return 0
+    with _lock:
+        conn = connect()
+        try:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT OR REPLACE INTO texts (link, source, body, size, saved_at) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+    return len(rows)
+
+
+def load(link, path=None):
+    """Full description stored for `link`, None if it was never spilled."""
+    conn = connect(path)
+    try:
+        row = conn.execute("SELECT body FROM texts WHERE link = ?", (link,)).fetchone()
+    finally:
+        conn.close()
+    return zlib.decompress(row[0]).decode("utf-8") if row else None
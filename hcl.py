@@ -1,9 +1,12 @@
-import requests
 import pandas as pd
 from bs4 import BeautifulSoup
 from datetime import datetime, date
 import re
 
+import http_client
+import telemetry
+from records import Opportunity, build_frame
+
 # Embedded keywords (previously in keywords.json)
 keywords = {
     "Governance": [
@@ -39,87 +42,91 @@ priority = ["Governance", "Learning", "Safety", "Climate"]
 URL = "https://www.hclfoundation.org/work-with-us"
 HEADERS = {"User-Agent": "Mozilla/5.0"}
 
-def scrape_hcl():
+def parse_hcl_page(html):
+    """Opportunity rows from the work-with-us page html (no network)."""
     listings = []
 
-    try:
-        res = requests.get(URL, headers=HEADERS, timeout=10, verify=False)
-        res.raise_for_status()
-        soup = BeautifulSoup(res.text, "html.parser")
+    with telemetry.span("parse"):
+        soup = BeautifulSoup(html, "html.parser")
 
-        # Find all rows in the opportunities table
-        rows = soup.find_all("tr")
-        for row in rows:
-            title_td = row.find("td", class_="views-field-field-job-title")
-            link_td = row.find("td", class_="views-field-field-download-cta")
-            deadline_td = row.find("td", class_="views-field-field-post-date")
+    # Find all rows in the opportunities table
+    rows = soup.find_all("tr")
+    for row in rows:
+        title_td = row.find("td", class_="views-field-field-job-title")
+        link_td = row.find("td", class_="views-field-field-download-cta")
+        deadline_td = row.find("td", class_="views-field-field-post-date")
 
-            if not title_td or not link_td or not deadline_td:
-                continue
+        if not title_td or not link_td or not deadline_td:
+            continue
 
-            title = title_td.get_text(strip=True)
+        title = title_td.get_text(strip=True)
 
-            a_tag = link_td.find("a", href=True)
-            link = None
-            if a_tag:
-                link = a_tag["href"].strip()
-                if not link.startswith("http"):
-                    link = "https://www.hclfoundation.org" + link
+        a_tag = link_td.find("a", href=True)
+        link = None
+        if a_tag:
+            link = a_tag["href"].strip()
+            if not link.startswith("http"):
+                link = "https://www.hclfoundation.org" + link
 
-            deadline_str = deadline_td.get_text(strip=True)
+        deadline_str = deadline_td.get_text(strip=True)
 
-            # Parse deadline into date (if possible)
-            deadline = None
+        # Parse deadline into date (if possible)
+        deadline = None
+        try:
+            deadline = datetime.strptime(deadline_str, "%d %b %Y").date()
+        except ValueError:
             try:
-                deadline = datetime.strptime(deadline_str, "%d %b %Y").date()
+                deadline = datetime.strptime(deadline_str, "%d %B, %Y").date()
             except ValueError:
-                try:
-                    deadline = datetime.strptime(deadline_str, "%d %B, %Y").date()
-                except ValueError:
-                    pass  # Keep as None if unparsable
-
-            # Calculate Days_Left
-            days_left = pd.NA
-            if deadline:
-                today = date.today()
-                delta = deadline - today
-                days_left = delta.days if delta.days >= 0 else -1  # Mark expired as -1 for filtering
-
-            # Keyword matching (allow multiple verticals)
-            text_blob = title.lower()
-            matched_verticals = []
+                pass  # Keep as None if unparsable
+
+        # Calculate Days_Left
+        days_left = pd.NA
+        if deadline:
+            today = date.today()
+            delta = deadline - today
+            days_left = delta.days if delta.days >= 0 else -1  # Mark expired as -1 for filtering
+
+        # Keyword matching (allow multiple verticals)
+        text_blob = title.lower()
+        matched_verticals = []
+        with telemetry.span("match"):
             for vertical in priority:
                 for word in keywords.get(vertical, []):
                     if re.search(r'\b' + re.escape(word.lower()) + r'\b', text_blob):
                         matched_verticals.append(vertical)
                         break  # Prevent duplicate entries per vertical
 
-            # Include all listings (remove strict keyword filter to avoid empty results)
-            clickable_link = ""
-            if link:
-                title_escaped = title.replace('"', '""')
-                clickable_link = f'=HYPERLINK("{link}","{title_escaped}")'
-
-            listing = {
-                "Source": "HCL Foundation",
-                "Type": "N/A",
-                "Title": title,
-                "Description": "",
-                "How_to_Apply": "",
-                "Matched_Vertical": ", ".join(matched_verticals) if matched_verticals else "N/A",
-                "Deadline": deadline if deadline else deadline_str,  # Fallback to str if unparsable
-                "Days_Left": days_left,
-                "Clickable_Link": clickable_link
-            }
-            listings.append(listing)
-
-        if not listings:
-            print("⚠️ No opportunities found on HCL Foundation site.")
-            return pd.DataFrame()
-
-        df = pd.DataFrame(listings)
-        return df
-
+        # Include all listings (remove strict keyword filter to avoid empty results)
+        listing = {
+            "Source": "HCL Foundation",
+            "Type": "N/A",
+            "Title": title,
+            "Description": "",
+            "How_to_Apply": "",
+            "Matched_Vertical": ", ".join(matched_verticals) if matched_verticals else "N/A",
+            "Deadline": deadline if deadline else deadline_str,  # Fallback to str if unparsable
+            "Days_Left": days_left,
+            "Clickable_Link": link or ""
+        }
+        listings.append(listing)
+
+    return listings
+
+def iter_hcl():
+    try:
+        res = http_client.get(URL, headers=HEADERS, timeout=10, verify=False)
+        res.raise_for_status()
+        listings = parse_hcl_page(res.text)
     except Exception as e:
         print(f"❌ HCL scraper failed: {e}")
-        return pd.DataFrame()
\ No newline at end of file
+        return
+
+    if not listings:
+        print("⚠️ No opportunities found on HCL Foundation site.")
+
+    for listing in listings:
+        yield Opportunity.from_row(listing)
+
+def scrape_hcl():
+    return build_frame(iter_hcl())
\ No newline at end of file
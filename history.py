@@ -0,0 +1,316 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+import pandas as pd
+
+import telemetry
+import workbook
+from records import parse_deadlines
+
+# ======================================================
+# OPPORTUNITY HISTORY (append-only, one row per version)
+# ======================================================
+# The sheet only ever holds today's open listings; this keeps every listing
+# ever published, when it was first and last seen, and each version of it.
+HISTORY_ENV = "SCRAPER_HISTORY_DB"
+DEFAULT_DB = "history.sqlite"
+
+KEEP_VERSIONS_DAYS = 180    # compaction: older intermediate versions are dropped
+COMPACT_EVERY_DAYS = 30
+TAG_KINDS = {"source": "Source", "vertical": "Matched_Vertical"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    id          INTEGER PRIMARY KEY,
+    link        TEXT NOT NULL UNIQUE,
+    title       TEXT,
+    type        TEXT,
+    deadline    TEXT,                  -- ISO date of the latest version
+    first_seen  TEXT NOT NULL,         -- ISO UTC timestamps
+    last_seen   TEXT NOT NULL,
+    versions    INTEGER NOT NULL DEFAULT 1,
+    digest      TEXT NOT NULL          -- of the latest version
+);
+CREATE INDEX IF NOT EXISTS idx_listings_first_seen ON listings(first_seen);
+CREATE INDEX IF NOT EXISTS idx_listings_type ON listings(type, first_seen);
+
+CREATE TABLE IF NOT EXISTS versions (
+    listing_id  INTEGER NOT NULL REFERENCES listings(id),
+    seen_at     TEXT NOT NULL,         -- run that first published this version
+    changed     TEXT NOT NULL,         -- fields changed since the previous version ('' for the first)
+    body        BLOB NOT NULL          -- zlib JSON of the row
+);
+CREATE INDEX IF NOT EXISTS idx_versions_listing ON versions(listing_id, seen_at);
+
+-- One row per source / vertical a listing was ever tagged with
+CREATE TABLE IF NOT EXISTS tags (
+    listing_id  INTEGER NOT NULL REFERENCES listings(id),
+    kind        TEXT NOT NULL,         -- source | vertical
+    value       TEXT NOT NULL,
+    first_seen  TEXT NOT NULL,         -- the listing's, copied so range queries stay on the index
+    UNIQUE (listing_id, kind, value)
+);
+CREATE INDEX IF NOT EXISTS idx_tags_lookup ON tags(kind, value, first_seen);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key         TEXT PRIMARY KEY,
+    value       TEXT
+);
+"""
+
+
+def configure(path):
+    """Record run history in `path` instead of DEFAULT_DB."""
+    os.environ[HISTORY_ENV] = path
+
+
+def store_path():
+    return os.environ.get(HISTORY_ENV) or DEFAULT_DB
+
+
+def connect(path=None):
+    conn = sqlite3.connect(path or store_path(), timeout=60, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _now():
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())
+
+
+def _pack(row):
+    return zlib.compress(json.dumps(row, ensure_ascii=False, sort_keys=True).encode("utf-8"), 9)
+
+
+def _unpack(body):
+    return json.loads(zlib.decompress(body).decode("utf-8"))
+
+
+def _tags(row):
+    for kind, column in TAG_KINDS.items():
+        for value in row.get(column, "").split(", "):
+            if value:
+                yield kind, value
+
+
+# ======================================================
+# RECORDING
+# ======================================================
+def record(df, path=None, seen_at=None):
+    """Add this run's listings: new ones, new versions of changed ones, last_seen for the rest."""
+    seen_at = seen_at or _now()
+    rows = workbook.canonical(df)
+    rows = rows[rows["Clickable_Link"] != ""].drop_duplicates("Clickable_Link")
+    deadlines = parse_deadlines(rows["Deadline"])
+    deadlines = deadlines.dt.strftime("%Y-%m-%d").astype(object).where(deadlines.notna(), None)
+
+    counts = {"new": 0, "changed": 0, "unchanged": 0}
+    conn = connect(path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        known = {}
+        links = rows["Clickable_Link"].tolist()
+        for start in range(0, len(links), 500):
+            chunk = links[start:start + 500]
+            known.update(
+                (link, rest) for link, *rest in conn.execute(
+                    f"SELECT link, id, digest, first_seen FROM listings WHERE link IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )
+            )
+
+        for row, deadline in zip(rows.to_dict("records"), deadlines):
+            link = row["Clickable_Link"]
+            digest = hashlib.sha256(json.dumps(row, sort_keys=True).encode("utf-8")).hexdigest()
+            listing_id, previous, first_seen = known.get(link, (None, None, seen_at))
+
+            if listing_id is None:
+                listing_id = conn.execute(
+                    "INSERT INTO listings (link, title, type, deadline, first_seen, last_seen, digest) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (link, row.get("Title"), row.get("Type"), deadline, seen_at, seen_at, digest)
+                ).lastrowid
+                conn.execute("INSERT INTO versions VALUES (?, ?, '', ?)", (listing_id, seen_at, _pack(row)))
+                counts["new"] += 1
+            elif previous == digest:
+                conn.execute("UPDATE listings SET last_seen = ? WHERE id = ?", (seen_at, listing_id))
+                counts["unchanged"] += 1
+                continue
+            else:
+                (body,) = conn.execute(
+                    "SELECT body FROM versions WHERE listing_id = ? ORDER BY seen_at DESC, rowid DESC LIMIT 1",
+                    (listing_id,)
+                ).fetchone()
+                last = _unpack(body)
+                changed = [k for k in row if last.get(k) != row[k]]
+                conn.execute(
+                    "INSERT INTO versions VALUES (?, ?, ?, ?)",
+                    (listing_id, seen_at, ",".join(changed), _pack(row))
+                )
+                conn.execute(
+                    "UPDATE listings SET title = ?, type = ?, deadline = ?, last_seen = ?, "
+                    "versions = versions + 1, digest = ? WHERE id = ?",
+                    (row.get("Title"), row.get("Type"), deadline, seen_at, digest, listing_id)
+                )
+                counts["changed"] += 1
+
+            conn.executemany(
+                "INSERT OR IGNORE INTO tags VALUES (?, ?, ?, ?)",
+                [(listing_id, kind, value, first_seen) for kind, value in _tags(row)]
+            )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+    print(f"🗃️ History: {counts['new']} new, {counts['changed']} changed, "
+          f"{counts['unchanged']} unchanged listings")
+    telemetry.note("history", **counts)
+    return counts
+
+
+# ======================================================
+# COMPACTION
+# ======================================================
+def last_compacted(path=None):
+    """ISO UTC timestamp of the last compaction, None if never."""
+    conn = connect(path)
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'last_compacted'").fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+def compact(path=None, keep_days=KEEP_VERSIONS_DAYS, every_days=None):
+    """Drop intermediate versions older than `keep_days` (first and latest always stay), then VACUUM.
+
+    With `every_days`, does nothing unless the last compaction is at least that old.
+    """
+    if every_days is not None:
+        last = last_compacted(path)
+        due = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(time.time() - every_days * 86400))
+        if last is not None and last > due:
+            print(f"🗜️ History last compacted {last}, not due yet")
+            return 0
+
+    cutoff = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(time.time() - keep_days * 86400))
+    conn = connect(path)
+    try:
+        before = os.path.getsize(path or store_path())
+        removed = conn.execute("""
+            DELETE FROM versions WHERE seen_at < ? AND rowid NOT IN (
+                SELECT MIN(rowid) FROM versions GROUP BY listing_id
+                UNION
+                SELECT MAX(rowid) FROM versions GROUP BY listing_id
+            )
+        """, (cutoff,)).rowcount
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('last_compacted', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (_now(),)
+        )
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA optimize")
+        after = os.path.getsize(path or store_path())
+    finally:
+        conn.close()
+    print(f"🗜️ History compacted: {removed} old versions dropped, {before / 1024:.0f} KB -> {after / 1024:.0f} KB")
+    return removed
+
+
+# ======================================================
+# QUERIES
+# ======================================================
+def monthly(path=None, vertical=None, source=None, type_like=None, since=None, until=None):
+    """New listings per month of first_seen, as [(YYYY-MM, count)]."""
+    # "~" sorts after every character of an ISO timestamp, so `until` is inclusive
+    since, until = since or "0000", (until or "9999") + "~"
+    if vertical or source:
+        kind, value = ("vertical", vertical) if vertical else ("source", source)
+        sql = """
+            SELECT substr(t.first_seen, 1, 7) AS month, COUNT(*)
+            FROM tags t JOIN listings l ON l.id = t.listing_id
+            WHERE t.kind = ? AND t.value = ? AND t.first_seen BETWEEN ? AND ?
+        """
+        params = [kind, value, since, until]
+        if vertical and source:
+            sql += " AND EXISTS (SELECT 1 FROM tags s WHERE s.listing_id = l.id AND s.kind = 'source' AND s.value = ?)"
+            params.append(source)
+    else:
+        sql = """
+            SELECT substr(l.first_seen, 1, 7) AS month, COUNT(*)
+            FROM listings l WHERE l.first_seen BETWEEN ? AND ?
+        """
+        params = [since, until]
+    if type_like:
+        sql += " AND l.type LIKE ?"
+        params.append(f"%{type_like}%")
+
+    conn = connect(path)
+    try:
+        return conn.execute(sql + " GROUP BY month ORDER BY month", params).fetchall()
+    finally:
+        conn.close()
+
+
+def versions(link, path=None):
+    """Every stored version of one listing, oldest first: [(seen_at, changed, row)]."""
+    conn = connect(path)
+    try:
+        return [
+            (seen_at, changed.split(",") if changed else [], _unpack(body))
+            for seen_at, changed, body in conn.execute(
+                "SELECT v.seen_at, v.changed, v.body FROM versions v JOIN listings l ON l.id = v.listing_id "
+                "WHERE l.link = ? ORDER BY v.seen_at, v.rowid",
+                (link,)
+            )
+        ]
+    finally:
+        conn.close()
+
+
+# ======================================================
+# CLI
+# ======================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query and maintain the opportunity history")
+    parser.add_argument("--db", default=None, help=f"history DB (default: {DEFAULT_DB})")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    m = sub.add_parser("monthly", help="new listings per month")
+    m.add_argument("--vertical")
+    m.add_argument("--source")
+    m.add_argument("--type", dest="type_like", help="substring of Type, e.g. RFP")
+    m.add_argument("--since", help="YYYY-MM[-DD]")
+    m.add_argument("--until", help="YYYY-MM[-DD]")
+
+    v = sub.add_parser("versions", help="every version of one listing")
+    v.add_argument("link")
+
+    c = sub.add_parser("compact", help="drop old intermediate versions and VACUUM")
+    c.add_argument("--keep-days", type=int, default=KEEP_VERSIONS_DAYS)
+    c.add_argument("--every-days", type=int, default=None,
+                   help=f"skip unless the last compaction is this old (e.g. {COMPACT_EVERY_DAYS})")
+
+    args = parser.parse_args()
+
+    if args.cmd == "monthly":
+        rows = monthly(args.db, args.vertical, args.source, args.type_like, args.since, args.until)
+        for month, n in rows:
+            print(f"{month}  {n}")
+    elif args.cmd == "versions":
+        for seen_at, changed, row in versions(args.link, args.db):
+            print(f"{seen_at}  {', '.join(changed) or 'first seen'}")
+            print(f"    {row.get('Title')} | deadline {row.get('Deadline') or '-'}")
+    else:
+        compact(args.db, args.keep_days, args.every_days)
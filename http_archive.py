@@ -0,0 +1,243 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# ======================================================
+# SETTINGS
+# ======================================================
+# Read from the environment so queue workers and daemon ticks inherit the mode
+MODE_ENV = "SCRAPER_HTTP_MODE"           # "record" | "replay"
+ARCHIVE_ENV = "SCRAPER_HTTP_ARCHIVE"
+LATENCY_ENV = "SCRAPER_REPLAY_LATENCY"   # seconds per request, or "recorded"
+FAILURES_ENV = "SCRAPER_REPLAY_FAILURES" # share of replayed requests that fail
+SEED_ENV = "SCRAPER_REPLAY_SEED"
+
+DEFAULT_ARCHIVE = "http_archive.sqlite"
+
+# Bodies are stored decoded, so these no longer describe them
+DROP_HEADERS = {"content-encoding", "transfer-encoding", "content-length", "connection"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS exchanges (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    key          TEXT NOT NULL,          -- method + url + body + Range
+    method       TEXT NOT NULL,
+    url          TEXT NOT NULL,
+    status       INTEGER NOT NULL,
+    reason       TEXT,
+    headers      TEXT NOT NULL,          -- JSON
+    body         BLOB NOT NULL,          -- zlib
+    size         INTEGER NOT NULL,
+    elapsed      REAL NOT NULL,
+    recorded_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_exchanges_key ON exchanges(key, id);
+CREATE INDEX IF NOT EXISTS idx_exchanges_url ON exchanges(method, url, id);
+"""
+
+_lock = threading.Lock()
+_conn = None
+_conn_pid = None
+_served = {}       # key -> responses already replayed for it
+_rng = None
+
+
+def configure(mode, archive=DEFAULT_ARCHIVE, latency=None, failures=None, seed=None):
+    """Record to / replay from `archive` in every http_client session from now on."""
+    os.environ[MODE_ENV] = mode
+    os.environ[ARCHIVE_ENV] = archive
+    for env, value in ((LATENCY_ENV, latency), (FAILURES_ENV, failures), (SEED_ENV, seed)):
+        if value is not None:
+            os.environ[env] = str(value)
+    print(f"📼 HTTP {mode} mode: {archive}")
+
+
+def active_mode():
+    return os.environ.get(MODE_ENV) or None
+
+
+# ======================================================
+# STORE
+# ======================================================
+def connect(archive=None):
+    conn = sqlite3.connect(archive or os.environ.get(ARCHIVE_ENV) or DEFAULT_ARCHIVE,
+                           timeout=60, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _shared_conn():
+    # One connection per process; fetch threads share it under _lock
+    global _conn, _conn_pid
+    if _conn is None or _conn_pid != os.getpid():
+        _conn, _conn_pid = connect(), os.getpid()
+    return _conn
+
+
+def request_key(request):
+    body = request.body or b""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    h = hashlib.sha1(f"{request.method} {request.url}\n".encode("utf-8"))
+    h.update(body)
+    # pdf_extract asks for the first chunk only; a full download is another exchange
+    h.update(f"\n{request.headers.get('Range', '')}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def save_exchange(request, response, content, elapsed):
+    headers = {k: v for k, v in response.headers.items() if k.lower() not in DROP_HEADERS}
+    with _lock:
+        _shared_conn().execute(
+            "INSERT INTO exchanges (key, method, url, status, reason, headers, body, size, elapsed, recorded_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (request_key(request), request.method, request.url, response.status_code, response.reason,
+             json.dumps(headers), zlib.compress(content, 6), len(content), elapsed, time.time())
+        )
+
+
+def find_exchange(request):
+    """Next recorded response for this request, replayed in recorded order.
+
+    Once a request has been replayed as often as it was recorded the last
+    response repeats. Falls back to the same method + url with another body.
+    """
+    key = request_key(request)
+    with _lock:
+        conn = _shared_conn()
+        rows = conn.execute(
+            "SELECT status, reason, headers, body, elapsed FROM exchanges WHERE key = ? ORDER BY id",
+            (key,)
+        ).fetchall()
+        if not rows:
+            rows = conn.execute(
+                "SELECT status, reason, headers, body, elapsed FROM exchanges "
+                "WHERE method = ? AND url = ? ORDER BY id",
+                (request.method, request.url)
+            ).fetchall()
+        if not rows:
+            return None
+        n = _served.get(key, 0)
+        _served[key] = n + 1
+
+    status, reason, headers, body, elapsed = rows[min(n, len(rows) - 1)]
+    return {"status": status, "reason": reason, "headers": json.loads(headers),
+            "content": zlib.decompress(body), "elapsed": elapsed}
+
+
+# ======================================================
+# TRANSPORT ADAPTERS
+# ======================================================
+class RecordingAdapter(HTTPAdapter):
+    """Talks to the real site and keeps a copy of every exchange (redirect hops included)."""
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        # Reading it here also serves streamed callers: iter_content() replays _content
+        content = response.content
+        save_exchange(request, response, content, time.perf_counter() - start)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Answers from the archive, optionally slowed down and made to fail."""
+
+    def __init__(self):
+        super().__init__()
+        latency = os.environ.get(LATENCY_ENV, "0")
+        self.recorded_latency = latency == "recorded"
+        self.latency = 0.0 if self.recorded_latency else float(latency)
+        self.failures = float(os.environ.get(FAILURES_ENV) or 0)
+
+    def _draw(self):
+        global _rng
+        with _lock:
+            if _rng is None:
+                seed = os.environ.get(SEED_ENV)
+                _rng = random.Random(int(seed) if seed else None)
+            return _rng.random(), _rng.choice(("connection", "timeout", "503"))
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        roll, failure = self._draw()
+        if roll < self.failures:
+            if failure == "connection":
+                raise requests.ConnectionError(f"injected failure for {request.url}", request=request)
+            if failure == "timeout":
+                raise requests.Timeout(f"injected timeout for {request.url}", request=request)
+            entry = {"status": 503, "reason": "Service Unavailable (injected)", "headers": {},
+                     "content": b"", "elapsed": 0.0}
+        else:
+            entry = find_exchange(request)
+            if entry is None:
+                raise requests.ConnectionError(
+                    f"not in archive: {request.method} {request.url}", request=request
+                )
+
+        delay = entry["elapsed"] if self.recorded_latency else self.latency
+        if delay:
+            time.sleep(delay)
+        return self.build_response(request, entry)
+
+    def build_response(self, request, entry):
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = entry["reason"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.headers["Content-Length"] = str(len(entry["content"]))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(entry["content"])
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+def adapter():
+    """Adapter for the configured mode, None to use the network as usual."""
+    mode = active_mode()
+    if mode == "record":
+        return RecordingAdapter()
+    if mode == "replay":
+        return ReplayAdapter()
+    if mode:
+        raise ValueError(f"{MODE_ENV} must be 'record' or 'replay', not {mode!r}")
+    return None
+
+
+# ======================================================
+# CLI
+# ======================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect a recorded HTTP archive")
+    parser.add_argument("archive", nargs="?", default=DEFAULT_ARCHIVE)
+    args = parser.parse_args()
+
+    per_host = {}
+    for url, size, stored in connect(args.archive).execute(
+        "SELECT url, size, LENGTH(body) FROM exchanges"
+    ):
+        host = per_host.setdefault(urlparse(url).netloc, [0, 0, 0])
+        host[0] += 1
+        host[1] += size
+        host[2] += stored
+
+    for host, (n, size, stored) in sorted(per_host.items()):
+        print(f"{host:32} {n:6} exchanges {size / 1e6:9.2f} MB ({stored / 1e6:.2f} MB stored)")
@@ -0,0 +1,63 @@
+import time
+
+import requests
+
+import circuit
+import http_archive
+import politeness
+import telemetry
+
+# ======================================================
+# INSTRUMENTED HTTP (drop-in for requests.get / requests.Session)
+# ======================================================
+
+
+class Session(requests.Session):
+    def __init__(self):
+        super().__init__()
+        # --record / --replay swap the transport, everything above stays the same
+        adapter = http_archive.adapter()
+        if adapter is not None:
+            self.mount("https://", adapter)
+            self.mount("http://", adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        headers = {**self.headers, **(kwargs.get("headers") or {})}
+        # A dead host fails fast; otherwise wait for its turn (robots.txt refusals raise here too)
+        circuit.before(url)
+        try:
+            politeness.wait(self, url, headers.get("User-Agent"))
+        except BaseException:
+            # Nothing was sent: hand a half-open host's probe to the next request
+            circuit.release(url)
+            raise
+
+        start = time.perf_counter()
+        try:
+            res = super().request(method, url, *args, **kwargs)
+        except Exception as e:
+            politeness.observe(url, None, time.perf_counter() - start, error=e)
+            circuit.record(url, error=e)
+            telemetry.record_http(url, None, time.perf_counter() - start, 0, error=e)
+            raise
+
+        politeness.observe(url, res.status_code, time.perf_counter() - start,
+                           retry_after=politeness.retry_after_seconds(res.headers))
+        circuit.record(url, res.status_code)
+
+        if kwargs.get("stream"):
+            nbytes = int(res.headers.get("Content-Length") or 0)
+        else:
+            nbytes = len(res.content)
+        telemetry.record_http(url, res.status_code, time.perf_counter() - start, nbytes)
+        return res
+
+
+def get(url, **kwargs):
+    with Session() as session:
+        return session.get(url, **kwargs)
+
+
+def post(url, **kwargs):
+    with Session() as session:
+        return session.post(url, **kwargs)
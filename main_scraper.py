@@ -1,11 +1,21 @@
-import time
-import pandas as pd
 from bs4 import BeautifulSoup
-import requests
-
+import time
+from urllib.parse import urlparse
+
+import checkpoint
+import circuit
+import deadline as run_deadline
+import http_client
+import pipeline
+import telemetry
+import work_queue
+from records import Opportunity, build_frame
+from snapshots import load_known_links, load_snapshot, save_known_links
 from dev import load_verticals, match_verticals, format_deadline, compute_days_left
 
 
+SOURCE = "NGOBOX"
+
 URLS = {
     "Grants": "https://ngobox.org/grant_announcement_listing.php",
     "Tenders": "https://ngobox.org/rfp_eoi_listing.php"
@@ -18,135 +28,345 @@ HEADERS = {
 }
 
 
+# Fetch tiers, tried in order. "direct" hits the site itself, "proxy" goes
+# through r.jina.ai and is only used once the site starts blocking us.
+TIERS = ["direct", "proxy"]
+
+BLOCKED_STATUS = {403, 429, 503}
+BLOCK_MARKERS = ("cf-chl", "Just a moment...", "Attention Required!")
+
+# A host moved to the proxy is tried directly again after this long: blocks get lifted
+DIRECT_RETRY = 30 * 60
+
+# Listing links seen on earlier runs count as known this long; a page of nothing
+# but known links ends pagination, and the rest of the listing comes from the snapshot
+KNOWN_DAYS = 14
+
+# host -> (index into TIERS that last worked for it, when it moved there)
+_host_tier = {}
+
+
+def _start_tier(host):
+
+    tier_idx, since = _host_tier.get(host, (0, 0))
+
+    if tier_idx and time.time() - since >= DIRECT_RETRY:
+        return 0
+
+    return tier_idx
+
+
+def _tier_url(tier, url):
+
+    return PROXY + url if tier == "proxy" else url
+
+
+def _tier_get(tier, url):
+
+    if tier == "proxy":
+        return http_client.get(
+            PROXY + url,
+            headers={**HEADERS, "X-Return-Format": "html"},
+            timeout=30
+        )
+
+    return http_client.get(url, headers=HEADERS, timeout=30)
+
+
+def _is_blocked(res):
+
+    if res.status_code in BLOCKED_STATUS:
+        return True
+
+    return res.status_code == 200 and any(m in res.text[:5000] for m in BLOCK_MARKERS)
+
+
 def safe_request(url):
 
-    proxy_url = PROXY + url
+    host = urlparse(url).netloc
 
     for attempt in range(3):
 
-        try:
+        start_idx = tier_idx = _start_tier(host)
+
+        while tier_idx < len(TIERS):
+
+            tier = TIERS[tier_idx]
 
-            res = requests.get(proxy_url, headers=HEADERS, timeout=30)
+            try:
 
-            if res.status_code == 200:
-                return res
+                res = _tier_get(tier, url)
 
-            print(f"⚠️ Response {res.status_code} attempt {attempt+1}")
+                if res.status_code == 200 and not _is_blocked(res):
+                    if _host_tier.get(host, (0, 0))[0] != tier_idx:
+                        print(f"🔀 {host}: using {tier} fetch")
+                    if tier_idx != start_idx or host not in _host_tier:
+                        _host_tier[host] = (tier_idx, time.time())
+                    return res
 
-        except Exception as e:
+                print(f"⚠️ Response {res.status_code} via {tier} attempt {attempt+1}")
 
-            print(f"⚠️ Request error attempt {attempt+1}: {e}")
+                if not _is_blocked(res):
+                    break
+
+            except circuit.CircuitOpenError:
+
+                pass  # reported once, when the breaker opened
+
+            except Exception as e:
+
+                print(f"⚠️ Request error via {tier} attempt {attempt+1}: {e}")
+
+            # Blocked or unreachable on this tier: fall through to the next one
+            tier_idx += 1
+
+        # Every tier's breaker open: retrying now would only short-circuit again
+        if all(circuit.is_open(_tier_url(tier, url)) for tier in TIERS):
+            break
 
-        time.sleep(2)
+        # No sleep here: the failures above already slowed this host down in http_client
+        telemetry.count("retries")
 
     print("❌ Page request failed")
 
     return None
 
 
-def fetch_opportunities(type_name, base_url, verticals):
+def fetch_html(url):
 
-    listings = []
+    res = safe_request(url)
 
-    page = 1
+    return res.text if res else None
 
-    while page <= 5:
 
-        url = f"{base_url}?page={page}"
+def fetch_listing_page(url):
+
+    res = safe_request(url)
+
+    if not res:
+        return None
+
+    with telemetry.span("parse"):
+        return parse_listing_page(res.text)
+
+
+def parse_listing_page(html):
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    page_links = []
+
+    for a in soup.find_all("a", href=True):
+
+        href = a["href"]
+
+        if "/grant-details/" in href or "/rfp-details/" in href:
+
+            link = href
+
+            if not link.startswith("http"):
+                link = "https://ngobox.org/" + link.lstrip("/")
+
+            page_links.append((a.get_text(strip=True), link))
+
+    return page_links
+
 
-        print(f"🔍 Scraping {type_name} Page {page} → {url}")
+def build_listing(detail_html, type_name, title, link, verticals):
 
-        res = safe_request(url)
+    dsoup = BeautifulSoup(detail_html, "html.parser")
 
-        if not res:
+    deadline = "N/A"
+
+    for h in dsoup.find_all("h2"):
+
+        if "Apply By" in h.text:
+            deadline = h.text.replace("Apply By:", "").strip()
             break
 
-        soup = BeautifulSoup(res.text, "html.parser")
+    text_blob = title.lower()
 
-        links = soup.find_all("a", href=True)
+    with telemetry.span("match"):
+        matched = match_verticals(text_blob, verticals)
 
-        opp_links = []
+    if not matched:
+        return None
 
-        for a in links:
+    return {
+        "Type": type_name,
+        "Title": title,
+        "Matched_Vertical": ", ".join(matched),
+        "Deadline": format_deadline(deadline),
+        "Days_Left": compute_days_left(deadline),
+        "Clickable_Link": link
+    }
 
-            href = a["href"]
 
-            if "/grant-details/" in href or "/rfp-details/" in href:
-                opp_links.append(a)
+def fetch_details(type_name, links, verticals):
 
-        if not opp_links:
+    pending = []
 
-            print("⚠️ No opportunities found")
+    for title, link in links:
+
+        row = checkpoint.get_detail(SOURCE, link)
+
+        if row is checkpoint.MISSING:
+            pending.append((title, link))
+        elif row:
+            yield row
+
+    if work_queue.active_queue() and pending:
+
+        # Shard detail pages across every worker sharing the queue
+        results = work_queue.map_pages("detail", [
+            {
+                "url": link,
+                "fetch": "main_scraper:safe_request",
+                "parser": "main_scraper:build_listing",
+                "args": [type_name, title, link, verticals]
+            }
+            for title, link in pending
+        ])
+
+    else:
+
+        # Downloads overlap with parsing on the other cores; rows come out as they're parsed
+        results = pipeline.iter_fetch_and_parse(
+            [(link, (type_name, title, link, verticals)) for title, link in pending],
+            fetch_html, build_listing, io_workers=2
+        )
+
+    for (title, link), row in zip(pending, results):
+
+        if row is work_queue.FAILED:
+            continue
+
+        if row is pipeline.SKIPPED:
+
+            # Out of time: keep what the listing says, flagged (and not checkpointed)
+            row = build_listing("", type_name, title, link, verticals)
+
+            if row:
+                row["Incomplete"] = True
+                yield row
+
+            continue
+
+        checkpoint.save_detail(SOURCE, link, row)
+
+        if row:
+            yield row
+
+
+def carry_forward(type_name, seen_links, known):
+
+    """Snapshot rows of this type on pages not walked this run, for links still known."""
+
+    snap, _ = load_snapshot(SOURCE)
+
+    if snap is None or snap.empty or "Clickable_Link" not in snap:
+        return
+
+    rows = snap[(snap["Type"].astype(str) == type_name)
+                & snap["Clickable_Link"].isin(set(known) - seen_links)]
+
+    print(f"📂 {type_name}: {len(rows)} known listings kept from the snapshot")
+
+    yield from rows.to_dict("records")
+
+
+def fetch_opportunities(type_name, base_url, verticals, known=None):
+
+    known = {} if known is None else known
+
+    seen_links = set()
+
+    now = time.time()
+
+    page = 1
+
+    while page <= 5:
+
+        if run_deadline.out_of_time():
+
+            print(f"⏳ {type_name}: out of time, stopping at page {page - 1}")
 
             break
 
-        for a in opp_links:
+        url = f"{base_url}?page={page}"
 
-            title = a.get_text(strip=True)
+        page_key = f"{type_name}:{page}"
 
-            link = a["href"]
+        page_links = checkpoint.get_page(SOURCE, page_key)
 
-            if not link.startswith("http"):
-                link = "https://ngobox.org/" + link.lstrip("/")
+        if page_links is checkpoint.MISSING:
 
-            detail = safe_request(link)
+            print(f"🔍 Scraping {type_name} Page {page} → {url}")
 
-            if not detail:
-                continue
+            page_links = fetch_listing_page(url)
 
-            dsoup = BeautifulSoup(detail.text, "html.parser")
+            if page_links is None:
+                break
 
-            deadline = "N/A"
+            checkpoint.save_page(SOURCE, page_key, page_links)
 
-            for h in dsoup.find_all("h2"):
+        if not page_links:
 
-                if "Apply By" in h.text:
-                    deadline = h.text.replace("Apply By:", "").strip()
-                    break
+            print("⚠️ No opportunities found")
 
-            text_blob = title.lower()
+            break
+
+        new_links = []
 
-            matched = match_verticals(text_blob, verticals)
+        unknown = 0
 
-            if not matched:
+        for title, link in page_links:
+
+            if link in seen_links:
                 continue
 
-            listings.append({
-                "Type": type_name,
-                "Title": title,
-                "Matched_Vertical": ", ".join(matched),
-                "Deadline": format_deadline(deadline),
-                "Days_Left": compute_days_left(deadline),
-                "Clickable_Link": f'=HYPERLINK("{link}","{title}")'
-            })
+            unknown += link not in known
 
-        page += 1
+            seen_links.add(link)
+            new_links.append((title, link))
 
-        time.sleep(2)
+        yield from fetch_details(type_name, new_links, verticals)
 
-    return listings
+        for _, link in new_links:
+            known[link] = now
 
+        # Every listing here was already seen on an earlier run (or earlier this run):
+        # the pages after it hold older listings still, which the snapshot already has
+        if not unknown:
 
-def scrape_ngobox():
+            print(f"⏹️ {type_name} page {page} has nothing new, stopping")
+
+            yield from carry_forward(type_name, seen_links, known)
+
+            break
+
+        page += 1
+
+
+def iter_ngobox():
 
     verticals = load_verticals("keywords.json")
 
-    all_data = []
+    known = load_known_links(SOURCE, KNOWN_DAYS * 86400)
 
     for name, url in URLS.items():
 
-        data = fetch_opportunities(name, url, verticals)
+        for row in fetch_opportunities(name, url, verticals, known):
 
-        all_data.extend(data)
+            yield Opportunity.from_row(row, Source=SOURCE)
 
-    if not all_data:
-        return pd.DataFrame()
+    # Only a run that got through every listing updates what counts as known
+    save_known_links(SOURCE, known)
 
-    df = pd.DataFrame(all_data)
 
-    df["Source"] = "NGOBOX"
+def scrape_ngobox():
 
-    return df
+    return build_frame(iter_ngobox())
 
 
 if __name__ == "__main__":
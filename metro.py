@@ -4,6 +4,11 @@ from bs4 import BeautifulSoup
 import json, os, re, string
 from datetime import datetime
 
+import http_client
+import pdf_extract
+import telemetry
+from records import Opportunity, build_frame
+
 # === Embedded Keywords Dictionary ===
 keywords = {
   "Governance": [
@@ -42,87 +47,110 @@ URL = f"{BASE_URL}/nagpur-metro-tenders"
 HEADERS = {"User-Agent": "Mozilla/5.0"}
 
 
-def fetch_metro_tenders():
-    print(f"🔍 Fetching tenders from: {URL}")
+def parse_metro_page(html):
+    """(tenders, notice PDF links) from the tenders page html (no network)."""
     tenders = []
     seen_links = set()
+    notice_links = []
 
-    try:
-        res = requests.get(URL, headers=HEADERS, timeout=15)
-        soup = BeautifulSoup(res.text, "html.parser")
+    with telemetry.span("parse"):
+        soup = BeautifulSoup(html, "html.parser")
 
-        # Updated selector (page uses tables heavily)
-        rows = soup.find_all("tr")
+    # Updated selector (page uses tables heavily)
+    rows = soup.find_all("tr")
 
-        if not rows:
-            print("⚠️ No tender rows found.")
-            return pd.DataFrame()
+    if not rows:
+        print("⚠️ No tender rows found.")
+        return tenders, notice_links
 
-        for row in rows:
-            cols = row.find_all("td")
-            if len(cols) < 2:
-                continue
+    for row in rows:
+        cols = row.find_all("td")
+        if len(cols) < 2:
+            continue
 
-            # Title
-            title = cols[1].get_text(strip=True)
+        # Title
+        title = cols[1].get_text(strip=True)
 
-            # Find all links
-            links = row.find_all("a", href=True)
-            if not links:
-                continue
+        # Find all links
+        links = row.find_all("a", href=True)
+        if not links:
+            continue
 
-            notice_link_tag = None
-            for a_tag in links:
-                if "notice" in a_tag.get_text(strip=True).lower():
-                    notice_link_tag = a_tag
-                    break
+        notice_link_tag = None
+        for a_tag in links:
+            if "notice" in a_tag.get_text(strip=True).lower():
+                notice_link_tag = a_tag
+                break
 
-            if not notice_link_tag:
-                notice_link_tag = links[0]
+        if not notice_link_tag:
+            notice_link_tag = links[0]
 
-            doc_name = notice_link_tag.get_text(strip=True)
-            link = notice_link_tag["href"].strip()
+        doc_name = notice_link_tag.get_text(strip=True)
+        link = notice_link_tag["href"].strip()
 
-            if not link.startswith("http"):
-                link = f"{BASE_URL}/{link.lstrip('/')}"
+        if not link.startswith("http"):
+            link = f"{BASE_URL}/{link.lstrip('/')}"
 
-            if link in seen_links:
-                continue
-            seen_links.add(link)
+        if link in seen_links:
+            continue
+        seen_links.add(link)
 
-            # Keyword matching
-            text_blob = title.lower()
-            text_blob_clean = text_blob.translate(str.maketrans('', '', string.punctuation))
+        # Keyword matching
+        text_blob = title.lower()
+        text_blob_clean = text_blob.translate(str.maketrans('', '', string.punctuation))
 
-            matched_verticals = []
+        matched_verticals = []
+        with telemetry.span("match"):
             for vertical in priority:
                 for word in keywords.get(vertical, []):
                     if re.search(r'\b{}\b'.format(re.escape(word.lower())), text_blob_clean):
                         matched_verticals.append(vertical)
                         break
 
-            if matched_verticals:
-                tenders.append({
-                    "Title": title,
-                    "Description": doc_name,
-                    "Matched_Vertical": ", ".join(matched_verticals),
-                    "Clickable_Link": '=HYPERLINK("{}","{}")'.format(link, doc_name.replace('"', '""')),
-                    "Source": "Nagpur Metro Rail",
-                    "Type": "Tender/RFP",
-                    "How_to_Apply": f"Refer to the document: {link}",
-                    "Deadline": pd.NaT,
-                    "Days_Left": pd.NA
-                })
-
-        print(f"✅ Found {len(tenders)} tenders.")
-        return pd.DataFrame(tenders)
+        if not matched_verticals:
+            telemetry.count("rows_unmatched")
+
+        if matched_verticals:
+            notice_links.append(link)
+            tenders.append({
+                "Title": title,
+                "Description": doc_name,
+                "Matched_Vertical": ", ".join(matched_verticals),
+                "Clickable_Link": link,
+                "Source": "Nagpur Metro Rail",
+                "Type": "Tender/RFP",
+                "How_to_Apply": f"Refer to the document: {link}",
+                "Deadline": pd.NaT,
+                "Days_Left": pd.NA
+            })
+
+    return tenders, notice_links
+
+
+def iter_metro_tenders():
+    print(f"🔍 Fetching tenders from: {URL}")
+
+    try:
+        res = http_client.get(URL, headers=HEADERS, timeout=15)
+        tenders, notice_links = parse_metro_page(res.text)
+
+        # Deadlines only live inside the notice PDFs
+        pdf_extract.submit(notice_links)
 
     except requests.exceptions.RequestException as e:
         print(f"❌ Network error: {e}")
-        return pd.DataFrame()
+        return
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
-        return pd.DataFrame()
+        return
+
+    print(f"✅ Found {len(tenders)} tenders.")
+    for tender in tenders:
+        yield Opportunity.from_row(tender)
+
+
+def fetch_metro_tenders():
+    return build_frame(iter_metro_tenders())
 
 
 if __name__ == "__main__":
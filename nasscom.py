@@ -1,10 +1,14 @@
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
-import os
 import time  # ✅ Added for retries
 import warnings
 
+import circuit
+import http_client
+import telemetry
+from records import FIELDS, Opportunity
+
 warnings.filterwarnings("ignore", message="Unverified HTTPS request")
 
 URL = "https://www.nasscomfoundation.org/requestproposal"
@@ -47,6 +51,7 @@ HEADERS = {
     "Referer": "https://www.google.com/"
 }
 
+@telemetry.timed("match")
 def match_vertical(text: str) -> str:
     text_lower = text.lower()
     for category, words in KEYWORDS.items():
@@ -56,49 +61,55 @@ def match_vertical(text: str) -> str:
     return ""
 
 def scrape_nasscom():
+    html = fetch_nasscom_page()
+    if html is None:
+        # combined_scraper falls back to the last good snapshot
+        return pd.DataFrame()
+    return parse_nasscom_page(html)
+
+def iter_nasscom():
+    html = fetch_nasscom_page()
+    if html is None:
+        return
+    for row in iter_nasscom_items(html):
+        yield Opportunity.from_row(row)
+
+def fetch_nasscom_page():
     print(f"🔍 Fetching Nasscom page: {URL}")
     response = None
     for attempt in range(3):  # ✅ Add retries (up to 3 attempts)
         try:
-            response = requests.get(URL, headers=HEADERS, verify=False, timeout=30)  # ✅ Increased timeout to 30s
+            response = http_client.get(URL, headers=HEADERS, verify=False, timeout=30)  # ✅ Increased timeout to 30s
             print(f"✅ Nasscom response status: {response.status_code} (Attempt {attempt+1})")
             response.raise_for_status()
             break
         except requests.exceptions.RequestException as e:  # ✅ Catch specific exceptions
             print(f"⚠️ Nasscom fetch attempt {attempt+1} failed: {e}")
+            if isinstance(e, circuit.CircuitOpenError):
+                print("❌ Nasscom host is down, not retrying.")
+                return None
             if attempt < 2:
+                telemetry.count("retries")
                 time.sleep(2)  # Wait before retry
             else:
-                if os.path.exists("nasscom.xlsx"):
-                    print("📂 Loading fallback nasscom.xlsx")
-                    df = pd.read_excel("nasscom.xlsx")
-                else:
-                    print("⚠️ No fallback file found. Returning empty DF.")
-                    return pd.DataFrame()
-
-                # Guarantee schema on fallback
-                final_columns = [
-                    "Source", "Type", "Title", "Description",
-                    "How_to_Apply", "Matched_Vertical", "Deadline",
-                    "Days_Left", "Clickable_Link"
-                ]
-                for col in final_columns:
-                    if col not in df.columns:
-                        df[col] = pd.NA
-                return df[final_columns]
-
-    soup = BeautifulSoup(response.text, "html.parser")
+                print("❌ Max retries reached for Nasscom. Returning no data.")
+                return None
+
+    return response.text
+
+def parse_nasscom_page(html):
+    """Matched proposals from the Nasscom page html (no network)."""
+    return pd.DataFrame(list(iter_nasscom_items(html)), columns=list(FIELDS))
+
+def iter_nasscom_items(html):
+    with telemetry.span("parse"):
+        soup = BeautifulSoup(html, "html.parser")
     items = soup.select("div.pt-3 li strong")
 
     if not items:
         print("⚠️ No proposal items found on Nasscom page.")
-        return pd.DataFrame(columns=[
-            "Source", "Type", "Title", "Description",
-            "How_to_Apply", "Matched_Vertical", "Deadline",
-            "Days_Left", "Clickable_Link"
-        ])
+        return
 
-    data = []
     for item in items:
         title_text = item.get_text(" ", strip=True)
         link_tag = item.find("a")
@@ -108,11 +119,10 @@ def scrape_nasscom():
 
         # Only keep items where Matched_Vertical is NOT empty
         if not matched_vertical:
+            telemetry.count("rows_unmatched")
             continue
 
-        clickable = f'=HYPERLINK("{link}","{title_text.replace(chr(34), "”")}")' if link else ""
-
-        data.append({
+        yield {
             "Source": "Nasscom",
             "Type": pd.NA,
             "Title": title_text,
@@ -121,24 +131,8 @@ def scrape_nasscom():
             "Matched_Vertical": matched_vertical,
             "Deadline": pd.NaT,
             "Days_Left": pd.NA,
-            "Clickable_Link": clickable
-        })
-
-    df = pd.DataFrame(data)
-
-    # Guarantee schema
-    final_columns = [
-        "Source", "Type", "Title", "Description",
-        "How_to_Apply", "Matched_Vertical", "Deadline",
-        "Days_Left", "Clickable_Link"
-    ]
-    df = df.reindex(columns=final_columns)
-
-    if not df.empty:
-        df.to_excel("nasscom.xlsx", index=False)
-        print(f"💾 Saved fallback to nasscom.xlsx (Rows: {len(df)})")
-
-    return df
+            "Clickable_Link": link
+        }
 
 if __name__ == "__main__":
     print(scrape_nasscom())
\ No newline at end of file
@@ -1,8 +1,12 @@
-import requests
 import pandas as pd
 from bs4 import BeautifulSoup
 import urllib3
 
+import http_client
+import pdf_extract
+import telemetry
+from records import Opportunity, build_frame
+
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 BASE_URL = "https://niua.in"
@@ -12,21 +16,21 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0"
 }
 
+# parse_niua_page() keys -> Opportunity fields
+COLUMNS = {
+    "Tender_Title": "Title",
+    "Submission_Deadline": "Deadline",
+    "Tender_Link": "Clickable_Link",
+}
+
 
-def scrape_niua_tenders():
+def parse_niua_page(html):
+    """(rows, tender PDF links) from the tenders page html (no network)."""
     rows = []
     seen_links = set()
 
-    print("🔍 Scraping NIUA tenders...")
-
-    try:
-        response = requests.get(
-            TENDERS_URL, headers=HEADERS, timeout=15, verify=False
-        )
-        soup = BeautifulSoup(response.text, "html.parser")
-    except Exception as e:
-        print(f"❌ NIUA page load failed: {e}")
-        return pd.DataFrame()
+    with telemetry.span("parse"):
+        soup = BeautifulSoup(html, "html.parser")
 
     for a in soup.find_all("a", href=True):
         href = a["href"].strip()
@@ -49,13 +53,33 @@ def scrape_niua_tenders():
         rows.append({
             "Tender_Title": title,
             "Submission_Deadline": pd.NA,
-            "Tender_Link": '=HYPERLINK("{}","{}")'.format(
-                pdf_link, title.replace('"', '""')
-            )
+            "Tender_Link": pdf_link
         })
 
         seen_links.add(pdf_link)
 
-    df = pd.DataFrame(rows)
-    print(f"  -> NIUA scraped {len(df)} tenders.")
-    return df
+    return rows, sorted(seen_links)
+
+
+def iter_niua_tenders():
+    print("🔍 Scraping NIUA tenders...")
+
+    try:
+        response = http_client.get(
+            TENDERS_URL, headers=HEADERS, timeout=15, verify=False
+        )
+        rows, pdf_links = parse_niua_page(response.text)
+    except Exception as e:
+        print(f"❌ NIUA page load failed: {e}")
+        return
+
+    # Deadlines only live inside the PDFs, start reading them in the background
+    pdf_extract.submit(pdf_links)
+
+    print(f"  -> NIUA scraped {len(rows)} tenders.")
+    for row in rows:
+        yield Opportunity.from_row(row, COLUMNS, Source="NIUA", Type="Tender")
+
+
+def scrape_niua_tenders():
+    return build_frame(iter_niua_tenders())
@@ -0,0 +1,322 @@
+import contextvars
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime
+from multiprocessing import get_context
+
+import http_client
+
+# ======================================================
+# SETTINGS
+# ======================================================
+CACHE_PATH = "pdf_cache.json"
+NOT_PDF_TTL = 7 * 24 * 3600     # links that answered with a web page, asked again after a week
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+RANGE_BYTES = 512 * 1024        # first chunk, usually enough for page 1-2
+MAX_BYTES = 15 * 1024 * 1024    # never pull more than this for one notice
+MAX_PAGES = 3
+
+DOWNLOAD_WORKERS = 4
+PARSE_WORKERS = 2
+
+DEADLINE_HINTS = re.compile(
+    r"(last\s+date|due\s+date|closing\s+date|deadline|bid\s+submission|"
+    r"submission\s+of\s+(?:bid|proposal|tender)|submitted\s+(?:on\s+or\s+)?before|end\s+date)",
+    re.I
+)
+
+DATE_PATTERNS = [
+    (re.compile(r"\b(\d{1,2})[./-](\d{1,2})[./-](\d{4})\b"), "dmy"),
+    (re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)?[\s-]+([A-Za-z]{3,9})[,\s-]+(\d{4})\b"), "d_month_y"),
+    (re.compile(r"\b([A-Za-z]{3,9})\s+(\d{1,2})(?:st|nd|rd|th)?,?\s+(\d{4})\b"), "month_d_y"),
+]
+
+
+# ======================================================
+# TEXT → DEADLINE / SUMMARY  (runs in worker processes)
+# ======================================================
+def _to_date(kind, groups):
+    try:
+        if kind == "dmy":
+            d, m, y = groups
+            return datetime(int(y), int(m), int(d))
+        if kind == "d_month_y":
+            d, mon, y = groups
+        else:
+            mon, d, y = groups
+        return datetime.strptime(f"{int(d)} {mon[:3]} {y}", "%d %b %Y")
+    except ValueError:
+        return None
+
+
+def find_deadline(text: str):
+    """Latest date mentioned shortly after a deadline-like phrase."""
+    found = []
+    for hint in DEADLINE_HINTS.finditer(text or ""):
+        window = text[hint.end():hint.end() + 160]
+        for pattern, kind in DATE_PATTERNS:
+            for m in pattern.finditer(window):
+                dt = _to_date(kind, m.groups())
+                if dt:
+                    found.append(dt)
+    if not found:
+        return None
+    return max(found).strftime("%d-%m-%Y")
+
+
+def summarize(text: str, limit: int = 300) -> str:
+    lines = [re.sub(r"\s+", " ", ln).strip() for ln in (text or "").splitlines()]
+    body = " ".join(ln for ln in lines if len(ln) > 25)
+    if len(body) > limit:
+        return body[:limit].rstrip() + " ..."
+    return body
+
+
+def parse_pdf(data: bytes):
+    """Extract deadline + summary from PDF bytes. None if the bytes don't parse."""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return None
+
+    try:
+        reader = PdfReader(io.BytesIO(data), strict=False)
+        text = "\n".join(
+            (page.extract_text() or "") for page in reader.pages[:MAX_PAGES]
+        )
+    except Exception:
+        return None
+
+    if not text.strip():
+        return None
+
+    return {"Deadline": find_deadline(text), "Summary": summarize(text)}
+
+
+# ======================================================
+# DOWNLOAD
+# ======================================================
+def download_pdf(url: str, full: bool = False, known=None):
+    """Returns (bytes, complete, validators). Only the first chunk unless full=True.
+
+    With `known` validators the request is conditional: bytes is None when the
+    server answers 304 (document unchanged since it was cached).
+    """
+    headers = dict(HEADERS)
+    if not full:
+        headers["Range"] = f"bytes=0-{RANGE_BYTES - 1}"
+    if known and known.get("etag"):
+        headers["If-None-Match"] = known["etag"]
+    if known and known.get("last_modified"):
+        headers["If-Modified-Since"] = known["last_modified"]
+
+    with http_client.get(url, headers=headers, timeout=30, verify=False, stream=True) as res:
+        if res.status_code == 304:
+            return None, True, known
+        res.raise_for_status()
+        validators = {
+            "etag": res.headers.get("ETag"),
+            "last_modified": res.headers.get("Last-Modified"),
+        }
+        ctype = res.headers.get("Content-Type", "")
+        if "pdf" not in ctype.lower() and not url.lower().endswith(".pdf"):
+            return b"", True, validators
+
+        limit = RANGE_BYTES if res.status_code == 206 else MAX_BYTES
+        chunks, size = [], 0
+        for chunk in res.iter_content(64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= limit:
+                break
+
+    data = b"".join(chunks)
+    complete = res.status_code == 200 and size < MAX_BYTES
+    return data, complete, validators
+
+
+# ======================================================
+# CACHE  (url -> validators + content hash -> result)
+# ======================================================
+_lock = threading.Lock()
+_cache = None
+
+
+def _load_cache():
+    global _cache
+    if _cache is None:
+        try:
+            with open(CACHE_PATH, "r", encoding="utf-8") as f:
+                _cache = json.load(f)
+        except (FileNotFoundError, ValueError):
+            _cache = {}
+        _cache.setdefault("urls", {})
+        _cache.setdefault("results", {})
+        _cache.setdefault("not_pdf", {})
+    return _cache
+
+
+def save_cache():
+    with _lock:
+        if _cache is None:
+            return
+        tmp = CACHE_PATH + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_cache, f, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp, CACHE_PATH)
+
+
+def _entry(url: str):
+    """What was cached for `url`: {"digest", "etag", "last_modified"}, or None."""
+    with _lock:
+        entry = _load_cache()["urls"].get(url)
+    if isinstance(entry, str):
+        # Older cache files kept the bare digest, revalidated by content hash
+        entry = {"digest": entry}
+    return entry
+
+
+def _remember(url, digest, result, validators):
+    with _lock:
+        cache = _load_cache()
+        cache["urls"][url] = {"digest": digest, **(validators or {})}
+        cache["results"][digest] = result
+        cache["not_pdf"].pop(url, None)
+
+
+def _not_pdf_recently(url):
+    with _lock:
+        seen = _load_cache()["not_pdf"].get(url)
+    return seen is not None and time.time() - seen < NOT_PDF_TTL
+
+
+def _remember_not_pdf(url):
+    with _lock:
+        _load_cache()["not_pdf"][url] = int(time.time())
+
+
+# ======================================================
+# BACKGROUND PIPELINE
+# ======================================================
+_io_pool = None
+_cpu_pool = None
+_futures = {}
+_warned_missing = threading.Event()
+
+
+def _pools():
+    global _io_pool, _cpu_pool
+    if _io_pool is None:
+        _io_pool = ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS, thread_name_prefix="pdf-io")
+        _cpu_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=get_context("spawn"))
+    return _io_pool, _cpu_pool
+
+
+def _parser_available():
+    return importlib.util.find_spec("pypdf") is not None
+
+
+def _known(digest):
+    with _lock:
+        return _load_cache()["results"].get(digest)
+
+
+def _process(url):
+    # A link that served a web page instead of a PDF isn't fetched again until the TTL runs out
+    if _not_pdf_recently(url):
+        return None
+
+    entry = _entry(url)
+
+    # Nothing to parse with: answer from the cache as is, and leave new URLs for a run that has pypdf
+    if not _parser_available():
+        hit = _known(entry["digest"]) if entry else None
+        if hit is not None:
+            return hit
+        if not _warned_missing.is_set():
+            _warned_missing.set()
+            print("⚠️ pypdf not installed, skipping PDF extraction")
+        return {"Deadline": None, "Summary": ""}
+
+    _, cpu_pool = _pools()
+
+    # Conditional on the cached ETag / Last-Modified: an unchanged notice costs a 304
+    data, complete, validators = download_pdf(url, known=entry)
+    if data is None:
+        hit = _known(entry["digest"]) if entry else None
+        if hit is not None:
+            return hit
+        data, complete, validators = download_pdf(url)
+
+    if not data:
+        _remember_not_pdf(url)
+        return None
+
+    # Same document already processed (under this link before a re-publish, or another link)
+    digest = hashlib.sha256(data).hexdigest()
+    result = _known(digest)
+
+    if result is None:
+        result = cpu_pool.submit(parse_pdf, data).result()
+
+    if result is None and not complete:
+        # Range chunk wasn't enough to read the document, pull it whole
+        data, complete, _ = download_pdf(url, full=True)
+        result = cpu_pool.submit(parse_pdf, data).result()
+
+    if result is None:
+        # Unreadable this time (truncated, scanned, odd encoding): not cached, tried again next run
+        return {"Deadline": None, "Summary": ""}
+
+    _remember(url, digest, result, validators)
+    return result
+
+
+def submit(urls):
+    """Start extracting the given PDF links in the background."""
+    io_pool, _ = _pools()
+    for url in urls:
+        if url and url not in _futures:
+            # Carry the caller's telemetry source into the download thread
+            _futures[url] = io_pool.submit(contextvars.copy_context().run, _process, url)
+
+
+def collect(urls, timeout=60):
+    """Results for whichever of `urls` finish within `timeout` seconds."""
+    submit(urls)
+    futs = {url: _futures[url] for url in urls if url in _futures}
+    wait(list(futs.values()), timeout=timeout)
+
+    results = {}
+    for url, fut in futs.items():
+        if not fut.done():
+            continue
+        try:
+            res = fut.result()
+        except Exception as e:
+            print(f"⚠️ PDF extraction failed for {url}: {e}")
+            continue
+        if res:
+            results[url] = res
+
+    save_cache()
+    return results
+
+
+def shutdown():
+    global _io_pool, _cpu_pool
+    if _io_pool is not None:
+        _io_pool.shutdown(wait=False, cancel_futures=True)
+        _cpu_pool.shutdown(wait=False, cancel_futures=True)
+    _io_pool = _cpu_pool = None
+    _futures.clear()
+    save_cache()
@@ -0,0 +1,151 @@
+import atexit
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+
+import deadline
+import telemetry
+
+# Same markers as work_queue.map_pages() so callers check one thing
+from work_queue import FAILED, SKIPPED
+
+# ======================================================
+# FETCH (threads) → PARSE (processes) PIPELINE
+# ======================================================
+IO_WORKERS = 4
+PARSE_WORKERS = max(1, min(4, (os.cpu_count() or 1)))
+MAX_PENDING = 16      # pages downloaded but not yet parsed
+INLINE_BELOW = 4      # tiny batches aren't worth starting processes for
+
+
+# One pool for the whole run: spawn workers re-import __main__ (pandas and all),
+# far too slow to pay again for every listing page
+_cpu_pool = None
+_pool_lock = threading.Lock()
+
+
+def _pool():
+    global _cpu_pool
+    with _pool_lock:
+        if _cpu_pool is None:
+            _cpu_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=get_context("spawn"))
+        return _cpu_pool
+
+
+def shutdown():
+    global _cpu_pool
+    with _pool_lock:
+        if _cpu_pool is not None:
+            _cpu_pool.shutdown(wait=False, cancel_futures=True)
+        _cpu_pool = None
+
+
+atexit.register(shutdown)
+
+
+def _timed_parse(parse, html, *parse_args):
+    """Runs in a worker: the result, its parse time and what the parser recorded itself."""
+    telemetry.drain_timings()    # anything left over from the worker's previous job
+    start = time.perf_counter()
+    result = parse(html, *parse_args)
+    return result, time.perf_counter() - start, telemetry.drain_timings()
+
+
+def fetch_and_parse(jobs, fetch, parse, io_workers=IO_WORKERS,
+                    parse_workers=PARSE_WORKERS, max_pending=MAX_PENDING):
+    """Download with `fetch` on threads while `parse` runs on other cores.
+
+    jobs: list of (fetch_arg, parse_args). fetch(fetch_arg) returns the page
+    html or None; parse(html, *parse_args) must be a picklable module-level
+    function. Returns one result per job, in order, FAILED where the fetch
+    failed or parsing raised.
+    """
+    return list(iter_fetch_and_parse(jobs, fetch, parse, io_workers, parse_workers, max_pending))
+
+
+def iter_fetch_and_parse(jobs, fetch, parse, io_workers=IO_WORKERS,
+                         parse_workers=PARSE_WORKERS, max_pending=MAX_PENDING):
+    """fetch_and_parse() that yields each result, in order, as soon as it is ready.
+
+    Once deadline.out_of_time() no further jobs are started; they come back as SKIPPED.
+    """
+    if not jobs:
+        return
+
+    # Parse callbacks run on pool threads, so pin the source explicitly
+    source = telemetry.current_source()
+
+    inline = len(jobs) < INLINE_BELOW or parse_workers < 2
+    slots = threading.BoundedSemaphore(max_pending)
+    io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="fetch")
+    cpu_pool = None if inline else _pool()
+
+    def stage(fetch_arg, parse_args, out):
+        try:
+            html = fetch(fetch_arg)
+            if html is None:
+                out.set_result(FAILED)
+                slots.release()
+                return
+            if not inline:
+                parsed = cpu_pool.submit(_timed_parse, parse, html, *parse_args)
+        except Exception as e:
+            print(f"⚠️ Pipeline fetch failed for {fetch_arg}: {e}")
+            out.set_result(FAILED)
+            slots.release()
+            return
+
+        if inline:
+            try:
+                with telemetry.span("parse", source):
+                    out.set_result(parse(html, *parse_args))
+            except Exception as e:
+                print(f"⚠️ Pipeline parse failed for {fetch_arg}: {e}")
+                out.set_result(FAILED)
+            slots.release()
+            return
+
+        def done(fut):
+            slots.release()
+            try:
+                result, seconds, timings = fut.result()
+                telemetry.add_time("parse", seconds, source)
+                telemetry.merge_timings(timings, source)
+                out.set_result(result)
+            except Exception as e:
+                print(f"⚠️ Pipeline parse failed for {fetch_arg}: {e}")
+                out.set_result(FAILED)
+
+        parsed.add_done_callback(done)
+
+    outputs = deque()
+    skipped = 0
+    try:
+        for i, (fetch_arg, parse_args) in enumerate(jobs):
+            if deadline.out_of_time():
+                skipped = len(jobs) - i
+                print(f"⏳ Out of time: not starting the last {skipped} of {len(jobs)} pages")
+                telemetry.count("pages_skipped", skipped, source)
+                break
+
+            # Backpressure: don't download further ahead than the parsers can keep up with
+            slots.acquire()
+            out = Future()
+            outputs.append(out)
+            io_pool.submit(contextvars.copy_context().run, stage, fetch_arg, tuple(parse_args), out)
+
+            # Hand finished results on instead of holding them until the last job
+            while outputs and outputs[0].done():
+                yield outputs.popleft().result()
+
+        while outputs:
+            yield outputs.popleft().result()
+        for _ in range(skipped):
+            yield SKIPPED
+    finally:
+        # The process pool stays up for the next batch (shut down at exit)
+        io_pool.shutdown(wait=True)
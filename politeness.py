@@ -0,0 +1,173 @@
+import os
+import threading
+import time
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+import http_archive
+import telemetry
+
+# ======================================================
+# PER-HOST POLITENESS (robots.txt + AIMD request rate)
+# ======================================================
+# Starting gap between two requests to a host; the controller moves it from there
+INITIAL_DELAY = {
+    "ngobox.org": 2.0,
+    "r.jina.ai": 2.0,
+}
+DEFAULT_DELAY = 1.0
+MIN_DELAY = 0.2          # fastest we ever go, whatever the host takes
+
+# Hosts that never go under a fixed gap (the pause their scraper always kept)
+HOST_FLOOR = {
+    "andpurpose.world": 1.0,
+}
+MAX_DELAY = 60.0
+
+RATE_STEP = 0.25         # additive increase, requests/s, per healthy response
+BACKOFF = 0.5            # multiplicative decrease of the rate on 429/503/errors
+SLOW_BACKOFF = 0.8       # ...and a gentler one when the host answers slowly
+SLOW_LATENCY = 3.0       # seconds
+THROTTLE_STATUS = {429, 503}
+
+ROBOTS_TTL = 24 * 3600
+ROBOTS_TIMEOUT = 10
+RESPECT_ROBOTS = os.environ.get("SCRAPER_IGNORE_ROBOTS") != "1"
+
+_lock = threading.Lock()
+_hosts = {}
+
+
+class RobotsDisallowed(requests.RequestException):
+    """robots.txt forbids this URL for our user agent."""
+
+
+def _host(netloc):
+    state = _hosts.get(netloc)
+    if state is None:
+        floor = max(MIN_DELAY, HOST_FLOOR.get(netloc, 0))
+        delay = max(floor, INITIAL_DELAY.get(netloc, DEFAULT_DELAY))
+        state = _hosts[netloc] = {
+            "delay": delay, "floor": floor, "next_allowed": 0.0,
+            "robots": None, "robots_at": 0.0, "robots_lock": threading.Lock(),
+            "throttled": 0, "slow": 0,
+        }
+    return state
+
+
+def _enabled():
+    # A replayed archive has no server to be polite to
+    return http_archive.active_mode() != "replay"
+
+
+# --- robots.txt ---
+def _load_robots(session, scheme, netloc):
+    parser = RobotFileParser()
+    url = f"{scheme}://{netloc}/robots.txt"
+    try:
+        # Plain requests.Session.request: same transport (record/replay), no politeness recursion
+        res = requests.Session.request(session, "GET", url, timeout=ROBOTS_TIMEOUT)
+        status = res.status_code
+        if status >= 400:
+            # Any 4xx (401/403 included, as RFC 9309 reads them) means "no rules": crawl it
+            parser.allow_all = True
+            if status in (401, 403):
+                print(f"⚠️ robots.txt on {netloc} answered {status}, treating it as absent")
+                telemetry.count("robots_forbidden")
+                telemetry.host_info(netloc, robots_status=status)
+        else:
+            parser.parse(res.text.splitlines())
+    except Exception:
+        # Unreachable robots.txt: proceed, the rate controller still applies
+        parser.allow_all = True
+    parser.modified()
+    return parser
+
+
+def robots(session, url, user_agent="*"):
+    """Cached RobotFileParser for the URL's host (refreshed after ROBOTS_TTL)."""
+    parts = urlparse(url)
+    with _lock:
+        state = _host(parts.netloc)
+    with state["robots_lock"]:
+        if state["robots"] is None or time.time() - state["robots_at"] > ROBOTS_TTL:
+            parser = _load_robots(session, parts.scheme or "https", parts.netloc)
+            with _lock:
+                state["robots"], state["robots_at"] = parser, time.time()
+                # Crawl-delay is a floor the controller never goes under
+                crawl_delay = parser.crawl_delay(user_agent) or 0
+                state["floor"] = max(MIN_DELAY, HOST_FLOOR.get(parts.netloc, 0), float(crawl_delay))
+                state["delay"] = max(state["delay"], state["floor"])
+        return state["robots"]
+
+
+# --- rate control ---
+def wait(session, url, user_agent="*"):
+    """Block until the URL's host may be hit again; raises RobotsDisallowed."""
+    if not _enabled():
+        return
+
+    if RESPECT_ROBOTS and not url.endswith("/robots.txt"):
+        parser = robots(session, url, user_agent)
+        if not parser.can_fetch(user_agent or "*", url):
+            telemetry.count("robots_disallowed")
+            raise RobotsDisallowed(f"robots.txt disallows {url}")
+
+    netloc = urlparse(url).netloc
+    with _lock:
+        state = _host(netloc)
+        now = time.time()
+        start = max(now, state["next_allowed"])
+        # Reserve the slot before sleeping so concurrent threads queue up behind it
+        state["next_allowed"] = start + state["delay"]
+    if start > now:
+        time.sleep(start - now)
+
+
+def observe(url, status, seconds, retry_after=None, error=None):
+    """Feed one response (or failure) back into the host's rate."""
+    if not _enabled():
+        return
+
+    with _lock:
+        state = _host(urlparse(url).netloc)
+        rate = 1.0 / state["delay"]
+        if error is not None or status in THROTTLE_STATUS:
+            rate *= BACKOFF
+            state["throttled"] += 1
+            if retry_after:
+                state["next_allowed"] = max(state["next_allowed"], time.time() + retry_after)
+        elif seconds > SLOW_LATENCY:
+            rate *= SLOW_BACKOFF
+            state["slow"] += 1
+        elif status is not None and status < 400:
+            rate += RATE_STEP
+        state["delay"] = min(MAX_DELAY, max(state["floor"], 1.0 / rate))
+
+
+def retry_after_seconds(headers):
+    value = (headers or {}).get("Retry-After")
+    if not value:
+        return None
+    try:
+        return min(MAX_DELAY, float(value))
+    except ValueError:
+        return None    # HTTP-date form; the backoff alone will do
+
+
+def delay(netloc):
+    """Current gap for a host, also used by the work queue's cross-worker host gate."""
+    with _lock:
+        return _host(netloc)["delay"]
+
+
+def report():
+    """Per-host politeness state for the run report."""
+    with _lock:
+        for netloc, state in _hosts.items():
+            telemetry.host_info(
+                netloc, delay_s=round(state["delay"], 3), crawl_delay_floor=state["floor"],
+                throttled=state["throttled"], slow=state["slow"],
+            )
@@ -0,0 +1,169 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+import telemetry
+
+# ======================================================
+# OPT-IN PROFILING (--profile / --profile-source / --trace-memory)
+# ======================================================
+PROFILE_DIR = "profiles"
+SAMPLE_INTERVAL = 0.005   # seconds between stack samples
+TOP_N = 40
+
+_profile_all = False
+_profile_only = None
+_trace_memory = False
+
+_stats = {}                 # label -> cProfile.Profile
+_thread_labels = {}         # thread ident -> label
+_folded = Counter()         # "label;frame;frame" -> samples
+_sampler = None
+_stop = threading.Event()
+
+
+def configure(profile=False, source=None, trace_memory=False):
+    global _profile_all, _profile_only, _trace_memory
+    _profile_all = profile
+    _profile_only = source.lower() if source else None
+    _trace_memory = trace_memory
+
+    if _trace_memory:
+        tracemalloc.start(25)
+    if _profile_all or _profile_only:
+        _start_sampler()
+
+
+def _wanted(label):
+    if _profile_all:
+        return True
+    return _profile_only is not None and label.lower() == _profile_only
+
+
+# --- sampling profiler (all threads, flamegraph-ready folded stacks) ---
+def _frame_name(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _sample_loop():
+    me = threading.get_ident()
+    names = {}
+    while not _stop.wait(SAMPLE_INTERVAL):
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            label = _thread_labels.get(ident)
+            if label is None:
+                if not _profile_all:
+                    continue
+                if ident not in names:
+                    thread = next((t for t in threading.enumerate() if t.ident == ident), None)
+                    names[ident] = thread.name if thread else str(ident)
+                label = names[ident]
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            _folded[";".join([label] + stack[::-1])] += 1
+
+
+def _start_sampler():
+    global _sampler
+    _stop.clear()
+    _sampler = threading.Thread(target=_sample_loop, name="profiler-sampler", daemon=True)
+    _sampler.start()
+
+
+# --- deterministic profiles + memory, per source / stage ---
+@contextmanager
+def _measure(label):
+    profile = None
+    if _wanted(label):
+        profile = _stats.setdefault(label, cProfile.Profile())
+        _thread_labels[threading.get_ident()] = label
+        profile.enable()
+    if _trace_memory:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+    try:
+        yield
+    finally:
+        if profile is not None:
+            profile.disable()
+            _thread_labels.pop(threading.get_ident(), None)
+        if _trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            telemetry.count("peak_mem_mb", round((peak - base) / 1e6, 2), source=label)
+
+
+def wrap(label, fetch):
+    """Profile a scraper's fetch callable in whichever thread runs it."""
+    if not (_profile_all or _profile_only or _trace_memory):
+        return fetch
+
+    def profiled():
+        with _measure(label):
+            return fetch()
+    return profiled
+
+
+@contextmanager
+def stage(label):
+    """Profile a combiner stage (post-processing, export) run on this thread."""
+    if not (_profile_all or _trace_memory):
+        yield
+        return
+    with _measure(label):
+        yield
+
+
+def _slug(label):
+    return "".join(c if c.isalnum() else "_" for c in label.lower()).strip("_")
+
+
+def finish():
+    """Stop sampling and write everything collected under PROFILE_DIR."""
+    if not (_profile_all or _profile_only or _trace_memory):
+        return
+
+    _stop.set()
+    if _sampler is not None:
+        _sampler.join()
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+
+    for label, profile in _stats.items():
+        base = os.path.join(PROFILE_DIR, f"{stamp}-{_slug(label)}")
+        profile.dump_stats(base + ".prof")
+        out = io.StringIO()
+        stats = pstats.Stats(profile, stream=out).sort_stats("cumulative")
+        stats.print_stats(TOP_N)
+        stats.print_callers(TOP_N)
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(out.getvalue())
+
+    if _folded:
+        path = os.path.join(PROFILE_DIR, f"{stamp}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, n in sorted(_folded.items()):
+                f.write(f"{stack} {n}\n")
+        print(f"🔥 Flamegraph stacks: {path} (flamegraph.pl / speedscope)")
+
+    if _trace_memory:
+        snapshot = tracemalloc.take_snapshot()
+        path = os.path.join(PROFILE_DIR, f"{stamp}-memory.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            for stat in snapshot.statistics("lineno")[:TOP_N]:
+                f.write(f"{stat}\n")
+        tracemalloc.stop()
+
+    print(f"⏱️ Profiles written to {PROFILE_DIR}/ ({len(_stats)} call-graph dumps)")
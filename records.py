@@ -0,0 +1,153 @@
+import re
+
+import pandas as pd
+
+# ======================================================
+# OPPORTUNITY RECORD
+# ======================================================
+# What every scraper yields; All_Links is added later by the combiner
+FIELDS = (
+    "Source", "Type", "Title", "Description",
+    "How_to_Apply", "Matched_Vertical", "Deadline",
+    "Days_Left", "Clickable_Link",
+    "Incomplete",      # True when the run deadline cut this listing's detail fetch
+)
+
+BATCH_ROWS = 500   # records buffered before they become a compact frame chunk
+
+_ISO_DATE = re.compile(r"^\d{4}-\d{1,2}-\d{1,2}")
+
+
+class Opportunity:
+    """One listing. Slotted: no per-record __dict__, fields in FIELDS order."""
+
+    __slots__ = FIELDS
+
+    def __init__(self, **fields):
+        unknown = set(fields) - set(FIELDS)
+        if unknown:
+            raise TypeError(f"Unknown Opportunity fields: {', '.join(sorted(unknown))}")
+        for name in FIELDS:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_row(cls, row, columns=None, **fixed):
+        """From a scraper's dict row; `columns` maps its own keys onto FIELDS."""
+        columns = columns or {}
+        record = cls.__new__(cls)
+        for name in FIELDS:
+            setattr(record, name, None)
+        for key, value in row.items():
+            key = columns.get(key, key)
+            if key in FIELDS:
+                setattr(record, key, value)
+        for name, value in fixed.items():
+            setattr(record, name, value)
+        return record
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in FIELDS}
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in FIELDS)
+
+    def __setstate__(self, state):
+        for name, value in zip(FIELDS, state):
+            setattr(self, name, value)
+
+    def __eq__(self, other):
+        return isinstance(other, Opportunity) and self.__getstate__() == other.__getstate__()
+
+    def __repr__(self):
+        return f"Opportunity({self.Source!r}, {self.Title!r})"
+
+
+def parse_deadlines(values):
+    """Deadline values as datetime64 (NaT where unreadable).
+
+    Dates, Timestamps and ISO strings (YYYY-MM-DD...) are read as they are; only
+    the other strings, the dd-mm-yyyy / "5 Nov 2026" forms the sites print, day first.
+    """
+    values = pd.Series(values).astype(object)
+    out = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    text = values.map(lambda v: v.strip() if isinstance(v, str) else None)
+    is_text = text.notna()
+
+    if (~is_text).any():
+        out[~is_text] = pd.to_datetime(values[~is_text], errors="coerce").astype("datetime64[ns]")
+    iso = is_text & text.str.match(_ISO_DATE).eq(True)
+    if iso.any():
+        out[iso] = pd.to_datetime(text[iso].str.extract(r"^(\d{4}-\d{1,2}-\d{1,2})", expand=False),
+                                  format="%Y-%m-%d", errors="coerce")
+    rest = is_text & ~iso
+    if rest.any():
+        out[rest] = pd.to_datetime(text[rest], errors="coerce", dayfirst=True, format="mixed")
+    return out
+
+
+# ======================================================
+# COLUMNAR BUILDER
+# ======================================================
+class ColumnBuilder:
+    """Appends records straight into per-field lists.
+
+    Every BATCH_ROWS records the lists become a DataFrame chunk passed through
+    `ingest` (truncation, compact dtypes), so raw records never pile up.
+    `compact` re-packs the concatenated chunks.
+    """
+
+    def __init__(self, columns=None, constants=None, ingest=None, compact=None, batch=BATCH_ROWS):
+        self.columns = columns or {}          # raw dict key -> field
+        self.constants = constants or {}      # field -> fixed value
+        self.ingest = ingest
+        self.compact = compact
+        self.batch = batch
+        self.rows = 0
+        self._chunks = []
+        self._reset()
+
+    def _reset(self):
+        self._data = {name: [] for name in FIELDS}
+        self._pending = 0
+
+    def append(self, record):
+        if isinstance(record, dict):
+            record = Opportunity.from_row(record, self.columns)
+        for name in FIELDS:
+            self._data[name].append(getattr(record, name))
+        self._pending += 1
+        self.rows += 1
+        if self._pending >= self.batch:
+            self._flush()
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+        return self
+
+    def _flush(self):
+        if not self._pending:
+            return
+        chunk = pd.DataFrame(self._data, columns=list(FIELDS))
+        self._reset()
+        for name, value in self.constants.items():
+            chunk[name] = value
+        if self.ingest is not None:
+            chunk = self.ingest(chunk)
+        self._chunks.append(chunk)
+
+    def to_frame(self):
+        self._flush()
+        if not self._chunks:
+            return pd.DataFrame()
+        chunks, self._chunks = self._chunks, []
+        if len(chunks) == 1:
+            return chunks[0]
+        frame = pd.concat(chunks, ignore_index=True)
+        # Chunks with different categories concat to object; re-compact once
+        return self.compact(frame) if self.compact is not None else frame
+
+
+def build_frame(records, **kwargs):
+    """DataFrame from any iterable of Opportunity records or dict rows."""
+    return ColumnBuilder(**kwargs).extend(records).to_frame()
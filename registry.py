@@ -0,0 +1,183 @@
+import importlib
+
+import pandas as pd
+
+import fulltext
+from records import ColumnBuilder
+from snapshots import snapshot_age
+
+try:
+    import pyarrow  # noqa: F401
+    TEXT_DTYPE = "string[pyarrow]"
+except ImportError:
+    TEXT_DTYPE = None   # plain Python strings; still correct, just larger
+
+# ======================================================
+# FINAL SCHEMA
+# ======================================================
+FINAL_COLUMNS = [
+    "Source", "Type", "Title", "Description",
+    "How_to_Apply", "Matched_Vertical", "Deadline",
+    "Days_Left", "Clickable_Link", "All_Links",
+    "Also_Listed_By",  # other sources of a merged cross-source duplicate (set by the combiner)
+    "Incomplete",
+    "Relevance",       # TF-IDF match to the best vertical, 0..1 (set by the combiner)
+]
+
+# Few distinct values each; stored as categoricals
+CATEGORY_COLUMNS = ["Source", "Type", "Matched_Vertical", "Also_Listed_By"]
+TEXT_COLUMNS = ["Title", "Description", "How_to_Apply", "Clickable_Link", "All_Links"]
+
+DESCRIPTION_LIMIT = 300
+READ_MORE = " ... Read More"
+
+HOUR = 3600
+
+# ======================================================
+# SOURCE REGISTRY
+# ======================================================
+# key -> spec. Fetch functions are referenced as "module:function" so a
+# scraper module is only imported when its source actually runs. They are
+# generators of records.Opportunity, consumed as they are extracted.
+SOURCES = {}
+
+
+def register_source(key, name, fetch, label=None, columns=None, constants=None,
+                    refresh=24 * HOUR, budget=900):
+    SOURCES[key] = {
+        "key": key,
+        "name": name,                   # value of the Source column, snapshot name
+        "label": label or name,         # used in log lines
+        "fetch": fetch,
+        "columns": columns or {},       # raw column -> final column
+        "constants": constants or {},   # final column -> fixed value
+        "refresh": refresh,             # seconds between refreshes
+        "budget": budget,               # seconds a run may spend on it
+    }
+
+
+register_source(
+    "ngobox", "NGOBOX", "main_scraper:iter_ngobox",
+    refresh=6 * HOUR, budget=1200,
+)
+register_source(
+    "devnetjobs", "DevNetJobsIndia", "dev:iter_devnetjobs", label="DevNetJobs India",
+    refresh=6 * HOUR, budget=1200,
+)
+register_source(
+    "nasscom", "Nasscom", "nasscom:iter_nasscom",
+    constants={"Days_Left": pd.NA},
+    refresh=24 * HOUR, budget=180,
+)
+register_source(
+    "wri", "WRI", "wri:iter_wri",
+    constants={"Source": "WRI", "Type": "N/A", "Deadline": pd.NaT, "Days_Left": pd.NA},
+    refresh=24 * HOUR, budget=180,
+)
+register_source(
+    "hcl", "HCL Foundation", "hcl:iter_hcl",
+    refresh=72 * HOUR, budget=120,
+)
+register_source(
+    "metro", "Nagpur Metro Rail", "metro:iter_metro_tenders",
+    refresh=24 * HOUR, budget=180,
+)
+register_source(
+    "niua", "NIUA", "niua_tenders:iter_niua_tenders", label="NIUA Tenders",
+    constants={"Source": "NIUA", "Type": "Tender"},
+    refresh=72 * HOUR, budget=180,
+)
+register_source(
+    "andpurpose", "AndPurpose", "andpurpose:iter_andpurpose",
+    refresh=12 * HOUR, budget=900,
+)
+
+
+# ======================================================
+# HELPERS
+# ======================================================
+def load_fetch(spec):
+    module_name, func_name = spec["fetch"].split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def fetch_source(spec):
+    """Run a source's scraper and map its output onto FINAL_COLUMNS.
+
+    Scrapers yield Opportunity records (or dict rows) that are packed into
+    compact column chunks as they arrive; a returned DataFrame is still accepted.
+    """
+    data = load_fetch(spec)()
+
+    if data is None or isinstance(data, pd.DataFrame):
+        df = data
+        if df is None or df.empty:
+            return pd.DataFrame()
+        df = df.rename(columns=spec["columns"])
+        for col, value in spec["constants"].items():
+            df[col] = value
+        return ingest(spec, df)
+
+    builder = ColumnBuilder(
+        columns=spec["columns"], constants=spec["constants"],
+        ingest=lambda chunk: ingest(spec, chunk), compact=compact,
+    )
+    return builder.extend(data).to_frame()
+
+
+def ingest(spec, df):
+    """Schema, summary-length descriptions and compact dtypes for freshly scraped rows."""
+    df = df.reindex(columns=FINAL_COLUMNS)
+
+    # Only the summary outlives ingestion; page text goes to the side store if kept at all
+    if fulltext.store_path():
+        text = df["Description"].astype(str)
+        long = (text.str.len() > DESCRIPTION_LIMIT) & ~text.str.endswith(READ_MORE)
+        fulltext.spill(spec["name"], df.loc[long, "Clickable_Link"], df.loc[long, "Description"])
+    df["Description"] = truncate_descriptions(df["Description"])
+    df["Incomplete"] = df["Incomplete"].eq(True)
+
+    return compact(df)
+
+
+def truncate_descriptions(descriptions, limit=DESCRIPTION_LIMIT):
+    """Cut to `limit` chars + READ_MORE; already-cut text is left as it is."""
+    descriptions = descriptions.where(descriptions.notna(), "").astype(str).str.strip()
+    lengths = descriptions.str.len()
+    done = descriptions.str.endswith(READ_MORE) & (lengths <= limit + len(READ_MORE))
+    too_long = (lengths > limit) & ~done
+    if too_long.any():
+        descriptions[too_long] = descriptions[too_long].str.slice(0, limit).str.rstrip() + READ_MORE
+    return descriptions
+
+
+def compact(df):
+    """Categoricals for the label columns, Arrow-backed strings for text when pyarrow is there."""
+    dtypes = {col: "category" for col in CATEGORY_COLUMNS if col in df}
+    if TEXT_DTYPE:
+        dtypes.update({col: TEXT_DTYPE for col in TEXT_COLUMNS if col in df})
+    # copy(): object columns (Deadline) can still be views into the 2-D array pandas
+    # built from the scraper's dicts, which would pin every full page text
+    return df.astype(dtypes).copy()
+
+
+def select_sources(names=None, only_stale=False, slack=300):
+    """Specs chosen by key/name (all if none given), optionally only those due."""
+    specs = list(SOURCES.values())
+
+    if names:
+        wanted = {n.strip().lower() for n in names if n.strip()}
+        unknown = wanted - {s["key"] for s in specs} - {s["name"].lower() for s in specs}
+        if unknown:
+            raise ValueError(f"Unknown sources: {', '.join(sorted(unknown))}")
+        specs = [s for s in specs if s["key"] in wanted or s["name"].lower() in wanted]
+
+    if only_stale:
+        specs = [s for s in specs if is_stale(s, slack)]
+
+    return specs
+
+
+def is_stale(spec, slack=300):
+    age = snapshot_age(spec["name"])
+    return age is None or age >= spec["refresh"] - slack
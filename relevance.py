@@ -0,0 +1,125 @@
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# ======================================================
+# TF-IDF RELEVANCE AGAINST THE VERTICAL KEYWORDS
+# ======================================================
+# One sparse TF-IDF matrix over every Title + Description, one product with the
+# verticals' keyword profiles: rows x verticals cosine scores, no per-row Python.
+KEYWORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "keywords.json")
+TOKEN = r"[a-z0-9&]+"
+SEPARATOR = "&&&"        # token marking where the next document starts (scrubbed from the texts)
+TITLE_WEIGHT = 2.0       # a keyword in the title counts like two in the description
+
+
+def load_profiles(path=KEYWORDS_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("verticals", {})
+
+
+def _phrase(keyword):
+    return " ".join(re.findall(TOKEN, keyword.lower()))
+
+
+def _tokens(texts):
+    """(doc position, token) arrays for a column of texts: one regex pass over the whole column."""
+    texts = texts.fillna("").astype(str).str.replace(SEPARATOR, " ", regex=False)
+    joined = f" {SEPARATOR} ".join(texts.tolist()).lower()
+    words = np.array(re.findall(TOKEN, joined), dtype=object)
+    separator = words == SEPARATOR
+    return np.cumsum(separator)[~separator], words[~separator]
+
+
+def _gram_keys(codes, n, vocab_size):
+    """Integer key of every n-token window (codes read as base-vocab_size digits)."""
+    keys = codes[:len(codes) - n + 1].astype(np.int64)
+    for k in range(1, n):
+        keys = keys * vocab_size + codes[k:len(codes) - n + 1 + k]
+    return keys
+
+
+def _counts(docs, codes, n_docs, vocab_size, phrase_keys):
+    """Sparse docs x terms counts: corpus words, then the profiles' multi-word phrases."""
+    rows, cols = [docs], [codes]
+    offset = vocab_size
+    for n, keys in phrase_keys.items():
+        if len(codes) >= n:
+            inside = docs[:len(docs) - n + 1] == docs[n - 1:]
+            ids = keys.get_indexer(_gram_keys(codes, n, vocab_size))
+            found = inside & (ids >= 0)
+            rows.append(docs[:len(docs) - n + 1][found])
+            cols.append(ids[found] + offset)
+        offset += len(keys)
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    # Duplicate (doc, term) pairs are summed on conversion
+    return sparse.coo_matrix((np.ones(len(rows)), (rows, cols)), shape=(n_docs, offset)).tocsr()
+
+
+def _l2_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms) @ matrix
+
+
+def scores(df, profiles=None):
+    """Cosine similarity of each row's TF-IDF vector to each vertical's keyword profile."""
+    profiles = profiles if profiles is not None else load_profiles()
+    if df.empty or not profiles:
+        return pd.DataFrame(index=df.index, columns=list(profiles), dtype=float)
+
+    keywords = {v: [p for p in map(_phrase, kws) if p] for v, kws in profiles.items()}
+    empty = pd.Series("", index=df.index)
+    title_docs, title_words = _tokens(df["Title"] if "Title" in df else empty)
+    description_docs, description_words = _tokens(df["Description"] if "Description" in df else empty)
+
+    # Vocabulary: every word of the corpus, then the profiles' phrases grouped by length
+    codes, words = pd.factorize(np.concatenate([title_words, description_words]))
+    title_codes, description_codes = codes[:len(title_words)], codes[len(title_words):]
+    words = pd.Index(words)
+    vocab_size = max(len(words), 1)
+    phrases = sorted({p for ps in keywords.values() for p in ps if " " in p}, key=lambda p: (p.count(" "), p))
+    phrase_keys, term_names = {}, list(words)
+    for n in sorted({p.count(" ") + 1 for p in phrases}):
+        known = []
+        for p in phrases:
+            phrase_codes = words.get_indexer(p.split())
+            if p.count(" ") + 1 == n and (phrase_codes >= 0).all():
+                known.append((p, _gram_keys(phrase_codes, n, vocab_size)[0]))
+        phrase_keys[n] = pd.Index([key for _, key in known])
+        term_names += [p for p, _ in known]
+
+    tf = (_counts(title_docs, title_codes, len(df), vocab_size, phrase_keys) * TITLE_WEIGHT
+          + _counts(description_docs, description_codes, len(df), vocab_size, phrase_keys)).tocsr()
+    tf.data = 1.0 + np.log(tf.data)                   # sublinear tf
+    n_docs = tf.shape[0]
+    doc_freq = np.bincount(tf.indices, minlength=tf.shape[1])
+    idf = np.log((1.0 + n_docs) / (1.0 + doc_freq)) + 1.0
+    docs = _l2_rows(tf @ sparse.diags(idf))
+
+    # Profiles: one row per vertical, its keywords seen in the corpus weighted by idf
+    term_ids = pd.Index(term_names)
+    rows, cols = [], []
+    for i, phrases_of_vertical in enumerate(keywords.values()):
+        ids = term_ids.get_indexer(phrases_of_vertical)
+        ids = np.unique(ids[ids >= 0])
+        ids = ids[doc_freq[ids] > 0]
+        rows.append(np.full(len(ids), i))
+        cols.append(ids)
+    rows, cols = np.concatenate(rows), np.concatenate(cols)
+    profile = sparse.csr_matrix((idf[cols], (rows, cols)), shape=(len(keywords), tf.shape[1]))
+    profile = _l2_rows(profile)
+
+    similarity = (docs @ profile.T).toarray()
+    return pd.DataFrame(similarity, index=df.index, columns=list(keywords))
+
+
+def relevance(df, profiles=None):
+    """Best vertical score per row, 0..1; the sheet's Relevance column."""
+    if df.empty:
+        return pd.Series(dtype=float, index=df.index)
+    return scores(df, profiles).max(axis=1).round(4)
@@ -0,0 +1,118 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import circuit
+import politeness
+import telemetry
+from registry import select_sources
+from snapshots import load_snapshot, snapshot_age
+
+# ======================================================
+# SETTINGS
+# ======================================================
+JITTER = 0.1       # ± fraction of a source's refresh interval
+TICK = 30          # seconds between scheduler wake-ups
+
+
+def _jittered(interval):
+    return interval * (1 + random.uniform(-JITTER, JITTER))
+
+
+def _first_due(spec, now):
+    age = snapshot_age(spec["name"])
+    if age is None:
+        return now
+    return now + max(0.0, _jittered(spec["refresh"]) - age)
+
+
+def _refresh(spec):
+    """Scrape one source; True if its snapshot changed."""
+    # Imported here so the scheduler module stays importable without the combiner
+    from combined_scraper import run_source
+    from registry import fetch_source
+
+    before, _ = load_snapshot(spec["name"])
+    print(f"🔍 Running {spec['label']} scraper...")
+    after = run_source(spec["name"], lambda: fetch_source(spec), timeout=spec["budget"])
+
+    if before is None:
+        return not after.empty
+    return not after.reset_index(drop=True).equals(before.reset_index(drop=True))
+
+
+def rebuild_outputs():
+    import history
+    from combined_scraper import combine, write_excel
+    from registry import SOURCES
+
+    frames = []
+    for spec in SOURCES.values():
+        snap, _ = load_snapshot(spec["name"])
+        if snap is not None:
+            frames.append(snap)
+
+    if not frames:
+        return
+
+    combined_df = combine(frames)
+    if combined_df.empty:
+        print("❌ No data found from any source.")
+        return
+    write_excel(combined_df)
+    history.record(combined_df)
+
+
+def write_reports():
+    """The run report for the refreshes since the last one, then start counting afresh."""
+    politeness.report()
+    circuit.report()
+    telemetry.write_report()
+    telemetry.reset()
+
+
+def run_daemon(sources=None, workers=3, tick=TICK):
+    """Refresh each source on its own jittered interval, forever."""
+    specs = select_sources(sources)
+    now = time.time()
+    next_due = {spec["key"]: _first_due(spec, now) for spec in specs}
+    running = {}
+
+    print(f"⏰ Scheduler started for {len(specs)} sources ({workers} workers)")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="refresh") as pool:
+        while True:
+            now = time.time()
+
+            for spec in specs:
+                key = spec["key"]
+                if key not in running and next_due[key] <= now:
+                    running[key] = pool.submit(_refresh, spec)
+
+            changed = finished = False
+            for spec in specs:
+                key = spec["key"]
+                fut = running.get(key)
+                if fut is None or not fut.done():
+                    continue
+                del running[key]
+                finished = True
+                try:
+                    changed |= fut.result()
+                except Exception as e:
+                    print(f"❌ {spec['label']} refresh failed: {e}")
+                next_due[key] = time.time() + _jittered(spec["refresh"])
+                due_in = int(next_due[key] - time.time())
+                print(f"⏰ {spec['label']} next refresh in {due_in // 60} min")
+
+            # Outputs are rewritten only when a source's data actually moved
+            if changed:
+                print("🔄 Source data changed, rewriting outputs...")
+                rebuild_outputs()
+
+            # Same report as a one-shot run, per round of refreshes; a daemon never
+            # lets telemetry pile up (a refresh still running counts in the next one)
+            if finished:
+                write_reports()
+
+            time.sleep(tick)
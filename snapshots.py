@@ -0,0 +1,94 @@
+import json
+import os
+import re
+import pickle
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# ======================================================
+# LAST-KNOWN-GOOD SNAPSHOTS (one pickle per source)
+# ======================================================
+SNAPSHOT_DIR = "snapshots"
+
+# Files that served as a source's fallback before the snapshot store existed
+LEGACY_FALLBACKS = {
+    "Nasscom": "nasscom.xlsx",
+}
+
+
+def _slug(source: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", source.lower()).strip("_")
+
+
+def snapshot_path(source: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, f"{_slug(source)}.pkl")
+
+
+def save_snapshot(source: str, df: pd.DataFrame):
+    if df is None or df.empty:
+        return
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    path = snapshot_path(source)
+    tmp = path + ".tmp"
+
+    payload = {
+        "source": source,
+        "saved_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "df": df,
+    }
+    with open(tmp, "wb") as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def load_snapshot(source: str):
+    """Returns (df, saved_at) for the source's last good result, or (None, None)."""
+    path = snapshot_path(source)
+    if os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                payload = pickle.load(f)
+            return payload["df"], payload["saved_at"]
+        except Exception as e:
+            print(f"⚠️ Could not read snapshot {path}: {e}")
+
+    legacy = LEGACY_FALLBACKS.get(source)
+    if legacy and os.path.exists(legacy):
+        saved_at = datetime.fromtimestamp(os.path.getmtime(legacy), timezone.utc)
+        return pd.read_excel(legacy), saved_at.isoformat(timespec="seconds")
+
+    return None, None
+
+
+def known_links_path(source: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, f"{_slug(source)}.links.json")
+
+
+def load_known_links(source: str, max_age: float):
+    """{link: last seen on a listing page (epoch seconds)}, for links seen within max_age."""
+    try:
+        with open(known_links_path(source), "r", encoding="utf-8") as f:
+            links = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    cutoff = time.time() - max_age
+    return {link: seen for link, seen in links.items() if seen >= cutoff}
+
+
+def save_known_links(source: str, links: dict):
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    path = known_links_path(source)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(links, f, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def snapshot_age(source: str):
+    """Seconds since the source's snapshot was saved, None if there is none."""
+    path = snapshot_path(source)
+    if not os.path.exists(path):
+        return None
+    return datetime.now().timestamp() - os.path.getmtime(path)
@@ -0,0 +1,192 @@
+import contextvars
+import json
+import math
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+from urllib.parse import urlparse
+
+# ======================================================
+# RUN METRICS (per source, per host, per stage)
+# ======================================================
+REPORT_PATH = "all_grants.run.json"
+
+_current_source = contextvars.ContextVar("telemetry_source", default="-")
+
+_lock = threading.Lock()
+_started = time.time()
+_counters = defaultdict(lambda: defaultdict(float))   # source -> name -> value
+_timings = defaultdict(lambda: defaultdict(lambda: [0, 0.0]))   # source -> stage -> [calls, seconds]
+_latency = defaultdict(list)                          # source -> [seconds]
+_hosts = defaultdict(lambda: {"fetches": 0, "errors": 0, "bytes": 0, "latency": []})
+_notes = defaultdict(list)                            # section -> [dict]
+
+
+def reset():
+    global _started
+    with _lock:
+        _started = time.time()
+        _counters.clear()
+        _timings.clear()
+        _latency.clear()
+        _hosts.clear()
+        _notes.clear()
+
+
+def current_source():
+    return _current_source.get()
+
+
+@contextmanager
+def source_scope(name):
+    """Attribute everything recorded inside (this thread/context) to `name`."""
+    token = _current_source.set(name)
+    try:
+        yield
+    finally:
+        _current_source.reset(token)
+
+
+def count(name, n=1, source=None):
+    with _lock:
+        _counters[source or current_source()][name] += n
+
+
+def add_time(stage, seconds, source=None):
+    with _lock:
+        total = _timings[source or current_source()][stage]
+        total[0] += 1
+        total[1] += seconds
+
+
+def drain_timings():
+    """Take (and clear) the stage timings recorded so far: {stage: [calls, seconds]}."""
+    with _lock:
+        drained = {}
+        for stages in _timings.values():
+            for stage, (calls, seconds) in stages.items():
+                total = drained.setdefault(stage, [0, 0.0])
+                total[0] += calls
+                total[1] += seconds
+        _timings.clear()
+        return drained
+
+
+def merge_timings(timings, source=None):
+    """Add timings taken in another process (see drain_timings) under `source`."""
+    with _lock:
+        for stage, (calls, seconds) in timings.items():
+            total = _timings[source or current_source()][stage]
+            total[0] += calls
+            total[1] += seconds
+
+
+@contextmanager
+def span(stage, source=None):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(stage, time.perf_counter() - start, source)
+
+
+def timed(stage):
+    """Decorator form of span()."""
+    def wrap(func):
+        @wraps(func)
+        def inner(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def record_http(url, status, seconds, nbytes, error=None, source=None):
+    source = source or current_source()
+    host = urlparse(url).netloc
+    failed = error is not None or (status is not None and status >= 400)
+    with _lock:
+        c = _counters[source]
+        c["fetches"] += 1
+        c["bytes"] += nbytes
+        if failed:
+            c["fetch_errors"] += 1
+        _latency[source].append(seconds)
+
+        h = _hosts[host]
+        h["fetches"] += 1
+        h["bytes"] += nbytes
+        h["errors"] += failed
+        h["latency"].append(seconds)
+
+
+def host_info(host, **fields):
+    """Extra per-host state for the report's hosts section."""
+    with _lock:
+        _hosts[host].setdefault("info", {}).update(fields)
+
+
+def note(section, **fields):
+    """Free-form events for the report (e.g. fallbacks taken)."""
+    with _lock:
+        _notes[section].append(fields)
+
+
+# ======================================================
+# REPORT
+# ======================================================
+def _percentiles(values):
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(p):
+        # nearest-rank percentile
+        return round(ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)], 4)
+
+    return {"p50": pick(50), "p90": pick(90), "p99": pick(99), "max": round(ordered[-1], 4)}
+
+
+def build_report():
+    with _lock:
+        sources = {}
+        for name in set(_counters) | set(_timings) | set(_latency):
+            entry = {k: (int(v) if float(v).is_integer() else round(v, 4))
+                     for k, v in sorted(_counters[name].items())}
+            entry["stages"] = {
+                stage: {"calls": calls, "seconds": round(seconds, 4)}
+                for stage, (calls, seconds) in sorted(_timings[name].items())
+            }
+            entry["http_latency"] = _percentiles(_latency[name])
+            sources[name] = entry
+
+        hosts = {
+            host: {
+                "fetches": h["fetches"], "errors": h["errors"], "bytes": h["bytes"],
+                "latency": _percentiles(h["latency"]),
+                **h.get("info", {}),
+            }
+            for host, h in sorted(_hosts.items())
+        }
+        notes = {k: list(v) for k, v in _notes.items()}
+
+    finished = time.time()
+    return {
+        "started_at": datetime.fromtimestamp(_started, timezone.utc).isoformat(timespec="seconds"),
+        "finished_at": datetime.fromtimestamp(finished, timezone.utc).isoformat(timespec="seconds"),
+        "duration_s": round(finished - _started, 2),
+        "sources": dict(sorted(sources.items())),
+        "hosts": hosts,
+        **notes,
+    }
+
+
+def write_report(path=REPORT_PATH):
+    report = build_report()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"🧾 Run report saved as {path} ({report['duration_s']}s)")
+    return report
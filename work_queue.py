@@ -0,0 +1,376 @@
+import argparse
+import importlib
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+import uuid
+from datetime import date
+from urllib.parse import urlparse
+
+import deadline
+import http_client
+import politeness
+
+# ======================================================
+# SETTINGS
+# ======================================================
+# Scrapers fan detail pages out to the queue when this is set (workers inherit it)
+QUEUE_ENV = "SCRAPER_QUEUE"
+
+# The store is SQLite in WAL mode, which needs shared memory between its users:
+# every worker must run on the machine holding the DB file, on a local disk.
+# Never put it on NFS/SMB to share it between machines.
+
+DEFAULT_DB = "work_queue.sqlite"
+
+VISIBILITY_TIMEOUT = 120   # a leased task comes back if not acked within this
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF = 10         # seconds, multiplied by the attempt number
+POLL_INTERVAL = 0.5
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+# map_pages() result for a page whose task failed on every attempt
+FAILED = object()
+# ...and for one still unfinished when the run deadline came
+SKIPPED = object()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch         TEXT NOT NULL,
+    kind          TEXT NOT NULL,          -- source | listing | detail
+    payload       TEXT NOT NULL,          -- JSON
+    host          TEXT,
+    status        TEXT NOT NULL DEFAULT 'pending',
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    max_attempts  INTEGER NOT NULL DEFAULT 3,
+    visibility    REAL NOT NULL DEFAULT 120,
+    available_at  REAL NOT NULL,
+    lease_owner   TEXT,
+    lease_until   REAL,
+    result        TEXT,                   -- JSON (see _encode)
+    error         TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, available_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_batch ON tasks(batch);
+CREATE TABLE IF NOT EXISTS hosts (
+    host          TEXT PRIMARY KEY,
+    next_allowed  REAL NOT NULL
+);
+"""
+
+
+# ======================================================
+# STORE
+# ======================================================
+def connect(db=DEFAULT_DB):
+    conn = sqlite3.connect(db, timeout=60, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def active_queue():
+    return os.environ.get(QUEUE_ENV)
+
+
+def enqueue(conn, batch, kind, payload, host=None,
+            visibility=VISIBILITY_TIMEOUT, max_attempts=MAX_ATTEMPTS):
+    cur = conn.execute(
+        "INSERT INTO tasks (batch, kind, payload, host, visibility, max_attempts, available_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (batch, kind, json.dumps(payload), host, visibility, max_attempts, time.time())
+    )
+    return cur.lastrowid
+
+
+def lease(conn, owner, batch=None):
+    """Claim the next runnable task whose host may be hit now. None if there is none."""
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # A lease that ran out on its last attempt: the task keeps killing its worker
+        conn.execute(
+            "UPDATE tasks SET status = 'failed', lease_owner = NULL, lease_until = NULL, "
+            "error = COALESCE(error || '; ', '') || 'lease expired on attempt ' || attempts "
+            "WHERE status = 'leased' AND lease_until < ? AND attempts >= max_attempts",
+            (now,)
+        )
+        row = conn.execute(
+            """
+            SELECT t.id, t.kind, t.payload, t.host, t.visibility
+            FROM tasks t LEFT JOIN hosts h ON h.host = t.host
+            WHERE ((t.status = 'pending' AND t.available_at <= ?)
+                   OR (t.status = 'leased' AND t.lease_until < ? AND t.attempts < t.max_attempts))
+              AND (h.next_allowed IS NULL OR h.next_allowed <= ?)
+              AND (? IS NULL OR t.batch = ?)
+            ORDER BY t.id
+            LIMIT 1
+            """,
+            (now, now, now, batch, batch)
+        ).fetchone()
+
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+
+        task_id, kind, payload, host, visibility = row
+        conn.execute(
+            "UPDATE tasks SET status = 'leased', lease_owner = ?, lease_until = ?, "
+            "attempts = attempts + 1 WHERE id = ?",
+            (owner, now + visibility, task_id)
+        )
+        if host:
+            # Gap across every worker: this worker's current AIMD delay for the host
+            conn.execute(
+                "INSERT INTO hosts (host, next_allowed) VALUES (?, ?) "
+                "ON CONFLICT(host) DO UPDATE SET next_allowed = excluded.next_allowed",
+                (host, now + politeness.delay(host))
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    return {"id": task_id, "kind": kind, "payload": json.loads(payload), "host": host}
+
+
+def _plain(value):
+    # numpy scalars, timestamps and anything else json can't take on its own
+    if hasattr(value, "item"):
+        return value.item()
+    if hasattr(value, "isoformat"):
+        return None if str(value) == "NaT" else value.isoformat()
+    return str(value)
+
+
+def _encode(result):
+    """Results go into the shared store as JSON: reading them never runs a writer's code."""
+    import pandas as pd
+
+    if isinstance(result, pd.DataFrame):
+        dates = [c for c in result.columns if pd.api.types.is_datetime64_any_dtype(result[c])]
+        # Object columns (Deadline) mix text with dates/Timestamps: remember which cells were dates
+        date_cells = {}
+        for column in result.columns:
+            if result[column].dtype == object:
+                positions = [i for i, v in enumerate(result[column]) if isinstance(v, date)]
+                if positions:
+                    date_cells[column] = positions
+        result = {
+            "frame": json.loads(result.to_json(orient="split", index=False, date_format="iso")),
+            "dates": dates, "date_cells": date_cells,
+        }
+    else:
+        result = {"value": result}
+    return json.dumps(result, ensure_ascii=False, default=_plain)
+
+
+def _decode(text):
+    result = json.loads(text)
+    if "frame" not in result:
+        return result["value"]
+
+    import pandas as pd
+    from registry import compact
+
+    frame = result["frame"]
+    df = pd.DataFrame(frame["data"], columns=frame["columns"])
+    for column in result.get("dates", []):
+        df[column] = pd.to_datetime(df[column])
+    for column, positions in result.get("date_cells", {}).items():
+        values = df[column].astype(object)
+        values.iloc[positions] = [pd.Timestamp(v) for v in values.iloc[positions]]
+        df[column] = values
+    return compact(df)
+
+
+def ack(conn, task_id, owner, result):
+    conn.execute(
+        "UPDATE tasks SET status = 'done', result = ?, lease_owner = NULL, lease_until = NULL "
+        "WHERE id = ? AND lease_owner = ?",
+        (_encode(result), task_id, owner)
+    )
+
+
+def nack(conn, task_id, owner, error):
+    conn.execute(
+        """
+        UPDATE tasks SET
+            status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END,
+            available_at = ? + attempts * ?,
+            error = ?, lease_owner = NULL, lease_until = NULL
+        WHERE id = ? AND lease_owner = ?
+        """,
+        (time.time(), RETRY_BACKOFF, str(error)[:2000], task_id, owner)
+    )
+
+
+def batch_results(conn, batch):
+    """{task_id: (status, result, error)} for every task in the batch."""
+    rows = conn.execute(
+        "SELECT id, status, result, error FROM tasks WHERE batch = ?", (batch,)
+    ).fetchall()
+    return {
+        task_id: (status, _decode(result) if result is not None else None, error)
+        for task_id, status, result, error in rows
+    }
+
+
+def batch_open(conn, batch):
+    return conn.execute(
+        "SELECT COUNT(*) FROM tasks WHERE batch = ? AND status IN ('pending', 'leased')",
+        (batch,)
+    ).fetchone()[0]
+
+
+# ======================================================
+# HANDLERS
+# ======================================================
+def _load(path):
+    module_name, func_name = path.split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def run_task(task):
+    payload = task["payload"]
+
+    if task["kind"] == "source":
+        from registry import SOURCES, fetch_source
+        spec = SOURCES[payload["key"]]
+        # Within the run deadline the scraper winds down and flags what it cut short
+        timeout = min(spec["budget"], max(0, deadline.scrape_time_left())) if deadline.active() else None
+        with deadline.source_scope(timeout):
+            return fetch_source(spec)
+
+    # listing / detail: fetch the page here, parse with the scraper's own function
+    if payload.get("fetch"):
+        res = _load(payload["fetch"])(payload["url"])
+        if res is None:
+            raise RuntimeError(f"fetch failed for {payload['url']}")
+    else:
+        res = http_client.get(
+            payload["url"], headers=payload.get("headers") or HEADERS,
+            timeout=30, verify=False
+        )
+        res.raise_for_status()
+    return _load(payload["parser"])(res.text, *payload.get("args", []))
+
+
+def work_once(conn, owner, batch=None):
+    """Lease and run one task. False if nothing was runnable."""
+    task = lease(conn, owner, batch)
+    if task is None:
+        return False
+
+    try:
+        result = run_task(task)
+    except Exception as e:
+        print(f"⚠️ Task {task['id']} ({task['kind']}) failed: {e}")
+        nack(conn, task["id"], owner, e)
+    else:
+        ack(conn, task["id"], owner, result)
+    return True
+
+
+def run_worker(db=DEFAULT_DB, idle_exit=None):
+    """Process tasks until killed, or until idle for `idle_exit` seconds."""
+    conn = connect(db)
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    os.environ[QUEUE_ENV] = db
+    if os.environ.get(deadline.RUN_UNTIL_ENV):
+        deadline.start_at(float(os.environ[deadline.RUN_UNTIL_ENV]))
+    print(f"👷 Worker {owner} on {db}")
+
+    idle_since = time.time()
+    while True:
+        if work_once(conn, owner):
+            idle_since = time.time()
+            continue
+        if idle_exit is not None and time.time() - idle_since > idle_exit:
+            return
+        time.sleep(POLL_INTERVAL)
+
+
+def spawn_workers(db, count, idle_exit=60):
+    """Start `count` local worker processes that exit once the queue goes quiet."""
+    script = os.path.abspath(__file__)
+    return [
+        subprocess.Popen([sys.executable, script, "worker", "--db", db, "--idle-exit", str(idle_exit)])
+        for _ in range(count)
+    ]
+
+
+# ======================================================
+# FAN-OUT HELPERS
+# ======================================================
+def wait_batch(conn, batch, owner, timeout=None):
+    """Block until the batch is finished (or `timeout` seconds passed), running its tasks here too.
+
+    Tasks still pending or leased at the timeout come back with that status.
+    """
+    until = None if timeout is None else time.time() + timeout
+    while batch_open(conn, batch):
+        if until is not None and time.time() >= until:
+            print(f"⏳ Stopped waiting on batch {batch[:12]}: {batch_open(conn, batch)} tasks unfinished")
+            break
+        if not work_once(conn, owner, batch):
+            time.sleep(POLL_INTERVAL)
+    return batch_results(conn, batch)
+
+
+def map_pages(kind, pages, db=None):
+    """Fetch+parse pages through the queue.
+
+    pages: list of {"url", "parser": "module:function", "args": [...]}, optionally
+    with "headers", or "fetch": "module:function" to fetch with the scraper's own
+    request helper. Parsers are called as parser(html, *args).
+    Returns one result per page, FAILED where the task failed for good and
+    SKIPPED where it was still unfinished when the run deadline came.
+    """
+    conn = connect(db or active_queue())
+    batch = uuid.uuid4().hex
+    owner = f"{socket.gethostname()}:{os.getpid()}:{batch[:6]}"
+
+    ids = [
+        enqueue(conn, batch, kind, page, host=urlparse(page["url"]).netloc)
+        for page in pages
+    ]
+    results = wait_batch(conn, batch, owner,
+                         timeout=max(0, deadline.scrape_time_left()) if deadline.active() else None)
+    conn.close()
+
+    outcome = {"done": None, "failed": FAILED}
+    return [results[i][1] if results[i][0] == "done" else outcome.get(results[i][0], SKIPPED) for i in ids]
+
+
+# ======================================================
+# CLI
+# ======================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scraper work-queue worker")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    w = sub.add_parser("worker", help="lease and run tasks from the queue")
+    w.add_argument("--db", default=DEFAULT_DB)
+    w.add_argument("--idle-exit", type=float, default=None,
+                   help="exit after this many idle seconds (default: run forever)")
+
+    s = sub.add_parser("status", help="task counts by status")
+    s.add_argument("--db", default=DEFAULT_DB)
+
+    args = parser.parse_args()
+
+    if args.cmd == "worker":
+        run_worker(args.db, args.idle_exit)
+    else:
+        for status, kind, n in connect(args.db).execute(
+            "SELECT status, kind, COUNT(*) FROM tasks GROUP BY status, kind ORDER BY status, kind"
+        ):
+            print(f"{status:8} {kind:8} {n}")
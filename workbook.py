@@ -0,0 +1,161 @@
+import hashlib
+import io
+import json
+import os
+import re
+import zipfile
+
+import pandas as pd
+
+# ======================================================
+# REPRODUCIBLE WORKBOOK + DATASET FINGERPRINT
+# ======================================================
+# Same rows in -> same bytes out, so an unchanged day costs no write, no commit
+# and no re-download by the app.
+FIXED_DATE_TIME = (2000, 1, 1, 0, 0, 0)       # every zip entry's timestamp
+FIXED_W3CDTF = "2000-01-01T00:00:00Z"         # docProps/core.xml created/modified
+FINGERPRINT_PREFIX = "dataset-sha256:"        # kept in the workbook's dc:identifier
+
+# Derived values: Days_Left from Deadline and the run date, Relevance from the whole
+# corpus. They move without the listing itself changing. Readers recount Days_Left
+# themselves (the sheet's cells are formulas on TODAY(), the JSON has "expires"),
+# so a new day alone never rewrites anything
+VOLATILE_COLUMNS = ["Days_Left", "Relevance"]
+NO_DEADLINE_DAYS = 9999    # what dev.compute_days_left gives an unparseable deadline
+
+DIFF_PATH = "all_grants.diff.json"
+JSON_PATH = "all_grants.json"    # what app.py serves: no pandas/openpyxl needed to read it
+DIFF_SAMPLE = 50    # links listed per kind in the diff file; the counts are always complete
+
+_CORE_DATES = re.compile(rb"(<dcterms:(?:created|modified)[^>]*>)[^<]*(</dcterms:)")
+_IDENTIFIER = re.compile(rb"<dc:identifier>([^<]*)</dc:identifier>")
+
+
+def canonical(df):
+    """Every logical value as text, the way it reads back from the sheet."""
+    df = df.drop(columns=[c for c in VOLATILE_COLUMNS if c in df.columns])
+    return df.astype(object).where(df.notna(), "").astype(str)
+
+
+def _row_keys(df):
+    # Clickable_Link identifies a listing; a repeat link gets its occurrence number
+    links = df["Clickable_Link"].astype(str).reset_index(drop=True)
+    return links + "#" + links.groupby(links).cumcount().astype(str)
+
+
+def fingerprint(df):
+    """Hash of the logical dataset: column names and every row, in order."""
+    text = canonical(df)
+    digest = hashlib.sha256("\x1f".join(text.columns).encode("utf-8"))
+    for row in text.itertuples(index=False, name=None):
+        digest.update(b"\x1e" + "\x1f".join(row).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def stored_fingerprint(path):
+    """Fingerprint the workbook at `path` was written with (None if absent or foreign)."""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            core = archive.read("docProps/core.xml")
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return None
+    match = _IDENTIFIER.search(core)
+    value = match.group(1).decode("utf-8") if match else ""
+    if not value.startswith(FINGERPRINT_PREFIX):
+        return None
+    # Sheets from one earlier build carry "@<day>" after the fingerprint
+    return value[len(FINGERPRINT_PREFIX):].partition("@")[0]
+
+
+def normalize_zip(data):
+    """Rewrite an .xlsx with fixed timestamps so identical content gives identical bytes."""
+    source = zipfile.ZipFile(io.BytesIO(data))
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        for info in source.infolist():
+            body = source.read(info.filename)
+            if info.filename == "docProps/core.xml":
+                body = _CORE_DATES.sub(rb"\g<1>" + FIXED_W3CDTF.encode() + rb"\g<2>", body)
+            entry = zipfile.ZipInfo(info.filename, date_time=FIXED_DATE_TIME)
+            entry.compress_type = zipfile.ZIP_DEFLATED
+            entry.external_attr = 0o644 << 16
+            archive.writestr(entry, body, compresslevel=9)
+    return out.getvalue()
+
+
+def expiry_dates(df, today=None):
+    """Absolute last day per row (ISO date, None if unknown), so readers can recount Days_Left."""
+    today = today or pd.Timestamp.now(tz="UTC").normalize().tz_localize(None)
+    days = pd.to_numeric(df["Days_Left"], errors="coerce")
+    known = days.notna() & (days < NO_DEADLINE_DAYS)
+    expires = (today + pd.to_timedelta(days.where(known), unit="D")).dt.strftime("%Y-%m-%d")
+    return expires.astype(object).where(known, None).tolist()
+
+
+def days_left_formulas(df):
+    """Days_Left cells as formulas counting down to each row's expiry day (None where unknown)."""
+    return [
+        None if day is None else "=DATE({},{},{})-TODAY()".format(*map(int, day.split("-")))
+        for day in expiry_dates(df)
+    ]
+
+
+def to_json(df, fingerprint):
+    """The sheet's rows as compact, deterministic JSON: column names once, then value arrays."""
+    rows = json.loads(df.to_json(orient="values", force_ascii=False, date_format="iso"))
+    payload = {"fingerprint": fingerprint, "columns": [str(c) for c in df.columns], "rows": rows,
+               "expires": expiry_dates(df)}
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def write_atomic(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+# ======================================================
+# PER-RUN DIFF
+# ======================================================
+def read_previous(path):
+    """The last published rows, as text, or None when there is no readable workbook."""
+    try:
+        return pd.read_excel(path, engine="openpyxl", dtype=str, keep_default_na=False)
+    except Exception:
+        return None
+
+
+def diff(previous, current):
+    """Added / removed / changed listings between two datasets, keyed by link."""
+    if previous is None:
+        return {"added": len(current), "removed": 0, "changed": 0, "baseline": False}
+
+    old = canonical(previous)
+    new = canonical(current)
+    old.index, new.index = _row_keys(old), _row_keys(new)
+    columns = [c for c in new.columns if c in old.columns]
+
+    added = new.index.difference(old.index)
+    removed = old.index.difference(new.index)
+    both = new.index.intersection(old.index)
+    moved = new.loc[both, columns].ne(old.loc[both, columns])
+    changed = moved[moved.any(axis=1)]
+
+    def links(keys):
+        return [key.rsplit("#", 1)[0] for key in keys[:DIFF_SAMPLE]]
+
+    return {
+        "added": len(added), "removed": len(removed), "changed": len(changed), "baseline": True,
+        "added_links": links(added),
+        "removed_links": links(removed),
+        "changed_fields": {
+            key.rsplit("#", 1)[0]: [c for c in columns if row[c]]
+            for key, row in changed.head(DIFF_SAMPLE).iterrows()
+        },
+    }
+
+
+def write_diff(summary, path=DIFF_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
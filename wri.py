@@ -8,6 +8,11 @@ import json
 import requests
 import time  # ✅ Added for retries
 
+import circuit
+import http_client
+import telemetry
+from records import Opportunity
+
 # === URL ===
 URL = "https://wri-india.org/about/procurement-opportunities"
 
@@ -80,6 +85,7 @@ def extract_how_to_apply(description: str) -> str:
 
     return "\n".join(matched_sections).strip() or "N/A"
 
+@telemetry.timed("match")
 def find_matched_vertical(title: str, description: str, keywords_data: dict) -> str:
     matched_verticals = []
     text_to_check = f"{title.lower()} {description.lower()}"
@@ -98,24 +104,43 @@ def fetch_wri_opportunities():
     response = None
     for attempt in range(3):  # ✅ Add retries
         try:
-            response = requests.get(URL, headers=HEADERS, timeout=30, verify=False)  # ✅ Increased timeout
+            response = http_client.get(URL, headers=HEADERS, timeout=30, verify=False)  # ✅ Increased timeout
             print(f"✅ WRI response status: {response.status_code} (Attempt {attempt+1})")
             response.raise_for_status()
             break
         except requests.exceptions.RequestException as e:
             print(f"⚠️ WRI fetch attempt {attempt+1} failed: {e}")
+            if isinstance(e, circuit.CircuitOpenError):
+                print("❌ WRI host is down, not retrying. Returning empty list.")
+                return listings
             if attempt < 2:
+                telemetry.count("retries")
                 time.sleep(2)
             else:
                 print("❌ Max retries reached for WRI. Returning empty list.")
                 return listings
 
     try:
-        soup = BeautifulSoup(response.text, "html.parser")
+        listings = parse_wri_page(response.text, keywords_data)
     except Exception as e:
         print(f"❌ Failed to parse WRI page: {e}")
         return listings
 
+    print(f"✅ WRI scraped {len(listings)} items")
+    return listings
+
+def iter_wri():
+    """fetch_wri_opportunities() as Opportunity records."""
+    for row in fetch_wri_opportunities():
+        yield Opportunity.from_row(row)
+
+def parse_wri_page(html, keywords_data):
+    """Listings from the procurement page html (no network)."""
+    listings = []
+
+    with telemetry.span("parse"):
+        soup = BeautifulSoup(html, "html.parser")
+
     titles = soup.find_all("div", class_="field--name-field-title")
     descriptions = soup.find_all("div", class_="field--name-field-body")
 
@@ -156,10 +181,9 @@ def fetch_wri_opportunities():
             "Matched_Vertical": matched_vertical,
             "Deadline": pd.NaT,
             "Days_Left": pd.NA,
-            "Clickable_Link": '=HYPERLINK("{}","{}")'.format(link.replace('"', '""'), title.replace('"', '""'))
+            "Clickable_Link": link
         })
 
-    print(f"✅ WRI scraped {len(listings)} items")
     return listings
 
 def run_scraper():